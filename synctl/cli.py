@@ -6,6 +6,10 @@
 """Command Line Tool for Synthetic Monitoring to Manage Synthetic Test and Locations Easily"""
 import argparse
 from base64 import b64encode, b64decode
+import codecs
+import copy
+import csv
+import hashlib
 # from getpass import getpass
 import json
 from pathlib import Path
@@ -15,13 +19,23 @@ import signal
 import sys
 
 import tarfile
+import gzip
+import io
 import getpass
 import math
+import random
+import threading
+import atexit
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import time
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 import urllib3
 
 from synctl.__version__ import __version__
@@ -79,6 +93,51 @@ NORMAL_CODE, ERROR_CODE = (0, 1)
 
 TOO_MANY_REQUEST_ERROR="Too Many Requests"
 
+# shared HTTP transport settings
+DEFAULT_TIMEOUT = 60
+DEFAULT_POOL_SIZE = 32
+
+# retry settings when the server throttles us
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5    # seconds
+BACKOFF_MAX = 30      # seconds
+MAX_RETRY_WAIT = 120  # give up instead of waiting longer than this, seconds
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+
+# run test --wait polls the CI/CD results every RUN_POLL_INTERVAL seconds, up to RUN_POLL_MAX_INTERVAL
+RUN_POLL_INTERVAL = 2
+RUN_POLL_MAX_INTERVAL = 30
+
+# number of pages fetched at the same time by paginated listings
+PAGE_WORKERS = 8
+
+# default number of workers of bulk operations, 1 means one by one
+DEFAULT_CONCURRENCY = 1
+
+# default number of workers of synctl import, a migration creates the whole tenant
+IMPORT_CONCURRENCY = 8
+
+# structured output of synctl get, records are written to stdout once OUTPUT_BUFFER_SIZE characters are buffered
+OUTPUT_FORMATS = ("json", "ndjson", "csv")
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# a result id looked up with synctl get result <id> is searched in the last RESULT_LOOKUP_WINDOW
+# when it is not in --window-size, 24h is the largest window of the result list API
+RESULT_LOOKUP_WINDOW = 24 * 60 * 60 * 1000  # milliseconds
+
+# listing endpoints kept in the response cache, a write under one of them clears it
+CACHED_RESOURCES = (
+    "/api/synthetics/settings/tests",
+    "/api/synthetics/settings/locations",
+    "/api/synthetics/settings/credentials",
+    "/api/events/settings/global-alert-configs/synthetics",
+)
+CACHE_TTL = 60  # seconds a cached listing is used without asking the server
+
+# fields set by the server, they are ignored when comparing a test with its update
+TEST_READ_ONLY_FIELDS = ("id", "createdAt", "modifiedAt", "createdBy", "modifiedBy", "tenantId",
+                         "locationDisplayLabels")
+
 def _status_is_200(status):
     return status == 200
 
@@ -100,6 +159,35 @@ def _status_is_404(status):
 def _status_is_429(status):
     return status == 429
 
+def deep_merge(target: dict, source: dict) -> dict:
+    """merge source into target, nested dicts are merged and other values replaced"""
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+def payload_delta(old: dict, new: dict, ignored=()) -> dict:
+    """fields of new which differ from old, None if new removed a field
+    configuration is compared field by field, other values are compared as a whole"""
+    delta = {}
+    for key in old:
+        if key not in new and key not in ignored:
+            return None
+    for key, value in new.items():
+        if key in ignored:
+            continue
+        if key == "configuration" and isinstance(value, dict) and isinstance(old.get(key), dict):
+            config_delta = payload_delta(old[key], value)
+            if config_delta is None:
+                return None
+            if config_delta:
+                delta[key] = config_delta
+        elif key not in old or old[key] != value:
+            delta[key] = value
+    return delta
+
 def show_version():
     """show synctl version"""
     print(f"synctl version: {VERSION}")
@@ -119,6 +207,10 @@ Commands:
     patch               patch a Synthetic test
     update              update a Synthetic test and smart alert
     delete              delete Synthetic tests, locations credentials and smart alert
+    plan                show the changes between test files in a directory and the server
+    apply               create, update and delete tests to match the test files in a directory
+    export              export tests, smart alerts, alert channels, credentials and locations to files
+    import              import tests and smart alerts of an export to a tenant
 
 Use "synctl <command> -h/--help" for more information about a command.
     """
@@ -146,6 +238,10 @@ COMMAND_RUN = 'run'
 COMMAND_DELETE = 'delete'
 COMMAND_PATCH = 'patch'
 COMMAND_UPDATE = 'update'
+COMMAND_PLAN = 'plan'
+COMMAND_APPLY = 'apply'
+COMMAND_EXPORT = 'export'
+COMMAND_IMPORT = 'import'
 
 CONFIG_USAGE = """synctl config {set,list,use,remove} [options]
 
@@ -157,6 +253,9 @@ RUN_USAGE = """synctl run --test <test-id> --lo <id>
 examples:
 # Run a CI-CD test
 synctl run test <test-id> --lo <loc-id> 
+
+# Run several tests and wait until they are completed, exit with error if any run fails
+synctl run test <test-id-1> <test-id-2> --lo <loc-id-1> <loc-id-2> --wait --wait-timeout 10m
 """
 
 CREATE_USAGE = """synctl create test/cred/alert [options]
@@ -188,6 +287,12 @@ synctl create test -t 4 --label "webpageaction-test" --url <url> --location <id>
 # create SSLCertificate test
 synctl create test -t 5 --label "ssl-test" --hostname <host> --port <port> --remaining-days-check 30 --location <id> 
 
+# create a test for every .json file in a directory with 10 workers, label and id are saved to id-map.json
+synctl create test --from-dir payloads/ --concurrency 10
+
+# create tests from ndjson, one payload per line
+cat tests.ndjson | synctl create test --from-ndjson - --id-map ids.json
+
 # create a credential
 synctl create cred --key MY_PASS --value password123
 
@@ -217,6 +322,12 @@ synctl get alert
 # Display metrics
 synctl get metric [options]
 
+# output all tests as ndjson, one test per line, with only some fields
+synctl get test -o ndjson --fields "id,label,configuration.url"
+
+# output all results of a test as csv
+synctl get result --test <test-id> --window-size 24h -o csv > results.csv
+
 # Estimate the size of the PoP hardware configuration
 synctl get pop-size
 
@@ -232,11 +343,26 @@ synctl patch test <syn-id> --active false
 # update frequency to 5, run test every 5min
 synctl patch test <id> --frequency 5
 
+# update several fields at once, they are sent in one request
+synctl patch test <id> --label "simple-ping" --frequency 5 --active true --location "$LOCATION1" "$LOCATION2"
+
+# show how many tests would be patched
+synctl patch test --match-regex "^ci-" --type 0 --retries 2 --dry-run
+
+# move all tests on a location to another location with 10 workers
+synctl patch test --match-location "$OLD_LOCATION" --location "$NEW_LOCATION" --concurrency 10
+
+# patch the selected tests without asking, e.g. in a CI job
+synctl patch test --match-regex "^ci-" --active true --yes
+
 # update a credential value
 synctl patch cred <cred-name> --value <value>
 
 # update a credential with multiple applications
 synctl patch cred <cred-name> --apps "$APPLICATION1" "$APPLICATION2" ...
+
+# update values of many credentials, secrets.json is {"<cred-name>": "<value>", ...}
+synctl patch cred --from-file secrets.json --concurrency 10
 """
 
 UPDATE_USAGE = """synctl update {test,alert, cred} <id> [options]
@@ -276,6 +402,11 @@ synctl update cred <cred-name> \\
 # enable/disable a smart alert
 synctl update alert <alert-id> --enable
 synctl update alert <alert-id> --disable
+
+# disable alerts of a test and alerts which name match regex, then enable them again
+synctl update alert --test <test-id> --disable --concurrency 10
+synctl update alert --match-regex "^shop-" --disable --journal shop-alerts.ndjson
+synctl update alert --restore shop-alerts.ndjson
 """
 
 DELETE_USAGE = """synctl delete {location,lo,test,cred,alert} [id...] [options]
@@ -296,14 +427,717 @@ synctl delete test --no-locations
 # delete all tests on a location
 synctl delete test --match-location <location-id>
 
+# delete tests which label match regex with 10 workers
+synctl delete test --match-regex "^ci-test-" --concurrency 10
+
 # delete a credential
 synctl delete cred <credential-name>
 
 # delete a smart alert
 synctl delete alert <alert-id>"""
 
+PLAN_USAGE = """synctl plan -d <dir> [options]
+
+examples:
+# show tests to create and update, tests are matched by id or label
+synctl plan -d tests/
+
+# also show tests on the server which have no file
+synctl plan -d tests/ --prune"""
+
+APPLY_USAGE = """synctl apply -d <dir> [options]
+
+examples:
+# create and update tests to match the files in tests/
+synctl apply -d tests/
+
+# also delete tests which have no file, with 10 workers
+synctl apply -d tests/ --prune --concurrency 10"""
+
+EXPORT_USAGE = """synctl export -o <dir> [options]
+
+examples:
+# export the tenant to backup/, only changed files are written again
+synctl export -o backup/
+
+# export the tenant to an archive
+synctl export -o backup.tar.gz"""
+
+IMPORT_USAGE = """synctl import -i <dir> [options]
+
+examples:
+# import tests and smart alerts of backup/ to the tenant of config staging
+synctl import -i backup/ --use-env staging
+
+# import an archive with 10 workers, run it again to continue an interrupted import
+synctl import -i backup.tar.gz --journal staging-journal.ndjson --concurrency 10"""
+
+
+class TokenBucket:
+    """token bucket limiter, rate is requests per second"""
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """take a token, return seconds to wait before it can be used"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class CachedBody(io.FileIO):
+    """body file of a cached streamed response, response.close() closes it even once it was read"""
+
+    def release_conn(self):
+        self.close()
+
+
+class ResponseCache:
+    """on-disk cache of listing responses under ~/.synthetic/cache/<env>/<resource>/
+
+    entries are revalidated with ETag/Last-Modified once they are older than ttl,
+    folders are created with mode 0700 and files with 0600, listings may hold scripts
+    """
+
+    def __init__(self, host: str, token: str, ttl: int = CACHE_TTL, folder: str = None) -> None:
+        if folder is None:
+            folder = os.path.join(str(Path.home()), ".synthetic", "cache")
+        # the token is part of the key, different tokens may see different tests
+        env_key = hashlib.sha256(f"{host}\n{token}".encode("utf-8")).hexdigest()[:16]
+        self.root = folder
+        self.folder = os.path.join(folder, env_key)
+        self.ttl = ttl
+
+    def __make_folder(self, folder: str):
+        """create folder and the cache folders above it, only the user can read them"""
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        # makedirs only gives the mode to the last folder, and not to an existing one
+        while len(folder) >= len(self.root):
+            os.chmod(folder, 0o700)
+            folder = os.path.dirname(folder)
+
+    def __open_private(self, file_path: str, mode: str):
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        return os.fdopen(fd, mode) if "b" in mode else os.fdopen(fd, mode, encoding="utf-8")
+
+    def __resource(self, url: str):
+        """return the cached resource a url belongs to, None if not cached"""
+        path = urlsplit(url).path.rstrip("/")
+        for resource in CACHED_RESOURCES:
+            if path == resource or path.startswith(resource + "/"):
+                return resource
+        return None
+
+    def __resource_folder(self, resource: str) -> str:
+        return os.path.join(self.folder, resource.strip("/").replace("/", "_"))
+
+    def __entry_file(self, url: str, suffix=".json"):
+        """meta data is kept in <key>.json, the response body in <key>.body"""
+        resource = self.__resource(url)
+        if resource is None:
+            return None
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.__resource_folder(resource), key + suffix)
+
+    def is_cacheable(self, method: str, url: str) -> bool:
+        """only GET of a listing, e.g. /settings/tests/, or its associations"""
+        if method.upper() != "GET" or self.__resource(url) is None:
+            return False
+        path = urlsplit(url).path.rstrip("/")
+        return path == self.__resource(url) or path.endswith("/associations")
+
+    def get(self, url: str):
+        entry_file = self.__entry_file(url)
+        if entry_file is None or not os.path.isfile(entry_file):
+            return None
+        if not os.path.isfile(self.__entry_file(url, ".body")):
+            return None
+        try:
+            with open(entry_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry) -> bool:
+        return time.time() - entry.get("stored_at", 0) < self.ttl
+
+    def put(self, url: str, response, stream=False):
+        """store a response, a streamed body is copied to disk chunk by chunk, return the entry"""
+        entry_file = self.__entry_file(url)
+        if entry_file is None:
+            return None
+        body_file = self.__entry_file(url, ".body")
+        tmp_file = f"{body_file}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            self.__make_folder(os.path.dirname(entry_file))
+            with self.__open_private(tmp_file, "wb") as f:
+                if stream:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                else:
+                    f.write(response.content)
+            os.replace(tmp_file, body_file)
+        except OSError:
+            return None
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type", "application/json"),
+            "stored_at": time.time(),
+        }
+        self.__write(entry_file, entry)
+        return entry
+
+    def touch(self, url: str, entry):
+        """the server says the entry is still valid"""
+        entry["stored_at"] = time.time()
+        self.__write(self.__entry_file(url), entry)
+
+    def __write(self, entry_file, entry):
+        try:
+            self.__make_folder(os.path.dirname(entry_file))
+            tmp_file = f"{entry_file}.{os.getpid()}.{threading.get_ident()}"
+            with self.__open_private(tmp_file, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_file, entry_file)
+        except OSError:
+            # a cache which can not be written is just a cache miss next time
+            pass
+
+    def invalidate(self, url: str):
+        """drop all cached listings of the resource url belongs to"""
+        resource = self.__resource(url)
+        if resource is None:
+            return
+        resource_folder = self.__resource_folder(resource)
+        if not os.path.isdir(resource_folder):
+            return
+        for file_name in os.listdir(resource_folder):
+            try:
+                os.remove(os.path.join(resource_folder, file_name))
+            except OSError:
+                pass
+
+    def conditional_headers(self, entry) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def to_response(self, entry, stream=False):
+        """build a response from a cached entry, with stream=True the body is read from disk lazily"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.headers["Content-Type"] = entry["content_type"]
+        response.encoding = "utf-8"
+        body_file = self.__entry_file(entry["url"], ".body")
+        if stream:
+            response.raw = CachedBody(body_file, "rb")
+        else:
+            with open(body_file, "rb") as f:
+                response._content = f.read()
+        return response
+
+
+class SyntheticTransport:
+    """keep-alive HTTP transport shared by every API client"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: int = DEFAULT_TIMEOUT) -> None:
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.max_retries = MAX_RETRIES
+        self.limiter = None
+        self.cache = None
+        self.use_cache = True
+        # the server told us to hold off until this monotonic time
+        self.pause_until = 0.0
+        self.stats_lock = threading.Lock()
+        self.throttled_time = 0.0
+        self.retries = 0
+
+    def set_pool_size(self, pool_size: int):
+        """grow the connection pool so that every worker keeps its connection"""
+        if pool_size <= self.pool_size:
+            return
+        self.pool_size = pool_size
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def set_rate_limit(self, rps: float):
+        """limit requests per second, None or 0 means no limit"""
+        self.limiter = TokenBucket(rps) if rps else None
+
+    def set_cache(self, cache: ResponseCache, use_cache=True):
+        """writes always clear the cache, use_cache=False neither reads nor stores listings (--no-cache)"""
+        self.cache = cache
+        self.use_cache = use_cache
+
+    def set_max_retries(self, max_retries: int):
+        self.max_retries = max_retries
+
+    def __wait(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+            with self.stats_lock:
+                self.throttled_time += seconds
+
+    def __header_delay(self, response):
+        """seconds to wait according to Retry-After or X-RateLimit-Reset, None if absent"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_date = parsedate_to_datetime(retry_after)
+                    return max(0.0, retry_date.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset is not None:
+            try:
+                reset = float(reset)
+            except ValueError:
+                return None
+            if reset > 1e12:
+                # epoch milliseconds
+                return max(0.0, reset / 1000 - time.time())
+            if reset > 1e9:
+                # epoch seconds
+                return max(0.0, reset - time.time())
+            return max(0.0, reset)
+        return None
+
+    def retry_delay(self, response, attempt: int) -> float:
+        """jittered exponential backoff, the server hint wins when given"""
+        backoff = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+        header_delay = self.__header_delay(response)
+        if header_delay is not None:
+            return header_delay + random.uniform(0, BACKOFF_BASE)
+        return backoff
+
+    def __should_retry(self, method: str, status_code: int) -> bool:
+        if _status_is_429(status_code):
+            return True
+        return status_code == 503 and method.upper() in IDEMPOTENT_METHODS
+
+    def __check_remaining(self, response):
+        """pause everyone once the rate limit window is used up"""
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            delay = self.__header_delay(response)
+            if delay is not None and delay <= MAX_RETRY_WAIT:
+                self.pause_until = max(self.pause_until, time.monotonic() + delay)
+
+    def request(self, method: str, url: str, token: str, verify=False, **kwargs):
+        """send a request with apiToken header, listings may be answered from the cache"""
+        if self.cache is None:
+            return self.send(method, url, token, verify=verify, **kwargs)
+
+        if not self.cache.is_cacheable(method, url) or "params" in kwargs or not self.use_cache:
+            response = self.send(method, url, token, verify=verify, **kwargs)
+            if method.upper() != "GET":
+                self.cache.invalidate(url)
+            return response
+
+        stream = kwargs.get("stream", False)
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            return self.cache.to_response(entry, stream)
+        if entry is not None:
+            headers = kwargs.pop("headers", None) or {}
+            headers.update(self.cache.conditional_headers(entry))
+            kwargs["headers"] = headers
+        response = self.send(method, url, token, verify=verify, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url, entry)
+            return self.cache.to_response(entry, stream)
+        if _status_is_200(response.status_code):
+            entry = self.cache.put(url, response, stream)
+            if entry is not None:
+                return self.cache.to_response(entry, stream)
+            if stream:
+                # the body was consumed while it could not be stored, ask again
+                kwargs.pop("headers", None)
+                return self.send(method, url, token, verify=verify, **kwargs)
+        return response
+
+    def send(self, method: str, url: str, token: str, verify=False, **kwargs):
+        """send a request with apiToken header over the pooled session, retry when throttled"""
+        headers = kwargs.pop("headers", None) or {}
+        headers["Authorization"] = f"apiToken {token}"
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self.__wait(self.pause_until - time.monotonic())
+            if self.limiter is not None:
+                self.__wait(self.limiter.reserve())
+            response = self.session.request(method, url, headers=headers, verify=verify, **kwargs)
+            self.__check_remaining(response)
+            if attempt >= self.max_retries or not self.__should_retry(method, response.status_code):
+                return response
+            delay = self.retry_delay(response, attempt)
+            if delay > MAX_RETRY_WAIT:
+                return response
+            # release the connection before trying again
+            response.close()
+            attempt += 1
+            with self.stats_lock:
+                self.retries += 1
+            self.__wait(delay)
+
+    def print_throttle_summary(self):
+        if self.retries > 0 or self.throttled_time > 0:
+            print(f"throttled: {self.retries} retries, time waited: {round(self.throttled_time * 1000, 3)}ms",
+                  file=sys.stderr)
+
+    def close(self):
+        self.session.close()
+
+
+class BulkReport:
+    """collect status code and latency of each request in a bulk operation"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.status_count = {}
+        self.latency = []
+        self.start_time = time.time()
+        self.end_time = None
+
+    def add(self, status_code, latency: float):
+        with self.lock:
+            self.status_count[status_code] = self.status_count.get(status_code, 0) + 1
+            self.latency.append(latency)
+
+    def finish(self):
+        self.end_time = time.time()
+
+    def print_progress(self, total: int, action="done"):
+        """show done/total and throughput on stderr, on one line in a terminal, every 10% otherwise"""
+        with self.lock:
+            done = len(self.latency)
+            is_tty = sys.stderr.isatty()
+            if not is_tty and done != total and done % max(1, total // 10) != 0:
+                return
+            rate = round(done / self.elapsed(), 2) if self.elapsed() > 0 else 0
+            end = "\r" if is_tty and done < total else "\n"
+            sys.stderr.write(f"{action} {done}/{total}, {rate} {action}/s{end}")
+            sys.stderr.flush()
+
+    def total(self) -> int:
+        return len(self.latency)
+
+    def succeeded(self) -> int:
+        return sum(n for status, n in self.status_count.items()
+                   if isinstance(status, int) and 200 <= status < 300)
+
+    def percentile(self, p: float) -> float:
+        """nearest-rank percentile of latency in seconds"""
+        if len(self.latency) == 0:
+            return 0.0
+        ordered = sorted(self.latency)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def elapsed(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return end_time - self.start_time
+
+    def print_report(self, action="deleted"):
+        total_time = round(self.elapsed() * 1000, 3)
+        succeeded = self.succeeded()
+        print(f"total {action}: {succeeded}, failed: {self.total() - succeeded}, time used: {total_time}ms")
+        if self.total() == 0:
+            return
+        status_list = ", ".join(f"{status}: {n}" for status, n in sorted(self.status_count.items(), key=lambda x: str(x[0])))
+        print(f"status code: {status_list}")
+        rate = round(succeeded / self.elapsed(), 2) if self.elapsed() > 0 else 0
+        print(f"latency p50: {round(self.percentile(50) * 1000, 3)}ms, "
+              f"p95: {round(self.percentile(95) * 1000, 3)}ms, "
+              f"throughput: {rate} {action}/s")
+
+
+class FetchGraph:
+    """requests of a command, a fetch starts once the fetches it depends on are done,
+    fetches which do not depend on each other run at the same time"""
+
+    def __init__(self) -> None:
+        self.nodes = {}
+
+    def add(self, key, func, depends_on=()):
+        """func gets the results of depends_on as arguments, a key which is added again is fetched once"""
+        for dependency in depends_on:
+            if dependency not in self.nodes:
+                raise ValueError(f"{key} depends on {dependency}, add {dependency} first")
+        if key not in self.nodes:
+            self.nodes[key] = (func, tuple(depends_on))
+        return self
+
+    def run(self) -> dict:
+        """return {key: result}, the wall time is the longest chain of fetches"""
+        if len(self.nodes) <= 1:
+            return {key: func() for key, (func, _) in self.nodes.items()}
+        futures = {}
+
+        def run_node(key):
+            func, depends_on = self.nodes[key]
+            return func(*[futures[dependency].result() for dependency in depends_on])
+
+        # one worker per fetch, a fetch waiting for its dependencies never blocks another one
+        with ThreadPoolExecutor(max_workers=len(self.nodes)) as executor:
+            for key in self.nodes:
+                futures[key] = executor.submit(run_node, key)
+            return {key: future.result() for key, future in futures.items()}
+
+
+def index_by(items, key=lambda item: item["id"]) -> dict:
+    """{key(item): item}, the first item wins when a key repeats"""
+    index = {}
+    for item in items:
+        index.setdefault(key(item), item)
+    return index
+
+
+class ResourceIndex:
+    """summaries of tests and locations by id, the printers join a summary
+    to each row with a dict lookup, so n rows and m summaries are O(n + m)"""
+
+    def __init__(self, test_summaries=None, location_summaries=None) -> None:
+        # get_summary_list already returns {test id: summary}
+        self.test_summaries = test_summaries or {}
+        self.location_summaries = index_by(location_summaries or [])
+
+    def summary_of_test(self, test_id, default=None):
+        return self.test_summaries.get(test_id, default)
+
+    def summary_of_location(self, location_id, default=None):
+        return self.location_summaries.get(location_id, default)
+
+
+def get_field(record, path, default=None):
+    """value of a dotted path such as configuration.url, a number indexes a list"""
+    value = record
+    for key in path.split("."):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return default
+    return value
+
+
+class RecordWriter:
+    """write records to a stream as json, ndjson or csv
+
+    records are written as they come and buffered, the buffer goes to the
+    stream when it is full or when a page is done, so a reader such as jq
+    gets the first records before the listing is finished
+    """
+
+    def __init__(self, output_format, fields=None, stream=None, buffer_size=OUTPUT_BUFFER_SIZE) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format {output_format}, supported: {', '.join(OUTPUT_FORMATS)}")
+        self.output_format = output_format
+        self.fields = fields
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.buffer = io.StringIO()
+        self.csv_writer = csv.writer(self.buffer, lineterminator="\n")
+        self.count = 0
+
+    @staticmethod
+    def parse_fields(fields_arg):
+        """--fields "id,label,configuration.url" to a list, None keeps all fields"""
+        if fields_arg is None:
+            return None
+        fields = [x.strip() for x in fields_arg.split(",") if x.strip() != ""]
+        return fields if len(fields) > 0 else None
+
+    def project(self, record) -> dict:
+        """keep the fields of --fields, a dotted field keeps its nesting"""
+        if self.fields is None:
+            return record
+        projected = {}
+        for path in self.fields:
+            value = get_field(record, path)
+            keys = path.split(".")
+            target = projected
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+        return projected
+
+    def __csv_cell(self, value):
+        if value is None:
+            return ""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def write(self, record):
+        if self.output_format == "csv":
+            if self.fields is None:
+                # without --fields the columns are the keys of the first record
+                self.fields = list(record.keys())
+            if self.count == 0:
+                self.csv_writer.writerow(self.fields)
+            self.csv_writer.writerow([self.__csv_cell(get_field(record, x)) for x in self.fields])
+        elif self.output_format == "ndjson":
+            self.buffer.write(json.dumps(self.project(record)))
+            self.buffer.write("\n")
+        else:
+            self.buffer.write("[\n" if self.count == 0 else ",\n")
+            self.buffer.write(json.dumps(self.project(record)))
+        self.count += 1
+        if self.buffer.tell() >= self.buffer_size:
+            self.flush()
+
+    def write_page(self, records):
+        """write the records of a page, then flush"""
+        for record in records:
+            self.write(record)
+        self.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        self.close()
+
+    def flush(self):
+        try:
+            if self.buffer.tell() > 0:
+                self.stream.write(self.buffer.getvalue())
+                self.buffer.seek(0)
+                self.buffer.truncate()
+            self.stream.flush()
+        except BrokenPipeError:
+            # the reader, e.g. head, is done, stop quietly
+            if self.stream is sys.stdout:
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(NORMAL_CODE)
+
+    def close(self):
+        if self.output_format == "json":
+            self.buffer.write("[]\n" if self.count == 0 else "\n]\n")
+        self.flush()
+
+
+class TableWriter:
+    """write a table of padded columns to a stream, rows are buffered and written in large chunks
+
+    columns is a list of (title, width). A width of None is computed from the
+    title and the first sample_size rows, up to max_width, longer cells of that
+    column are cut so rows written after the sample stay aligned. Cells of a
+    fixed width column are padded like fill_space, a width of 0 is not padded.
+    """
+
+    def __init__(self, columns, stream=None, sample_size=1000, min_width=10, max_width=60,
+                 buffer_size=OUTPUT_BUFFER_SIZE) -> None:
+        self.titles = [title for title, _ in columns]
+        self.widths = [width for _, width in columns]
+        self.stream = stream if stream is not None else sys.stdout
+        self.sample_size = sample_size
+        self.min_width = min_width
+        self.max_width = max_width
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered_size = 0
+        self.sample = []
+        self.row_format = None
+        self.count = 0
+
+    def __start(self):
+        """fix the widths of sampled columns, then write the title and the sampled rows"""
+        formats = []
+        for i, width in enumerate(self.widths):
+            if width is None:
+                width = max([len(self.titles[i]), self.min_width] + [len(str(row[i])) for row in self.sample])
+                width = min(width, self.max_width)
+                formats.append(f"{{!s:<{width}.{width}}}")
+            else:
+                formats.append(f"{{!s:<{width}}}" if width > 0 else "{!s}")
+            self.widths[i] = width
+        self.row_format = " ".join(formats) + "\n"
+        self.buffer.append(self.row_format.format(*self.titles))
+        sample, self.sample = self.sample, []
+        for row in sample:
+            self.__append(row)
+
+    def __append(self, row):
+        line = self.row_format.format(*row)
+        self.buffer.append(line)
+        self.buffered_size += len(line)
+        if self.buffered_size >= self.buffer_size:
+            self.flush()
+
+    def write_row(self, row):
+        self.count += 1
+        if self.row_format is None:
+            self.sample.append(row)
+            if len(self.sample) >= self.sample_size:
+                self.__start()
+        else:
+            self.__append(row)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def write_page(self, rows):
+        """write the rows of a page, then flush unless the widths are still sampled"""
+        self.write_rows(rows)
+        if self.row_format is not None:
+            self.flush()
+
+    def flush(self):
+        try:
+            if len(self.buffer) > 0:
+                self.stream.write("".join(self.buffer))
+                self.buffer = []
+                self.buffered_size = 0
+            self.stream.flush()
+        except BrokenPipeError:
+            # the reader, e.g. head, is done, stop quietly
+            if self.stream is sys.stdout:
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(NORMAL_CODE)
+
+    def close(self) -> int:
+        """write what is left, return the number of rows"""
+        if self.row_format is None:
+            self.__start()
+        self.flush()
+        return self.count
+
 
 class Base:
+    # one transport for the whole process, so every command reuses connections
+    _transport = None
+    _transport_lock = threading.Lock()
+    # run_bulk workers print through print_line, so their lines do not interleave
+    _print_lock = threading.Lock()
 
     def __init__(self) -> None:
         self.auth = {
@@ -311,6 +1145,27 @@ class Base:
             "token": ""
         }
         self.insecure = False
+        self.concurrency = DEFAULT_CONCURRENCY
+
+    def get_transport(self) -> SyntheticTransport:
+        """return the shared transport, create it on first use"""
+        if Base._transport is None:
+            with Base._transport_lock:
+                if Base._transport is None:
+                    Base._transport = SyntheticTransport()
+        return Base._transport
+
+    def request(self, method: str, url: str, **kwargs):
+        """send an API request, exit on connection errors"""
+        host = self.auth["host"]
+        self.check_host_and_token(host, self.auth["token"])
+        kwargs.setdefault("verify", self.insecure)
+        try:
+            return self.get_transport().request(method, url, self.auth["token"], **kwargs)
+        except requests.Timeout as timeout_error:
+            self.exit_synctl(ERROR_CODE, f"Connection to {host} timed out, error is {timeout_error}")
+        except requests.ConnectionError as connect_error:
+            self.exit_synctl(ERROR_CODE, f"Connection to {host} failed, error is {connect_error}")
 
     def set_auth(self, auth: dict):
         """set auth"""
@@ -406,6 +1261,136 @@ class Base:
 
         return time_int * time_to_ms[unit]
 
+    def set_concurrency(self, concurrency=DEFAULT_CONCURRENCY):
+        """number of workers used by bulk operations"""
+        if concurrency is None:
+            return
+        if concurrency < 1:
+            self.exit_synctl(ERROR_CODE, "--concurrency should be greater than 0")
+        self.concurrency = concurrency
+        self.get_transport().set_pool_size(concurrency + PAGE_WORKERS)
+
+    def run_bulk(self, func, items, concurrency=None, progress=None):
+        """call func(item) for every item with a pool of workers, func returns a status code
+
+        the status codes and latency of every call are collected into a BulkReport,
+        with progress=<action> the progress is shown while running
+        """
+        concurrency = self.concurrency if concurrency is None else concurrency
+        report = BulkReport()
+
+        def run_one(item):
+            start_time = time.time()
+            status_code = func(item)
+            report.add(status_code, time.time() - start_time)
+            if progress is not None:
+                report.print_progress(len(items), progress)
+            return status_code
+
+        if concurrency <= 1 or len(items) <= 1:
+            for item in items:
+                run_one(item)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(run_one, item) for item in items]
+                for future in futures:
+                    future.result()
+        report.finish()
+        return report
+
+    def print_line(self, *args):
+        """print one line, it is not mixed with lines printed by other run_bulk workers"""
+        with Base._print_lock:
+            print(*args)
+
+    def get_all_pages(self, fetch_page, page_size=200, workers=PAGE_WORKERS):
+        """yield every page in order, page 1 tells totalHits, the rest are fetched concurrently
+
+        fetch_page(page) returns the json of a page, at most `workers` pages are
+        in flight or buffered, so memory does not grow with the number of pages
+        """
+        first_page = fetch_page(1)
+        if first_page is None:
+            return
+        yield first_page
+
+        total_hits = first_page.get("totalHits", 0)
+        page_size = first_page.get("pageSize") or page_size
+        total_pages = math.ceil(total_hits / page_size) if page_size > 0 else 1
+        if total_pages <= 1:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(workers, total_pages - 1)) as executor:
+            pending = deque()
+            next_page = 2
+            while next_page <= total_pages and len(pending) < workers:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+            try:
+                while pending:
+                    page_result = pending.popleft().result()
+                    if next_page <= total_pages:
+                        pending.append(executor.submit(fetch_page, next_page))
+                        next_page += 1
+                    if page_result is not None:
+                        yield page_result
+            finally:
+                # consumer stopped early, drop pages not started yet
+                for future in pending:
+                    future.cancel()
+
+    def iter_json_array(self, chunks):
+        """parse a json array from byte chunks and yield its items one by one
+
+        only the item being parsed is buffered, a json object instead of an
+        array is yielded as a single item
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        chunks = iter(chunks)
+        buffer = ""
+        pos = 0
+        in_array = None
+        eof = False
+        # a failed parse is retried once the buffer doubled, keeps large items linear
+        next_try = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if in_array is None:
+                    in_array = buffer[pos] == "["
+                    if in_array:
+                        pos += 1
+                        continue
+                elif in_array and buffer[pos] == "]":
+                    return
+                if eof or len(buffer) >= next_try:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                    except ValueError:
+                        if eof:
+                            raise
+                        next_try = len(buffer) * 2
+                    else:
+                        # a number at the end of the buffer may continue in the next chunk
+                        if end < len(buffer) or eof:
+                            yield item
+                            if not in_array:
+                                return
+                            buffer = buffer[end:]
+                            pos = 0
+                            next_try = 0
+                            continue
+            elif eof:
+                return
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+                buffer += text_decoder.decode(b"", final=True)
+            else:
+                buffer += text_decoder.decode(chunk)
+
     def exit_synctl(self, error_code=-1, message=''):
         """exit synctl"""
         if message != '':
@@ -1556,6 +2541,9 @@ class SyntheticConfiguration(Base):
         except FileNotFoundError as not_found_e:
             self.exit_synctl(ERROR_CODE, not_found_e)
 
+    def loads_from_dict(self, test_config: dict):
+        self.syn_test_config = test_config
+
     def is_zip_file(self, file_name):
         """check zip file name"""
         if file_name is not None and isinstance(file_name, str):
@@ -1637,99 +2625,59 @@ class SyntheticCredential(Base):
 
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         credential = self.retrieve_credentials()
 
         create_url = f"{host}/api/synthetics/settings/credentials/"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            if cred_key not in credential:
-                create_cred_res = requests.post(create_url,
-                                                headers=headers,
-                                                data=cred_payload,
-                                                timeout=60,
-                                                verify=self.insecure)
-                if _status_is_201(create_cred_res.status_code):
-                    print(f"credential \"{cred_key}\" created")
-                elif _status_is_400(create_cred_res.status_code):
-                    print(f'Create Error: {create_cred_res}\n',
-                          create_cred_res.json())
-                else:
-                    print('Create credential failed, status code:',
-                          create_cred_res.status_code)
+        if cred_key not in credential:
+            create_cred_res = self.request("POST", create_url, data=cred_payload)
+            if _status_is_201(create_cred_res.status_code):
+                print(f"credential \"{cred_key}\" created")
+            elif _status_is_400(create_cred_res.status_code):
+                print(f'Create Error: {create_cred_res}\n',
+                      create_cred_res.json())
             else:
-                print("Credential already exists")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                print('Create credential failed, status code:',
+                      create_cred_res.status_code)
+        else:
+            print("Credential already exists")
 
     def retrieve_credentials(self, show_details=False):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/synthetics/settings/credentials/"
         if show_details is True:
             retrieve_url = f"{host}/api/synthetics/settings/credentials/associations"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            cred_result = requests.get(retrieve_url,
-                                       headers=headers,
-                                       timeout=60,
-                                       verify=self.insecure)
-
-            if _status_is_200(cred_result.status_code):
-                if len(cred_result.content) == 0:
-                    return {}
-                else:
-                    data = json.loads(cred_result.content.decode())
-                    return data
+        cred_result = self.request("GET", retrieve_url)
+
+        if _status_is_200(cred_result.status_code):
+            if len(cred_result.content) == 0:
+                return {}
             else:
-                self.exit_synctl(ERROR_CODE, f'get cred failed, status code: {cred_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                data = json.loads(cred_result.content.decode())
+                return data
+        else:
+            self.exit_synctl(ERROR_CODE, f'get cred failed, status code: {cred_result.status_code}')
 
     def retrieve_a_credential(self, cred):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/synthetics/settings/credentials/associations/{cred}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            cred_result = requests.get(retrieve_url,
-                                       headers=headers,
-                                       timeout=60,
-                                       verify=self.insecure)
-
-            if _status_is_200(cred_result.status_code):
-                if len(cred_result.content) == 0:
-                    return {}
-                else:
-                    data = json.loads(cred_result.content.decode())
-                    return data
+        cred_result = self.request("GET", retrieve_url)
+
+        if _status_is_200(cred_result.status_code):
+            if len(cred_result.content) == 0:
+                return {}
             else:
-                self.exit_synctl(ERROR_CODE, f'get cred failed, status code: {cred_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                data = json.loads(cred_result.content.decode())
+                return data
+        else:
+            self.exit_synctl(ERROR_CODE, f'get cred failed, status code: {cred_result.status_code}')
 
     def delete_a_credential(self, cred):
         """Delete a credential"""
@@ -1740,52 +2688,44 @@ class SyntheticCredential(Base):
 
         credential = self.retrieve_credentials()
 
+        if cred in credential:
+            return self.__delete_a_credential(cred)
+        else:
+            self.exit_synctl(ERROR_CODE, f"no credential {cred}")
+
+    def __delete_a_credential(self, cred):
         host = self.auth["host"]
-        token = self.auth["token"]
 
         delete_url = f"{host}/api/synthetics/settings/credentials/{cred}"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            if cred in credential:
-                delete_res = requests.delete(delete_url,
-                                             headers=headers,
-                                             timeout=60,
-                                             verify=self.insecure)
-                if _status_is_204(delete_res.status_code):
-                    print(f'credential \"{cred}\" deleted')
-                elif _status_is_429(delete_res.status_code):
-                    print(TOO_MANY_REQUEST_ERROR)
-                else:
-                    print(
-                        f"Fail to delete {cred}, status code {delete_res.status_code}")
-            else:
-                self.exit_synctl(ERROR_CODE, f"no credential {cred}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        delete_res = self.request("DELETE", delete_url)
+        if _status_is_204(delete_res.status_code):
+            self.print_line(f'credential \"{cred}\" deleted')
+        elif _status_is_429(delete_res.status_code):
+            self.print_line(TOO_MANY_REQUEST_ERROR)
+        else:
+            self.print_line(
+                f"Fail to delete {cred}, status code {delete_res.status_code}")
+        return delete_res.status_code
 
     def delete_credentials(self, cred_list):
+        """check the names with one listing, then delete with --concurrency workers"""
         if cred_list is None:
             cred_list = []
         if len(cred_list) == 0:
             self.exit_synctl(ERROR_CODE, "no credential to delete")
-        start_time = time.time()
-        total_number = 0
-        for cred in cred_list:
-            self.delete_a_credential(cred)
-            total_number += 1
-        end_time = time.time()
-        total_time = round((end_time-start_time)*1000, 3)
-        print(f"total deleted: {total_number}, time used: {total_time}ms")
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        credential = self.retrieve_credentials()
+        missing = [cred for cred in cred_list if cred not in credential]
+        for cred in missing:
+            print(f"no credential {cred}")
+        report = self.run_bulk(self.__delete_a_credential, [cred for cred in cred_list if cred in credential])
+        report.print_report("deleted")
+        if len(missing) > 0:
+            sys.exit(ERROR_CODE)
 
     def update_a_credential(self, cred):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if cred is None:
             self.exit_synctl(ERROR_CODE, "credential should not be empty")
             return
@@ -1793,31 +2733,18 @@ class SyntheticCredential(Base):
         cred_payload = self.payload
         put_url = f"{host}/api/synthetics/settings/credentials/{cred}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            update_result = requests.put(put_url,
-                                         headers=headers,
-                                         data=cred_payload,
-                                         timeout=60,
-                                         verify=self.insecure)
-
-            if _status_is_200(update_result.status_code):
-                print(f"cred {cred} updated")
-            elif _status_is_400(update_result.status_code):
-                print(f'Error: {update_result}', update_result.content)
-            elif _status_is_429(update_result.status_code):
-                print(update_result.content)
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'update cred {cred} failed, status code: {update_result.status_code, }')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        update_result = self.request("PUT", put_url, data=cred_payload)
+
+        if _status_is_200(update_result.status_code):
+            print(f"cred {cred} updated")
+        elif _status_is_400(update_result.status_code):
+            print(f'Error: {update_result}', update_result.content)
+        elif _status_is_429(update_result.status_code):
+            print(update_result.content)
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'update cred {cred} failed, status code: {update_result.status_code, }')
 
 
 
@@ -1860,10 +2787,9 @@ class SyntheticCredential(Base):
     def __patch_a_credential(self, cred, data):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         if cred is None:
-            print("credential should not be empty")
+            self.print_line("credential should not be empty")
             return
 
         patch_url = f"{host}/api/synthetics/settings/credentials/{cred}"
@@ -1871,30 +2797,46 @@ class SyntheticCredential(Base):
         if data is None:
             self.exit_synctl(ERROR_CODE, "Patch Error:data cannot be empty")
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
+        patch_result = self.request("PATCH", patch_url, data=data)
+
+        if _status_is_200(patch_result.status_code):
+            self.print_line(f"{cred} updated")
+        elif _status_is_400(patch_result.status_code):
+            self.print_line(f'Patch Error: {patch_result}', patch_result.json())
+        elif _status_is_429(patch_result.status_code):
+            self.print_line(TOO_MANY_REQUEST_ERROR)
+        else:
+            self.print_line(
+                f'patch credential {cred} failed, status code: {patch_result.status_code}')
+        return patch_result.status_code
+
+    def load_credential_values(self, file_name):
+        """read {credential name: value} from a json file"""
         try:
-            patch_result = requests.patch(patch_url,
-                                          headers=headers,
-                                          data=data,
-                                          timeout=60,
-                                          verify=self.insecure)
-
-            if _status_is_200(patch_result.status_code):
-                print(f"{cred} updated")
-            elif _status_is_400(patch_result.status_code):
-                print(f'Patch Error: {patch_result}', patch_result.json())
-            elif _status_is_429(patch_result.status_code):
-                print(TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'patch test {cred} failed, status code: {patch_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+            with open(file_name, "r", encoding="utf-8") as json_file:
+                values = json.load(json_file)
+        except (OSError, ValueError) as e:
+            self.exit_synctl(ERROR_CODE, f"cannot read {file_name}, {e}")
+        if not isinstance(values, dict) or not all(isinstance(v, str) for v in values.values()):
+            self.exit_synctl(ERROR_CODE, f"{file_name} should be a json object of credential name and value")
+        return values
+
+    def patch_credential_values(self, values: dict):
+        """set the value of every credential in values with --concurrency workers,
+        names are checked with one listing, unknown credentials are not created"""
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        credential = self.retrieve_credentials()
+        missing = sorted(cred for cred in values if cred not in credential)
+        for cred in missing:
+            print(f"no credential {cred}, skipped")
+
+        def patch_value(cred):
+            return self.__patch_a_credential(cred, json.dumps({"credentialValue": values[cred]}))
+
+        report = self.run_bulk(patch_value, sorted(cred for cred in values if cred in credential), progress="patched")
+        report.print_report("patched")
+        if len(missing) > 0 or report.succeeded() < report.total():
+            sys.exit(ERROR_CODE)
 
     def __get_max_cred_length(self, cred_list, max_len=60):
         label_len = 0
@@ -2007,6 +2949,16 @@ class RunNowConfiguration(Base):
             self.exit_synctl(ERROR_CODE, "Error: no synthetic location, set --lo <loc-id> at least a synthetic location")
         return json.dumps([self.runNow_config])
 
+    def get_json_for_tests(self, test_ids: list):
+        """return payload to run several tests with the same customization"""
+        self.get_json()
+        payload = []
+        for test_id in test_ids:
+            test_config = copy.deepcopy(self.runNow_config)
+            test_config["testId"] = test_id
+            payload.append(test_config)
+        return json.dumps(payload)
+
 
 class SmartAlertConfiguration(Base):
     def __init__(self):
@@ -2129,32 +3081,20 @@ class SyntheticLocation(Base):
         else:
             request_url = f"{host}/api/synthetics/settings/locations/{location_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            retrieve_res = requests.get(request_url,
-                                        headers=headers,
-                                        timeout=60,
-                                        verify=self.insecure)
+        retrieve_res = self.request("GET", request_url)
 
-            if _status_is_200(retrieve_res.status_code):
-                data = retrieve_res.json()
+        if _status_is_200(retrieve_res.status_code):
+            data = retrieve_res.json()
 
-                if isinstance(data, dict):
-                    return [data]
-                else:
-                    return data
-            elif _status_is_429(retrieve_res.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+            if isinstance(data, dict):
+                return [data]
             else:
-                self.exit_synctl(ERROR_CODE,
-                    f"Failed to get locations, status code {retrieve_res.status_code}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                return data
+        elif _status_is_429(retrieve_res.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE,
+                f"Failed to get locations, status code {retrieve_res.status_code}")
 
     def get_location_summary_list(self,  page=1, page_size=200, window_size=60*60*1000):
         """curl --request POST 'http://{host}/api/synthetics/results/locationsummarylist'
@@ -2176,10 +3116,6 @@ class SyntheticLocation(Base):
         token = self.auth["token"]
         self.check_host_and_token(host, token)
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
 
         summary_config = {
             "pagination": {
@@ -2192,51 +3128,26 @@ class SyntheticLocation(Base):
             }
         }
         request_url = f"{host}/api/synthetics/results/locationsummarylist"
-        try:
-            retrieve_res = requests.post(request_url,
-                                         headers=headers,
-                                         data=json.dumps(summary_config),
-                                         timeout=60,
-                                         verify=self.insecure)
-
-            if _status_is_200(retrieve_res.status_code):
-                data = retrieve_res.json()
-                return data
-            else:
-                print('retrieve location summary list failed, status code:',
-                      retrieve_res.status_code)
-                return None
-        except requests.exceptions.Timeout:
-            print("retrieve location summary list failed")
-        except requests.exceptions.RequestException as e:
-            print(f"Error: {e}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
-        return None
+        retrieve_res = self.request("POST", request_url, data=json.dumps(summary_config))
 
-    def get_all_location_summary_list(self,  page=1):
-        total_hits = 0
-        summary_result = self.get_location_summary_list()
-        if summary_result is not None:
-            page = summary_result["page"] if page in summary_result else 1
-            page_size = summary_result["pageSize"] if "pageSize" in summary_result else 200
-            if "totalHits" in summary_result:
-                total_hits = summary_result["totalHits"]
-
-            if page_size >= total_hits:
-                return summary_result
-            else:
-                total_pages = total_hits/page_size
-                if (total_pages - round(total_pages)) > 0:
-                    total_pages += 1
-                for x in range(1, round(total_pages)):
-                    summary_result = self.get_location_summary_list(page=x+1)
-                return summary_result
+        if _status_is_200(retrieve_res.status_code):
+            data = retrieve_res.json()
+            return data
         else:
+            print('retrieve location summary list failed, status code:',
+                  retrieve_res.status_code)
             return None
 
+    def get_all_location_summary_list(self,  page=1):
+        """get location summary of all pages, items are merged into the first page"""
+        summary_result = None
+        for page_result in self.get_all_pages(lambda x: self.get_location_summary_list(page=x)):
+            if summary_result is None:
+                summary_result = page_result
+            elif "items" in page_result:
+                summary_result["items"].extend(page_result["items"])
+        return summary_result
+
     def __get_max_lo_label_length(self, loc_list, max_len=60):
         label_len = 15
         display_label_len = 15
@@ -2278,37 +3189,27 @@ class SyntheticLocation(Base):
     def __delete_a_synthetic_location(self, location_id=""):
         """delete a Synthetic location"""
         if location_id == "":
-            print("location id should not be empty")
+            self.print_line("location id should not be empty")
             return
         self.check_host_and_token(self.auth["host"], self.auth["token"])
 
         host = self.auth["host"]
 
         delete_url = f"{host}/api/synthetics/settings/locations/{location_id}"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "apiToken %s" % (self.auth["token"])
-        }
-        try:
-            r = requests.delete(delete_url,
-                                headers=headers,
-                                timeout=60,
-                                verify=self.insecure)
-
-            if _status_is_204(r.status_code):
-                print(f'location \"{location_id}\" deleted')
-            elif _status_is_404(r.status_code):
-                print(f"{location_id} not found")
-            elif _status_is_429(r.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(f"Fail to delete {location_id}, status code {r.status_code}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        r = self.request("DELETE", delete_url)
+
+        if _status_is_204(r.status_code):
+            self.print_line(f'location \"{location_id}\" deleted')
+        elif _status_is_404(r.status_code):
+            self.print_line(f"{location_id} not found")
+        elif _status_is_429(r.status_code):
+            self.print_line(f"Fail to delete {location_id}, {TOO_MANY_REQUEST_ERROR}")
+        else:
+            self.print_line(f"Fail to delete {location_id}, status code {r.status_code}")
+        return r.status_code
 
     def delete_synthetic_locations(self, locations_list):
+        """delete locations with --concurrency workers"""
         if locations_list is None:
             locations_list = []
 
@@ -2316,8 +3217,8 @@ class SyntheticLocation(Base):
             print("no locations to delete")
             return
 
-        for l in locations_list:
-            self.__delete_a_synthetic_location(l)
+        report = self.run_bulk(self.__delete_a_synthetic_location, locations_list)
+        report.print_report("deleted")
 
     def print_synthetic_locations(self, locations, locations_summary):
         if locations is None:
@@ -2342,20 +3243,21 @@ class SyntheticLocation(Base):
               self.fill_space("No. of Tests".upper(), no_of_tests_length),
               "Description".upper())
         if len(pop_data) > 0 and pop_locations_summary is not None:
+            index = ResourceIndex(location_summaries=pop_locations_summary['items'])
             for pop in pop_data:
-                for _, POP in enumerate(pop_locations_summary['items']):
-                    if pop["id"] == POP['id']:
-                        print(self.fill_space(pop["id"], id_length),
-                              self.fill_space(pop['label'], label_length),
-                              self.fill_space(pop['displayLabel'],
-                                              display_label_length),
-                              self.fill_space(pop['locationType'], loc_type_length),
-                              self.fill_space(pop['popVersion'], pop_version_length),
-                              self.fill_space(
-                                  pop['status'], status_length),
-                              self.fill_space(
-                                  str(POP['linkedTests']), no_of_tests_length),
-                              pop["description"])
+                POP = index.summary_of_location(pop["id"])
+                if POP is not None:
+                    print(self.fill_space(pop["id"], id_length),
+                          self.fill_space(pop['label'], label_length),
+                          self.fill_space(pop['displayLabel'],
+                                          display_label_length),
+                          self.fill_space(pop['locationType'], loc_type_length),
+                          self.fill_space(pop['popVersion'], pop_version_length),
+                          self.fill_space(
+                              pop['status'], status_length),
+                          self.fill_space(
+                              str(POP['linkedTests']), no_of_tests_length),
+                          pop["description"])
         elif pop_locations_summary is None:
             for pop in pop_data:
                 print(self.fill_space(pop["id"], id_length),
@@ -2386,32 +3288,20 @@ class SyntheticDatacenter(Base):
         else:
             request_url = f"{host}/api/synthetics/settings/datacenters/{datacenter_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            retrieve_res = requests.get(request_url,
-                                        headers=headers,
-                                        timeout=60,
-                                        verify=self.insecure)
+        retrieve_res = self.request("GET", request_url)
 
-            if _status_is_200(retrieve_res.status_code):
-                data = retrieve_res.json()
+        if _status_is_200(retrieve_res.status_code):
+            data = retrieve_res.json()
 
-                if isinstance(data, dict):
-                    return [data]
-                else:
-                    return data
-            elif _status_is_429(retrieve_res.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+            if isinstance(data, dict):
+                return [data]
             else:
-                self.exit_synctl(ERROR_CODE,
-                                 f"Failed to get datacenters, status code {retrieve_res.status_code}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                return data
+        elif _status_is_429(retrieve_res.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE,
+                             f"Failed to get datacenters, status code {retrieve_res.status_code}")
 
     def print_a_datacenter_details(self, single_datacenter, show_json=False, show_details=False,):
         if single_datacenter is None or len(single_datacenter) == 0:
@@ -2569,36 +3459,22 @@ class SyntheticMetric(Base):
     def retreive_synthetic_metrics(self, metrics, page=1, page_size=200, window_size=60*60*1000):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         metrics_payload = metrics.get_json()
         retrieve_url = f"{host}/api/synthetics/metrics/"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            retrieve_metric = requests.post(retrieve_url,
-                                       headers=headers,
-                                       data=metrics_payload,
-                                       timeout=60,
-                                       verify=self.insecure)
-
-            if _status_is_200(retrieve_metric.status_code):
-                # extracting data in json format
-                data = retrieve_metric.json()
-                return data
-            elif _status_is_429(retrieve_metric.status_code):
-                self.exit_synctl(-1, TOO_MANY_REQUEST_ERROR)
-            else:
-                print('Retrieve metric failed, status code:', retrieve_metric.status_code)
-                if retrieve_metric.text:
-                    print(retrieve_metric.text)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        retrieve_metric = self.request("POST", retrieve_url, data=metrics_payload)
+
+        if _status_is_200(retrieve_metric.status_code):
+            # extracting data in json format
+            data = retrieve_metric.json()
+            return data
+        elif _status_is_429(retrieve_metric.status_code):
+            self.exit_synctl(-1, TOO_MANY_REQUEST_ERROR)
+        else:
+            print('Retrieve metric failed, status code:', retrieve_metric.status_code)
+            if retrieve_metric.text:
+                print(retrieve_metric.text)
 
     def  print_metrics(self, metrics):
         if metrics is None:
@@ -2625,6 +3501,49 @@ class SyntheticMetric(Base):
             print(row)
 
 
+class SyntheticTestSummary:
+    """compact record of a test in a listing, keeps only the fields shown by `synctl get test`
+
+    supports test["label"] and test["configuration"]["url"] like the full payload,
+    so it can be passed to the same printers
+    """
+    __slots__ = ("id", "label", "active", "testFrequency", "locations",
+                 "locationDisplayLabels", "syntheticType", "url", "hostname")
+
+    def __init__(self, test: dict) -> None:
+        configuration = test.get("configuration") or {}
+        self.id = test.get("id")
+        self.label = test.get("label", "")
+        self.active = test.get("active")
+        self.testFrequency = test.get("testFrequency")
+        self.locations = test.get("locations") or []
+        self.locationDisplayLabels = test.get("locationDisplayLabels") or []
+        self.syntheticType = configuration.get("syntheticType")
+        self.url = configuration.get("url")
+        self.hostname = configuration.get("hostname")
+
+    def __getitem__(self, key):
+        if key == "configuration":
+            configuration = {"syntheticType": self.syntheticType}
+            if self.url is not None:
+                configuration["url"] = self.url
+            if self.hostname is not None:
+                configuration["hostname"] = self.hostname
+            return configuration
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == "configuration" or key in self.__slots__
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
 class SyntheticTest(Base):
     """create, query, update and delete Synthetic test"""
 
@@ -2653,232 +3572,335 @@ class SyntheticTest(Base):
     def run_now_test(self, payload):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         run_now_url = f"{host}/api/synthetics/settings/tests/ci-cd"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
 
-        try:
-            run_now_result = requests.post(run_now_url,
-                                           headers=headers,
-                                           data=payload,
-                                           timeout=60,
-                                           verify=self.insecure)
-
-            if _status_is_201(run_now_result.status_code):
-                # extracting data in json format
-                for item in run_now_result.json():
-                    test_name = item.get("testId")
-                    result_id = item.get("testResultId")
-                    print(f'Test "{test_name}" ran successfully, id is "{result_id}"')
+        run_now_result = self.request("POST", run_now_url, data=payload)
+
+        if _status_is_201(run_now_result.status_code):
+            # extracting data in json format
+            run_results = run_now_result.json()
+            for item in run_results:
+                test_name = item.get("testId")
+                result_id = item.get("testResultId")
+                print(f'Test "{test_name}" ran successfully, id is "{result_id}"')
+            return run_results
+        else:
+            print('Run test failed, status code:', run_now_result.status_code)
+            if run_now_result.text:
+                print(run_now_result.text)
+            return None
+
+    def parse_wait_timeout(self, wait_timeout: str) -> int:
+        """<num>s|m|h to seconds"""
+        match = re.fullmatch(r"([1-9][0-9]*)(s|m|h)", wait_timeout or "")
+        if match is None:
+            self.exit_synctl(ERROR_CODE, f"{wait_timeout} for --wait-timeout is not supported, use <num>s|m|h")
+        return int(match.group(1)) * {"s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+    def runNow_result_status(self, result: dict) -> str:
+        """Successful or Failed of a result of the result list API, like synctl get result"""
+        status = result.get("metrics", {}).get("status") or [[0, 0]]
+        return "Successful" if status[0][1] == 1 else "Failed"
+
+    def wait_runNow_results(self, run_results, wait_timeout=600):
+        """poll the CI/CD list until all results are completed, return the number of failed or unfinished runs
+
+        one request per interval covers all pending results, the interval grows while nothing
+        completes and goes back to RUN_POLL_INTERVAL when some results complete. The status of
+        a completed run is read from its result in the result list API
+        """
+        start_time = time.time()
+        pending = {x["testResultId"]: x for x in run_results}
+        completed = []
+        interval = RUN_POLL_INTERVAL
+        while len(pending) > 0:
+            remaining = wait_timeout - (time.time() - start_time)
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            done_count = len(completed)
+            for x in self.retrieve_all_synthetic_tests(CI_CD=True):
+                result_id = x.get("testResultId")
+                if result_id not in pending or x.get("completed") is not True:
+                    continue
+                # the run started after start_time, a window from then keeps the lookup small
+                window_size = int((time.time() - start_time) * 1000) + RUN_POLL_MAX_INTERVAL * 1000
+                result = self.find_a_test_result(pending[result_id].get("testId", x.get("testId")), result_id,
+                                                 window_size=window_size)
+                if result is None:
+                    # completed, but the result is not in the result list yet
+                    continue
+                x = dict(pending.pop(result_id), **x)
+                x["status"] = self.runNow_result_status(result)
+                x["response_time"] = result["metrics"]["response_time"][0][1] \
+                    if result.get("metrics", {}).get("response_time") else None
+                x["detected_after"] = time.time() - start_time
+                completed.append(x)
+                print(f'test "{x.get("testLabel", x.get("testId"))}" on {x.get("locationLabel", "")}: '
+                      f'{x["status"]}, detected after {round(x["detected_after"], 1)}s')
+            if len(completed) > done_count:
+                interval = RUN_POLL_INTERVAL
             else:
-                print('Run test failed, status code:', run_now_result.status_code)
-                if run_now_result.text:
-                    print(run_now_result.text)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                interval = min(interval * 1.5, RUN_POLL_MAX_INTERVAL)
+
+        label_length = max([len(str(x.get("testLabel", x.get("testId")))) for x in completed] + [20]) + 2
+        id_length = 40
+        status_length = 12
+        time_length = 15
+        print(self.fill_space("Label".upper(), label_length),
+              self.fill_space("Result ID".upper(), id_length),
+              self.fill_space("Status".upper(), status_length),
+              self.fill_space("Response Time".upper(), time_length),
+              self.fill_space("Detected After".upper(), time_length),
+              "Location".upper())
+        for x in completed:
+            print(self.fill_space(str(x.get("testLabel", x.get("testId"))), label_length),
+                  self.fill_space(x["testResultId"], id_length),
+                  self.fill_space(x["status"], status_length),
+                  self.fill_space(self.convert_milliseconds(x["response_time"])
+                                  if x["response_time"] is not None else NOT_APPLICABLE, time_length),
+                  self.fill_space(f'{round(x["detected_after"], 1)}s', time_length),
+                  x.get("locationLabel", ""))
+        for result_id, x in pending.items():
+            print(self.fill_space(str(x.get("testId")), label_length),
+                  self.fill_space(result_id, id_length),
+                  self.fill_space("Timeout", status_length),
+                  self.fill_space("-", time_length),
+                  self.fill_space("-", time_length))
+        failed = len([x for x in completed if x["status"] != "Successful"]) + len(pending)
+        print(f"total: {len(completed) + len(pending)}, successful: {len(completed) + len(pending) - failed}, "
+              f"failed: {len([x for x in completed if x['status'] != 'Successful'])}, timeout: {len(pending)}, "
+              f"time used: {round(time.time() - start_time, 1)}s")
+        return failed
 
     def create_a_synthetic_test(self):
         """create a Synthetic test, test_payload is json"""
         test_payload = self.payload
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         create_url = f"{host}/api/synthetics/settings/tests/"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            create_res = requests.post(create_url,
-                                       headers=headers,
-                                       data=test_payload,
-                                       timeout=60,
-                                       verify=self.insecure)
-
-            if _status_is_201(create_res.status_code):
-                # extracting data in json format
-                data = create_res.json()
-                test_id = data["id"]
-                test_label = data["label"]
-                print(f"test \"{test_label}\" created, id is \"{test_id}\"" )
-            elif _status_is_429(create_res.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print('create test failed, status code:', create_res.status_code)
-                if create_res.text:
-                    print(create_res.text)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        create_res = self.request("POST", create_url, data=test_payload)
+
+        if _status_is_201(create_res.status_code):
+            # extracting data in json format
+            data = create_res.json()
+            test_id = data["id"]
+            test_label = data["label"]
+            print(f"test \"{test_label}\" created, id is \"{test_id}\"" )
+        elif _status_is_429(create_res.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print('create test failed, status code:', create_res.status_code)
+            if create_res.text:
+                print(create_res.text)
+
 
+    def load_test_payloads(self, from_dir=None, from_ndjson=None):
+        """return [(source, payload)] from the .json files of a directory or the lines of a ndjson file, - is stdin"""
+        test_configs = []
+        try:
+            if from_dir is not None:
+                if not os.path.isdir(from_dir):
+                    self.exit_synctl(ERROR_CODE, f"{from_dir} is not a directory")
+                for file_name in sorted(os.listdir(from_dir)):
+                    if file_name.endswith(".json"):
+                        with open(os.path.join(from_dir, file_name), "r", encoding="utf-8") as json_file:
+                            test_configs.append((file_name, json_file.read()))
+            if from_ndjson is not None:
+                ndjson_file = sys.stdin if from_ndjson == "-" else open(from_ndjson, "r", encoding="utf-8")
+                with ndjson_file:
+                    for line_number, line in enumerate(ndjson_file, start=1):
+                        if line.strip() != "":
+                            test_configs.append((f"line {line_number}", line))
+        except OSError as e:
+            self.exit_synctl(ERROR_CODE, e)
+        return test_configs
+
+    def validate_test_payloads(self, test_configs):
+        """check every payload with SyntheticConfiguration.get_json, return [(source, label, payload)] of valid ones"""
+        valid_payloads = []
+        invalid = 0
+        for source, config_str in test_configs:
+            try:
+                test_config = json.loads(config_str)
+                if not isinstance(test_config, dict) or not isinstance(test_config.get("configuration"), dict):
+                    raise ValueError("configuration is required")
+                payload = SyntheticConfiguration(test_config["configuration"].get("syntheticType", "HTTPAction"))
+                payload.loads_from_dict(test_config)
+                # get_json prints the reason and exits when the payload is not valid
+                valid_payloads.append((source, test_config.get("label", ""), payload.get_json()))
+            except SystemExit:
+                invalid += 1
+                print(f"{source}: invalid payload, skipped")
+            except (ValueError, KeyError, TypeError) as e:
+                invalid += 1
+                print(f"{source}: invalid payload, skipped, {e}")
+        return valid_payloads, invalid
+
+    def __create_one_test(self, item):
+        """create one test of create_multiple_synthetic_tests, return the status code"""
+        source, label, test_payload = item
+        host = self.auth["host"]
+        create_res = self.request("POST", f"{host}/api/synthetics/settings/tests/", data=test_payload)
+        if _status_is_201(create_res.status_code):
+            test_id = create_res.json()["id"]
+            with self.id_map_lock:
+                self.id_map[label] = test_id
+            self.print_line(f'{source}: test "{label}" created, id is "{test_id}"')
+        else:
+            self.print_line(f'{source}: create test "{label}" failed, status code: {create_res.status_code}', create_res.text)
+        return create_res.status_code
+
+    def create_multiple_synthetic_tests(self, test_configs, id_map_file=None):
+        """validate all payloads, create the valid ones with --concurrency workers,
+        then write label => id of the created tests to id_map_file"""
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        valid_payloads, invalid = self.validate_test_payloads(test_configs)
+        seen_labels = set()
+        duplicated = set()
+        for _, label, _ in valid_payloads:
+            (duplicated if label in seen_labels else seen_labels).add(label)
+        if duplicated:
+            print("Warning: duplicated labels, the id map only keeps one id of:", ", ".join(sorted(duplicated)))
+
+        self.id_map = {}
+        self.id_map_lock = threading.Lock()
+        report = self.run_bulk(self.__create_one_test, valid_payloads)
+        report.print_report("created")
+        if invalid > 0:
+            print(f"invalid payloads: {invalid}")
+
+        if id_map_file is not None:
+            with open(id_map_file, "w", encoding="utf-8") as map_file:
+                json.dump(self.id_map, map_file, indent=2, sort_keys=True)
+            print(f"id map of {len(self.id_map)} tests saved to {id_map_file}")
+        if invalid > 0 or report.succeeded() < report.total():
+            sys.exit(ERROR_CODE)
 
     def retrieve_a_synthetic_test(self, test_id=""):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if id is None or test_id == "":
             print("test id should not be empty")
             return
         else:
             retrieve_url = f"{host}/api/synthetics/settings/tests/{test_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            result = requests.get(retrieve_url,
-                                  headers=headers,
-                                  timeout=60,
-                                  verify=self.insecure)
-
-            if _status_is_200(result.status_code):
-                # extracting data in json format
-                data = result.json()
-
-                if isinstance(data, list):
-                    self.test_lists = data
-                    return data
-                elif isinstance(data, dict):
-                    self.test_lists = [data]
-                    return [data]
-                else:
-                    print('unknown data:', data)
-            elif _status_is_403(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message='Insufficient access rights for resource')
-            elif _status_is_404(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message=f'test {test_id} not found')
-            elif _status_is_429(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message=TOO_MANY_REQUEST_ERROR)
-            else:
-                self.exit_synctl(ERROR_CODE,
-                    f'get test {test_id} failed, status code: {result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        result = self.request("GET", retrieve_url)
 
-    def retrieve_all_synthetic_tests(self, syn_type=None, CI_CD=False):
+        if _status_is_200(result.status_code):
+            # extracting data in json format
+            data = result.json()
+
+            if isinstance(data, list):
+                self.test_lists = data
+                return data
+            elif isinstance(data, dict):
+                self.test_lists = [data]
+                return [data]
+            else:
+                print('unknown data:', data)
+        elif _status_is_403(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message='Insufficient access rights for resource')
+        elif _status_is_404(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message=f'test {test_id} not found')
+        elif _status_is_429(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message=TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE,
+                f'get test {test_id} failed, status code: {result.status_code}')
+
+    def retrieve_all_synthetic_tests(self, syn_type=None, CI_CD=False, full=False):
+        """list tests, each test is a SyntheticTestSummary unless full=True
+
+        the response is parsed item by item, so scripts and bundles of other
+        tests are never all in memory together
+        """
+        syn_type_list = list(self.iter_synthetic_tests(syn_type, CI_CD=CI_CD, full=full))
+        self.test_lists = syn_type_list
+        return syn_type_list
+
+    def iter_synthetic_tests(self, syn_type=None, CI_CD=False, full=False):
+        """yield tests one by one while the response is parsed"""
         # API doc: https://instana.github.io/openapi/#operation/getSyntheticTests
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         if CI_CD is True:
             retrieve_url = f"{host}/api/synthetics/settings/tests/ci-cd"
+            # CI/CD results are small, keep them as they are
+            full = True
         else:
             retrieve_url = f"{host}/api/synthetics/settings/tests/"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            query_result = requests.get(retrieve_url,
-                                        headers=headers,
-                                        timeout=60,
-                                        verify=self.insecure)
-            if _status_is_200(query_result.status_code):
-                # extracting data in json format
-                data = query_result.json()
-                syn_type_list = []
-                if isinstance(data, list):
-                    self.test_lists = data
-                    for x in data:
-                        if syn_type is not None and x is not None and x["configuration"]["syntheticType"] == syn_type:
-                            syn_type_list.append(x)
-                        if syn_type is None:
-                            syn_type_list.append(x)
-                    return syn_type_list
-                elif isinstance(data, dict):
-                    # only one test
-                    self.test_lists = [data]
-                    if syn_type is not None and data["configuration"]["syntheticType"] == syn_type:
-                        return [data]
-                    return []
-                else:
-                    self.exit_synctl(ERROR_CODE, f'unknown data: {data}')
-            elif _status_is_403(query_result.status_code):
-                self.exit_synctl(ERROR_CODE, 'Insufficient access rights for resource')
-            elif _status_is_404(query_result.status_code):
-                self.exit_synctl(ERROR_CODE, 'test not found')
-            elif _status_is_429(query_result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                self.exit_synctl(ERROR_CODE, f'get test failed, status code: {query_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        query_result = self.request("GET", retrieve_url, stream=True)
+        if _status_is_200(query_result.status_code):
+            try:
+                for x in self.iter_json_array(query_result.iter_content(chunk_size=64 * 1024)):
+                    if x is None:
+                        continue
+                    if not isinstance(x, dict):
+                        self.exit_synctl(ERROR_CODE, f'unknown data: {x}')
+                    if syn_type is not None and "configuration" in x and x["configuration"]["syntheticType"] != syn_type:
+                        continue
+                    yield x if full else SyntheticTestSummary(x)
+            except ValueError as parse_error:
+                self.exit_synctl(ERROR_CODE, f'unknown data: {parse_error}')
+            finally:
+                query_result.close()
+        elif _status_is_403(query_result.status_code):
+            self.exit_synctl(ERROR_CODE, 'Insufficient access rights for resource')
+        elif _status_is_404(query_result.status_code):
+            self.exit_synctl(ERROR_CODE, 'test not found')
+        elif _status_is_429(query_result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE, f'get test failed, status code: {query_result.status_code}')
 
     def retrieve_a_runNow_result(self, testResultId):
         # API Doc: https://instana.github.io/openapi/#operation/getSyntheticTestCICD
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if testResultId is None or testResultId == "":
             print("test result id should not be empty")
             return
         else:
             retrieve_url = f"{host}/api/synthetics/settings/tests/ci-cd/{testResultId}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            result = requests.get(retrieve_url,
-                                  headers=headers,
-                                  timeout=60,
-                                  verify=self.insecure)
-
-            if _status_is_200(result.status_code):
-                # extracting data in json format
-                data = result.json()
-                return data
-            elif _status_is_403(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message='Insufficient access rights for resource')
-            elif _status_is_404(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message=f'result {testResultId} not found')
-            elif _status_is_429(result.status_code):
-                self.exit_synctl(error_code=ERROR_CODE,
-                                 message=TOO_MANY_REQUEST_ERROR)
-            else:
-                self.exit_synctl(ERROR_CODE,
-                                 f'get Result {testResultId} failed, status code: {result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        result = self.request("GET", retrieve_url)
+
+        if _status_is_200(result.status_code):
+            # extracting data in json format
+            data = result.json()
+            return data
+        elif _status_is_403(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message='Insufficient access rights for resource')
+        elif _status_is_404(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message=f'result {testResultId} not found')
+        elif _status_is_429(result.status_code):
+            self.exit_synctl(error_code=ERROR_CODE,
+                             message=TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE,
+                             f'get Result {testResultId} failed, status code: {result.status_code}')
 
     def retrieve_test_results(self, test_id, page=1, page_size=200, window_size=60*60*1000):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if id is None or test_id == "":
             print("test id should not be empty")
             return
         else:
             retrieve_url = f"{host}/api/synthetics/results/list"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
         summary_config = {"syntheticMetrics":["synthetic.metricsResponseTime","synthetic.metricsResponseSize", "status","synthetic.errors", "custom_metrics"],
                           "metrics": [{
                             "aggregation": "SUM",
@@ -2902,23 +3924,14 @@ class SyntheticTest(Base):
                               "to": 0,
                               "windowSize": window_size
                           }}
-        try:
-            result = requests.post(retrieve_url,
-                                  headers=headers,
-                                  data=json.dumps(summary_config),
-                                  timeout=60,
-                                  verify=self.insecure)
-            if _status_is_200(result.status_code):
-                data = result.json()
-                return data
-            else:
-                self.exit_synctl(ERROR_CODE,
-                                 f'retrieve test result list failed, status code:: {result.status_code}')
-                return None
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        result = self.request("POST", retrieve_url, data=json.dumps(summary_config))
+        if _status_is_200(result.status_code):
+            data = result.json()
+            return data
+        else:
+            self.exit_synctl(ERROR_CODE,
+                             f'retrieve test result list failed, status code:: {result.status_code}')
+            return None
 
     def __sort_test_result(self, result_list):
         """sort Synthetic result list by Starttime"""
@@ -2926,114 +3939,154 @@ class SyntheticTest(Base):
             result_list, reverse=True, key=lambda result: result["metrics"]["response_time"][0][0] if result is not None else [])
         return new_list
 
-    def retrieve_test_result_details(self, resultid, testid, HAR):
+    def __fetch_result_artifact(self, url, artifact, resultid, key=None):
+        """get an artifact of a result, return json value of key or raw content, None if not found"""
+        response = self.request("GET", url)
+        if _status_is_200(response.status_code):
+            return response.content if key is None else response.json()[key]
+        elif response.status_code != 404:
+            print(f'get {artifact} for result {resultid} failed, status code: {response.status_code}')
+        return None
+
+    def __is_safe_tar_member(self, member, path):
+        """only extract regular files and folders which stay under path"""
+        if not (member.isfile() or member.isdir()):
+            return False
+        real_path = os.path.realpath(path)
+        target = os.path.realpath(os.path.join(real_path, member.name))
+        return target == real_path or target.startswith(real_path + os.sep)
+
+    def __download_result_archive(self, url, artifact, resultid, path):
+        """stream a tar archive of a result and extract it into path on the fly, return path"""
+        response = self.request("GET", url, stream=True)
+        try:
+            if _status_is_200(response.status_code):
+                response.raw.decode_content = True
+                os.makedirs(path, exist_ok=True)
+                with tarfile.open(fileobj=response.raw, mode="r|*") as tar:
+                    for member in tar:
+                        if not self.__is_safe_tar_member(member, path):
+                            continue
+                        if hasattr(tarfile, "data_filter"):
+                            tar.extract(member, path=path, filter="data")
+                        else:
+                            tar.extract(member, path=path)
+                return path
+            elif response.status_code != 404:
+                print(f'get {artifact} for result {resultid} failed, status code: {response.status_code}')
+            return None
+        finally:
+            response.close()
+
+    def retrieve_test_result_details(self, resultid, testid, HAR=False):
+        """get subtransactions, logs, har, images and videos of a result concurrently
+
+        images and videos are extracted to <testid>/<resultid>/ while downloading,
+        videos are the slowest, result["video"] is a future resolved when it is printed
+        """
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         test = self.retrieve_a_synthetic_test(testid)
         result = {}
         result["testid"] = testid
         result["resultid"] = resultid
         result["syntheticType"] = test[0]["configuration"]["syntheticType"]
+        result["test"] = test[0]
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            if id is None or testid == "":
-                print("test id should not be empty")
-                return
-            else:
-                if test[0]["configuration"]["syntheticType"] in [HTTPAction_TYPE, HTTPScript_TYPE]:
-                    retrieve_url_sub = f"{host}/api/synthetics/results/{testid}/{resultid}/detail?type=SUBTRANSACTIONS"
-                    retrieve_url_logs = f"{host}/api/synthetics/results/{testid}/{resultid}/detail?type=LOGS"
-                    result_sub = requests.get(retrieve_url_sub,
-                                              headers=headers,
-                                              timeout=60,
-                                              verify=self.insecure)
-                    result_logs = requests.get(retrieve_url_logs,
-                                               headers=headers,
-                                               timeout=60,
-                                               verify=self.insecure)
-                    if _status_is_200(result_sub.status_code):
-                        result["sub"] = result_sub.json()["subtransactions"]
-                    elif result_sub.status_code != 404:
-                       print(f'get subtransactions for result {resultid} failed, status code: {result_sub.status_code}')
-                    if _status_is_200(result_logs.status_code):
-                        result["logs"] = result_logs.json()["logs"]
-                    elif result_logs.status_code != 404:
-                        print(f'get logs for result {resultid} failed, status code: {result_logs.status_code}')
-
-                elif test[0]["configuration"]["syntheticType"] in  [BrowserScript_TYPE, WebpageScript_TYPE, WebpageAction_TYPE]:
-                    if HAR:
-                        retrieve_url_har = f"{host}/api/synthetics/results/{testid}/{resultid}/detail?type=HAR"
-                        result_har = requests.get(retrieve_url_har,
-                                                  headers=headers,
-                                                  timeout=60,
-                                                  verify=self.insecure)
-                        if _status_is_200(result_har.status_code):
-                            result["har"] = result_har.json()['har']
-                        elif result_har.status_code != 404:
-                            print(f'get har for result {resultid} failed, status code: {result_har.status_code}')
-                    retrieve_url_image = f"{host}/api/synthetics/results/{testid}/{resultid}/file?type=IMAGES"
-                    retrieve_url_videos = f"{host}/api/synthetics/results/{testid}/{resultid}/file?type=VIDEOS"
-                    retrieve_url_logs = f"{host}/api/synthetics/results/{testid}/{resultid}/detail?type=LOGS"
-                    result_logs = requests.get(retrieve_url_logs,
-                                               headers=headers,
-                                               timeout=60,
-                                               verify=self.insecure)
-                    result_image = requests.get(retrieve_url_image,
-                                                headers=headers,
-                                                timeout=60,
-                                                verify=self.insecure)
-                    result_videos = requests.get(retrieve_url_videos,
-                                                 headers=headers,
-                                                 timeout=60,
-                                                 verify=self.insecure)
-                    if _status_is_200(result_logs.status_code):
-                        result["logs"] = result_logs.json()["logFiles"]
-                    elif result_logs.status_code != 404:
-                        print(f"get logs for result {resultid} failed, status code: {result_logs.status_code}")
-                    if _status_is_200(result_image.status_code):
-                        result["image"] = result_image.content
-                    elif result_image.status_code != 404:
-                        print(f'get image for result {resultid} failed, status code: {result_image.status_code}')
-                    if _status_is_200(result_videos.status_code):
-                        result["video"] = result_videos.content
-                    elif result_videos.status_code != 404:
-                        print(f'get videos for result {resultid} failed, status code: {result_videos.status_code}')
-            return result
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        if id is None or testid == "":
+            print("test id should not be empty")
+            return
 
-    def get_all_test_results(self, test_id, window_size):
-        total_hits = 0
+        result_url = f"{host}/api/synthetics/results/{testid}/{resultid}"
+        executor = ThreadPoolExecutor(max_workers=4)
+        futures = {}
+        if test[0]["configuration"]["syntheticType"] in [HTTPAction_TYPE, HTTPScript_TYPE]:
+            futures["sub"] = executor.submit(self.__fetch_result_artifact, f"{result_url}/detail?type=SUBTRANSACTIONS",
+                                             "subtransactions", resultid, "subtransactions")
+            futures["logs"] = executor.submit(self.__fetch_result_artifact, f"{result_url}/detail?type=LOGS",
+                                              "logs", resultid, "logs")
+        elif test[0]["configuration"]["syntheticType"] in [BrowserScript_TYPE, WebpageScript_TYPE, WebpageAction_TYPE]:
+            result["video"] = executor.submit(self.__download_result_archive, f"{result_url}/file?type=VIDEOS",
+                                              "videos", resultid, os.path.join(testid, resultid, "Recordings"))
+            if HAR:
+                futures["har"] = executor.submit(self.__fetch_result_artifact, f"{result_url}/detail?type=HAR",
+                                                 "har", resultid, "har")
+            futures["logs"] = executor.submit(self.__fetch_result_artifact, f"{result_url}/detail?type=LOGS",
+                                              "logs", resultid, "logFiles")
+            futures["image"] = executor.submit(self.__download_result_archive, f"{result_url}/file?type=IMAGES",
+                                               "image", resultid, os.path.join(testid, resultid, "Screenshots"))
+        for key, future in futures.items():
+            value = future.result()
+            if value is not None:
+                result[key] = value
+        executor.shutdown(wait=False)
+        return result
+
+    def iter_test_result_pages(self, test_id, window_size=60*60*1000, page_size=200):
+        """yield the results of a test page by page, next pages are prefetched"""
+        def fetch_page(page):
+            return self.retrieve_test_results(test_id,
+                                              page=page,
+                                              page_size=page_size,
+                                              window_size=window_size)
+
+        for page_result in self.get_all_pages(fetch_page, page_size=page_size):
+            yield page_result.get("items", [])
+
+    def iter_test_results(self, test_id, window_size=60*60*1000, page_size=200):
+        """yield results of a test one by one over all pages, next pages are prefetched"""
+        for items in self.iter_test_result_pages(test_id, window_size=window_size, page_size=page_size):
+            yield from items
+
+    def get_all_test_results(self, test_id, window_size="1h"):
+        """return an iterator over all results of a test in the window"""
         result_instance = SyntheticResult()
         window_size_ms = result_instance.get_window_size(window_size)
-        result_list = self.retrieve_test_results(test_id,window_size=window_size_ms)
-        if result_list is not None:
-            page = result_list["page"] if "page" in result_list else 1
-            page_size = result_list["pageSize"] if "pageSize" in result_list else 200
-            if "totalHits" in result_list:
-                total_hits = result_list["totalHits"]
-
-            if page_size >= total_hits:
-                return result_list
-            else:
-                total_pages = total_hits/page_size
-                if (total_pages - round(total_pages)) > 0:
-                    total_pages += 1
-                for x in range(0, round(total_pages)):
-                    result_list = self.retrieve_test_results(test_id=test_id,
-                                                             page=x+1,
-                                                             page_size=200,
-                                                             window_size=window_size_ms)
-                    return result_list
-        else:
+        return self.iter_test_results(test_id, window_size=window_size_ms)
+
+    def retrieve_a_test_result(self, test_id, result_id, window_size=60*60*1000):
+        """results of the list API filtered on the test id and on the result id tag synthetic.id,
+        one request whatever the window size, None when the server rejects the result id filter"""
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        host = self.auth["host"]
+        result_config = {"syntheticMetrics": ["synthetic.metricsResponseTime", "synthetic.metricsResponseSize", "status",
+                                              "synthetic.errors", "custom_metrics"],
+                         "tagFilters": [{"stringValue": test_id, "name": "synthetic.testId", "operator": "EQUALS"},
+                                        {"stringValue": result_id, "name": "synthetic.id", "operator": "EQUALS"}],
+                         "pagination": {"page": 1, "pageSize": 1},
+                         "timeFrame": {"to": 0, "windowSize": window_size}}
+        result = self.request("POST", f"{host}/api/synthetics/results/list", data=json.dumps(result_config))
+        if _status_is_200(result.status_code):
+            return result.json().get("items", [])
+        elif _status_is_400(result.status_code):
             return None
+        else:
+            self.exit_synctl(ERROR_CODE,
+                             f'retrieve test result failed, status code: {result.status_code}')
+
+    def find_a_test_result(self, test_id, result_id, window_size=60*60*1000):
+        """the result of result_id in the last window_size ms, None when it is not found
+
+        the result is asked with a filter on its id, first in window_size, then in
+        RESULT_LOOKUP_WINDOW, each is one request of one item. A server which rejects
+        or ignores the filter falls back to reading the results of window_size until
+        the result is found
+        """
+        items = self.retrieve_a_test_result(test_id, result_id, window_size=window_size)
+        filtered = items is not None and all(x["testResultCommonProperties"]["id"] == result_id for x in items)
+        if filtered and len(items) == 0 and window_size < RESULT_LOOKUP_WINDOW:
+            # older than the window, the filter keeps the larger window as cheap
+            items = self.retrieve_a_test_result(test_id, result_id, window_size=RESULT_LOOKUP_WINDOW)
+            filtered = items is not None and all(x["testResultCommonProperties"]["id"] == result_id for x in items)
+        if not filtered:
+            items = self.iter_test_results(test_id, window_size=window_size)
+        return next((x for x in items if x["testResultCommonProperties"]["id"] == result_id), None)
+
+    def get_a_test_result(self, test_id, result_id, window_size="1h"):
+        """[result] of result_id, or [] when it is not found"""
+        window_size_ms = SyntheticResult().get_window_size(window_size)
+        result = self.find_a_test_result(test_id, result_id, window_size=window_size_ms)
+        return [] if result is None else [result]
 
     def convert_milliseconds(self, time_ms):
         if time_ms > 60000:
@@ -3045,103 +4098,95 @@ class SyntheticTest(Base):
         return t
 
     def print_result_details(self, result_details, result_list):
-        test = self.retrieve_a_synthetic_test(result_details["testid"])
-        for result in result_list:
-            formatted_response_size = "{:.2f} MiB".format(result["metrics"]["response_size"][0][1]/ (1024 * 1024))
-            status = "Successful" if result["metrics"]["status"][0][1] == 1 else "Failed"
-
-            if result["testResultCommonProperties"]["id"] == result_details["resultid"]:
-                print(self.fill_space("Name".upper(), 30), "Value".upper())
-                print(self.fill_space("Result Id", 30), result_details["resultid"])
-                print(self.fill_space("Start Time", 30), self.change_time_format(result["metrics"]["response_time"][0][0], False))
-                print(self.fill_space("Status", 30), status)
-                print(self.fill_space("Retries", 30), test[0]["configuration"]["retries"])
-                print(self.fill_space("Response Time", 30), str(self.convert_milliseconds(result["metrics"]["response_time"][0][1])))
-                if result_details["syntheticType"] == SSLCertificate_TYPE:
-                    if status == "Successful":
-                        if result["metrics"]["synthetic.customMetrics.valid"][0][1] == 1:
-                            print(self.fill_space("Certificate is Valid", 30), "Yes")
-                            print(self.fill_space("Days Remaining", 30), result["metrics"]["synthetic.customMetrics.daysRemaining"][0][1])
-                            print(self.fill_space("Date of Issue", 30), self.change_time_format(result["metrics"]["synthetic.customMetrics.validFrom"][0][1], True))
-                            print(self.fill_space("Date of Expiry", 30), self.change_time_format(result["metrics"]["synthetic.customMetrics.validTo"][0][1], True))
+        test = [result_details["test"]] if "test" in result_details else self.retrieve_a_synthetic_test(result_details["testid"])
+        result = next((x for x in result_list
+                       if x["testResultCommonProperties"]["id"] == result_details["resultid"]), None)
+        if result is None:
+            print(f"no result \"{result_details['resultid']}\" found, ensure the window-size is correct.")
+            return
+        formatted_response_size = "{:.2f} MiB".format(result["metrics"]["response_size"][0][1]/ (1024 * 1024))
+        status = "Successful" if result["metrics"]["status"][0][1] == 1 else "Failed"
+
+        print(self.fill_space("Name".upper(), 30), "Value".upper())
+        print(self.fill_space("Result Id", 30), result_details["resultid"])
+        print(self.fill_space("Start Time", 30), self.change_time_format(result["metrics"]["response_time"][0][0], False))
+        print(self.fill_space("Status", 30), status)
+        print(self.fill_space("Retries", 30), test[0]["configuration"]["retries"])
+        print(self.fill_space("Response Time", 30), str(self.convert_milliseconds(result["metrics"]["response_time"][0][1])))
+        if result_details["syntheticType"] == SSLCertificate_TYPE:
+            if status == "Successful":
+                if result["metrics"]["synthetic.customMetrics.valid"][0][1] == 1:
+                    print(self.fill_space("Certificate is Valid", 30), "Yes")
+                    print(self.fill_space("Days Remaining", 30), result["metrics"]["synthetic.customMetrics.daysRemaining"][0][1])
+                    print(self.fill_space("Date of Issue", 30), self.change_time_format(result["metrics"]["synthetic.customMetrics.validFrom"][0][1], True))
+                    print(self.fill_space("Date of Expiry", 30), self.change_time_format(result["metrics"]["synthetic.customMetrics.validTo"][0][1], True))
+                else:
+                    print(self.fill_space("Certificate is Valid", 30), "No")
+        else:
+            print(self.fill_space("Response Size", 30), str(formatted_response_size))
+            if "har" in result_details:
+                har_path = os.path.join(result_details["testid"], result_details["resultid"])
+                os.makedirs(har_path, exist_ok=True)
+                file_path = os.path.join(har_path, "HAR.json")
+                with open(file_path, 'w') as f:
+                    json.dump(result_details['har'], f)
+                print(self.fill_space("HAR", 30), f"HAR has been saved to {file_path}")
+            else:
+                print(self.fill_space("HAR", 30), "N/A")
+            if "image" in result_details:
+                print(self.fill_space("Screenshots", 30), f"Screenshots has been saved to {result_details['image']}")
+            else:
+                print(self.fill_space("Screenshots", 30), "N/A")
+            if "sub" in result_details:
+                print("")
+                print(self.__fix_length("*", 80))
+                print("Subtransactions ")
+                print(self.__fix_length("*", 80))
+                for x in range(len(result_details["sub"])):
+                    for key, value in result_details["sub"][x]["properties"].items():
+                        if key == 'finishTime' or key == 'startTime':
+                            print(self.fill_space(key, 30), self.format_time(value))
                         else:
-                            print(self.fill_space("Certificate is Valid", 30), "No")
+                            print(self.fill_space(key, 30), value)
+                    for key, value in result_details['sub'][x]["metrics"].items():
+                        print(self.fill_space(key, 30), value)
+                    print(self.__fix_length("*", 80))
+            else:
+                print(self.fill_space("Subtransactions", 30), "N/A")
+            if "logs" in result_details:
+                print("")
+                print("\nConsole logs ")
+                print(self.__fix_length("*", 80))
+                if "console.log" in result_details["logs"]:
+                    print(result_details["logs"]["console.log"])
                 else:
-                    print(self.fill_space("Response Size", 30), str(formatted_response_size))
-                    if "har" in result_details:
-                        har_path = os.path.join(result_details["testid"], result_details["resultid"])
-                        os.makedirs(har_path, exist_ok=True)
-                        file_path = os.path.join(har_path, "HAR.json")
-                        with open(file_path, 'w') as f:
-                            json.dump(result_details['har'], f)
-                        print(self.fill_space("HAR", 30), f"HAR has been saved to {file_path}")
-                    else:
-                        print(self.fill_space("HAR", 30), "N/A")
-                    if "image" in result_details:
-                        with open("images.tar", "wb") as f:
-                            f.write(result_details["image"])
-                        with tarfile.open("images.tar", "r") as tar:
-                            images_path = os.path.join(result_details["testid"], result_details["resultid"], "Screenshots")
-                            tar.extractall(path=images_path)
-                        print(self.fill_space("Screenshots", 30), f"Screenshots has been saved to {images_path}")
-                    else:
-                        print(self.fill_space("Screenshots", 30), "N/A")
-                    if "video" in result_details:
-                        with open("videos.tar", "wb") as f:
-                            f.write(result_details["video"])
-                        with tarfile.open("videos.tar", "r") as tar:
-                            videos_path = os.path.join(result_details["testid"], result_details["resultid"], "Recordings")
-                            tar.extractall(path=videos_path)
-                        print(self.fill_space("Recordings", 30), f"Recordings has been saved to {videos_path}")
-                    else:
-                        print(self.fill_space("Recordings", 30), "N/A")
-                    if "sub" in result_details:
-                        print("")
-                        print(self.__fix_length("*", 80))
-                        print("Subtransactions ")
+                    print(result_details["logs"])
+                print(self.__fix_length("*", 80))
+                if result_details["syntheticType"] != HTTPScript_TYPE:
+                    if "browser.json" in result_details["logs"]:
+                        print("Browser logs")
                         print(self.__fix_length("*", 80))
-                        for x in range(len(result_details["sub"])):
-                            for key, value in result_details["sub"][x]["properties"].items():
-                                if key == 'finishTime' or key == 'startTime':
-                                    print(self.fill_space(key, 30), self.format_time(value))
-                                else:
-                                    print(self.fill_space(key, 30), value)
-                            for key, value in result_details['sub'][x]["metrics"].items():
-                                print(self.fill_space(key, 30), value)
-                            print(self.__fix_length("*", 80))
-                    else:
-                        print(self.fill_space("Subtransactions", 30), "N/A")
-                    if "logs" in result_details:
+                        browserlogs = json.loads(result_details["logs"]["browser.json"])
+                        for logs in browserlogs:
+                                print(logs["level"]+ "\n" + self.change_time_format(logs["timestamp"], False) + "\n" +  logs["message"])
                         print("")
-                        print("\nConsole logs ")
-                        print(self.__fix_length("*", 80))
-                        if "console.log" in result_details["logs"]:
-                            print(result_details["logs"]["console.log"])
-                        else:
-                            print(result_details["logs"])
                         print(self.__fix_length("*", 80))
-                        if result_details["syntheticType"] != HTTPScript_TYPE:
-                            if "browser.json" in result_details["logs"]:
-                                print("Browser logs")
-                                print(self.__fix_length("*", 80))
-                                browserlogs = json.loads(result_details["logs"]["browser.json"])
-                                for logs in browserlogs:
-                                        print(logs["level"]+ "\n" + self.change_time_format(logs["timestamp"], False) + "\n" +  logs["message"])
-                                print("")
-                                print(self.__fix_length("*", 80))
-                            else:
-                                print(self.fill_space("Browser Logs", 30), "N/A")
-                if "errors" in result["testResultCommonProperties"]:
-                    print("Error")
-                    print(self.__fix_length("*", 80))
-                    errors = result["testResultCommonProperties"]["errors"][0].split(",")
-                    for e in errors:
-                        print(e)
-                else:
-                    print(self.fill_space("Error", 30), "N/A")
-                break
+                    else:
+                        print(self.fill_space("Browser Logs", 30), "N/A")
+            # videos may still be downloading, print them after everything else
+            videos_path = result_details["video"].result() if "video" in result_details else None
+            if videos_path is not None:
+                print(self.fill_space("Recordings", 30), f"Recordings has been saved to {videos_path}")
+            else:
+                print(self.fill_space("Recordings", 30), "N/A")
+        if "errors" in result["testResultCommonProperties"]:
+            print("Error")
+            print(self.__fix_length("*", 80))
+            errors = result["testResultCommonProperties"]["errors"][0].split(",")
+            for e in errors:
+                print(e)
         else:
-            print(f"no result \"{result_details['resultid']}\" found, ensure the window-size is correct.")
+            print(self.fill_space("Error", 30), "N/A")
 
     def print_result_list(self, result_list):
         id_length = 38
@@ -3150,24 +4195,32 @@ class SyntheticTest(Base):
         status_length = 15
         response_size_length = 8
         response_time_length = 18
-        sorted_result = self.__sort_test_result(result_list)
-
-        print(self.fill_space("ID".upper(), id_length),
-              self.fill_space("start Time".upper(), start_time_length),
-              self.fill_space("Location".upper(), loc_length),
-              self.fill_space("Status".upper(), status_length),
-              self.fill_space("Response Time".upper(), response_time_length),
-              self.fill_space("Response size".upper(), response_size_length))
-        for result in sorted_result:
-            formatted_response_size = "{:.2f} MiB".format(result["metrics"]["response_size"][0][1]/ (1024 * 1024))
-            status = "Successful" if result["metrics"]["status"][0][1] == 1 else "Failed"
-
-            print(self.fill_space(result["testResultCommonProperties"]["id"], id_length ),
-                  self.fill_space(str(self.change_time_format(result["metrics"]["response_time"][0][0], False)), start_time_length),
-                  self.fill_space(result["testResultCommonProperties"]["locationDisplayLabel"], loc_length),
-                  self.fill_space(status, status_length),
-                  self.fill_space(str(self.convert_milliseconds(result["metrics"]["response_time"][0][1])), response_time_length),
-                  self.fill_space(str(formatted_response_size), response_size_length))
+        # keep only the printed fields of each result, so the full payloads of a
+        # large window are never held in memory at the same time
+        rows = []
+        for result in result_list:
+            rows.append((result["metrics"]["response_time"][0][0],
+                         result["testResultCommonProperties"]["id"],
+                         result["testResultCommonProperties"]["locationDisplayLabel"],
+                         result["metrics"]["status"][0][1],
+                         result["metrics"]["response_time"][0][1],
+                         result["metrics"]["response_size"][0][1]))
+        rows.sort(reverse=True, key=lambda row: row[0])
+
+        table = TableWriter([("ID", id_length),
+                             ("START TIME", start_time_length),
+                             ("LOCATION", loc_length),
+                             ("STATUS", status_length),
+                             ("RESPONSE TIME", response_time_length),
+                             ("RESPONSE SIZE", response_size_length)], sample_size=0)
+        for start_time, result_id, location, status_value, response_time, response_size in rows:
+            table.write_row((result_id,
+                             self.change_time_format(start_time, False),
+                             location,
+                             "Successful" if status_value == 1 else "Failed",
+                             self.convert_milliseconds(response_time),
+                             "{:.2f} MiB".format(response_size / (1024 * 1024))))
+        table.close()
 
 
     def print_analytic_result_list(self, result_list):
@@ -3245,27 +4298,15 @@ class SyntheticTest(Base):
 
         test_list_url = f"{host}/api/synthetics/settings/tests?{filter}={tag_filter[1]}"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            retrieve_res = requests.get(test_list_url,
-                                         headers=headers,
-                                         timeout=60,
-                                         verify=self.insecure)
+        retrieve_res = self.request("GET", test_list_url)
 
-            if _status_is_200(retrieve_res.status_code):
-                data = retrieve_res.json()
-                return data
-            else:
-                print('retrieve test failed, status code:',
-                      retrieve_res.status_code)
-                return None
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        if _status_is_200(retrieve_res.status_code):
+            data = retrieve_res.json()
+            return data
+        else:
+            print('retrieve test failed, status code:',
+                  retrieve_res.status_code)
+            return None
 
     def retrieve_synthetic_tests_by_analytics(self, analytics, metrics, tagfilter, order, window_size=60*60*1000):
         """curl --location \
@@ -3305,10 +4346,6 @@ class SyntheticTest(Base):
 
         retrieve_url = f"{host}/api/synthetics/results/analytic"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
         summary_config = { "syntheticMetrics": [s.strip().strip('"') for s in metrics.strip('{}').split(',')],
                            "analyticFunction": analytics,
                            "order": json.loads(order),
@@ -3318,24 +4355,15 @@ class SyntheticTest(Base):
                                "windowSize": window_size_ms
                                 }
                            }
-        try:
-            result = requests.post(retrieve_url,
-                                   headers=headers,
-                                   data=json.dumps(summary_config),
-                                   timeout=60,
-                                   verify=self.insecure)
-
-            if _status_is_200(result.status_code):
-                data = result.json()
-                return data
-            else:
-                self.exit_synctl(ERROR_CODE,
-                                 f'retrieve test result list failed, status code:: {result.status_code}')
-                return None
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        result = self.request("POST", retrieve_url, data=json.dumps(summary_config))
+
+        if _status_is_200(result.status_code):
+            data = result.json()
+            return data
+        else:
+            self.exit_synctl(ERROR_CODE,
+                             f'retrieve test result list failed, status code:: {result.status_code}')
+            return None
 
 
 
@@ -3344,44 +4372,28 @@ class SyntheticTest(Base):
         # https://instana.github.io/openapi/#operation/deleteSyntheticTest
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         if test_id == "":
-            print("test id should not be empty")
+            self.print_line("test id should not be empty")
             return
 
         host = self.auth["host"]
 
         # delete url
         delete_url = f"{host}/api/synthetics/settings/tests/{test_id}"
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": "apiToken %s" % (self.auth["token"])
-        }
-        try:
-            del_result = requests.delete(delete_url,
-                                         headers=headers,
-                                         timeout=60,
-                                         verify=self.insecure)
-
-            if _status_is_204(del_result.status_code):
-                print(f'test \"{test_id}\" deleted')
-            elif _status_is_429(del_result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f"Fail to delete {test_id}, status code {del_result.status_code}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        del_result = self.request("DELETE", delete_url)
+
+        if _status_is_204(del_result.status_code):
+            self.print_line(f'test \"{test_id}\" deleted')
+        elif _status_is_429(del_result.status_code):
+            self.print_line(f"Fail to delete {test_id}, {TOO_MANY_REQUEST_ERROR}")
+        else:
+            self.print_line(
+                f"Fail to delete {test_id}, status code {del_result.status_code}")
+        return del_result.status_code
 
     def delete_multiple_synthetic_tests(self, tests_list: list):
-        start_time = time.time()
-        total_number = 0
-        for t in tests_list:
-            self.delete_a_synthetic_test(t)
-            total_number += 1
-        end_time = time.time()
-        total_time = round((end_time-start_time)*1000, 3)
-        print(f"total deleted: {total_number}, time used: {total_time}ms")
+        """delete tests with --concurrency workers and report status codes, latency and throughput"""
+        report = self.run_bulk(self.delete_a_synthetic_test, tests_list)
+        report.print_report("deleted")
 
     def delete_tests_label_match_regex(self, label_regex=None):
         """delete all tests which match regex"""
@@ -3499,128 +4511,60 @@ class SyntheticTest(Base):
         active_length = 6
         success_rate_length = 12
         response_time_length = 12
-        location_str = NOT_APPLICABLE
+        location_length = 25
 
         test_type = "" if test_type is None else test_type
 
-        if summary_list is None:
-            print(self.fill_space("ID".upper(), id_length),
-                  self.fill_space("Label".upper(), max_label_length),
-                  self.fill_space("syntheticType".upper(), syn_type_length),
-                  self.fill_space("Frequency".upper(), test_frequency_length),
-                  self.fill_space("Active".upper(), active_length),
-                  self.fill_space("Locations".upper()),
-                  "URL".upper())
-            output_lists = []
-            for t in tests:
-                if t is None:
-                    continue
-                syn_type = t['configuration']['syntheticType']
-                syn_type = self.map_synthetic_type_label(syn_type)
-
-                current_type = t['configuration']['syntheticType']
-                if current_type in (HTTPAction_TYPE, WebpageAction_TYPE, SSLCertificate_TYPE, ICMPAction_TYPE):
-                    if len(t['locations']) > 0:
-                        # locations,
-                        location_str = ','.join(t['locationDisplayLabels'])
-                    else:
-                        location_str = NOT_APPLICABLE
-                    if test_type == "" or (test_type != "" and current_type == test_type):
-                        print(self.fill_space(t["id"], id_length),
-                              self.fill_space(t['label'], max_label_length),
-                              self.fill_space(syn_type, syn_type_length),
-                              self.fill_space(self.format_frequency(t["testFrequency"]), test_frequency_length),
-                              self.fill_space(str(t["active"]), active_length),
-                              self.fill_space(location_str),
-                              t['configuration']['url'] if 'url' in t['configuration'] else (
-                                  t['configuration']['hostname'] if 'hostname' in  t['configuration'] else None))
-                        output_lists.append(t)
+        columns = [("ID", id_length),
+                   ("LABEL", max_label_length),
+                   ("SYNTHETICTYPE", syn_type_length),
+                   ("FREQUENCY", test_frequency_length)]
+        if summary_list is not None:
+            columns += [("SUCCESSRATE", success_rate_length),
+                        ("LATENCY", response_time_length)]
+            index = ResourceIndex(test_summaries=summary_list)
+        columns += [("ACTIVE", active_length),
+                    ("LOCATIONS", location_length),
+                    ("URL", 0)]
+        table = TableWriter(columns, sample_size=0)
+        for t in tests:
+            if t is None:
+                continue
+            current_type = t['configuration']['syntheticType']
+            if test_type != "" and current_type != test_type:
+                continue
+            if current_type in (HTTPAction_TYPE, WebpageAction_TYPE, SSLCertificate_TYPE, ICMPAction_TYPE):
+                if summary_list is None:
+                    url = t['configuration']['url'] if 'url' in t['configuration'] else (
+                        t['configuration']['hostname'] if 'hostname' in t['configuration'] else None)
+                else:
+                    url = t['configuration']['url'] if 'url' in t['configuration'] else 'None'
+            elif current_type in (HTTPScript_TYPE, WebpageScript_TYPE, BrowserScript_TYPE, DNSAction_TYPE):
                 # Below test types don't have a url
-                if t['configuration']['syntheticType'] in [HTTPScript_TYPE, WebpageScript_TYPE, BrowserScript_TYPE, DNSAction_TYPE]:
-                    if len(t['locations']) > 0:
-                        location_str = ','.join(t['locationDisplayLabels'])
-                    else:
-                        location_str = NOT_APPLICABLE
-                    if test_type == "" or (test_type != "" and current_type == test_type):
-                        print(self.fill_space(t["id"], id_length),
-                              self.fill_space(t['label'], max_label_length),
-                              self.fill_space(syn_type, syn_type_length),
-                              self.fill_space(self.format_frequency(t["testFrequency"]), test_frequency_length),
-                              self.fill_space(str(t["active"]), active_length),
-                              self.fill_space(location_str),
-                              "N/A")  # None URL => N/A
-                        output_lists.append(t)
-        else:
-            # show title
-            print(self.fill_space("ID".upper(), id_length),
-                  self.fill_space("Label".upper(), max_label_length),
-                  self.fill_space("syntheticType".upper(), syn_type_length),
-                  self.fill_space("Frequency".upper(), test_frequency_length),
-                  self.fill_space("SuccessRate".upper(), success_rate_length),
-                  self.fill_space("Latency".upper(), response_time_length),
-                  self.fill_space("Active".upper(), active_length),
-                  self.fill_space("Locations".upper()),
-                  "URL".upper())
-            # tests = self.test_lists
-            output_lists = []
-            for t in tests:
-                if t is None:
-                    continue
+                url = "N/A"
+            else:
+                continue
+            location_str = ','.join(t['locationDisplayLabels']) if len(t['locations']) > 0 else NOT_APPLICABLE
+
+            row = [t["id"], t['label'], self.map_synthetic_type_label(current_type),
+                   self.format_frequency(t["testFrequency"])]
+            if summary_list is not None:
                 success_rate_value = "No Data"
                 current_response_time = "No Data"
-                if t["id"] in summary_list:
-                    success_rate_value = summary_list[t["id"]]["success_rate"]
-                    # current_response_time = summary_list[""]
+                test_summary = index.summary_of_test(t["id"])
+                if test_summary is not None:
+                    success_rate_value = test_summary["success_rate"]
                     current_response_time = str(
-                        summary_list[t["id"]]["response_time"])+"ms" if summary_list[t["id"]]["response_time"] != "N/A" else "N/A"
-                # else:
-                #     print(t["id"], "not in summary list")
-                syn_type = t['configuration']['syntheticType']
-                syn_type = self.map_synthetic_type_label(syn_type)
-
-                current_type = t['configuration']['syntheticType']
-                if current_type in (HTTPAction_TYPE, WebpageAction_TYPE, SSLCertificate_TYPE, ICMPAction_TYPE):
-                    if len(t['locations']) > 0:
-                        # locations,
-                        location_str = ','.join(t['locationDisplayLabels'])
-                    else:
-                        location_str = NOT_APPLICABLE
-                    if test_type == "" or (test_type != "" and current_type == test_type):
-                        print(self.fill_space(t["id"], id_length),
-                              self.fill_space(t['label'], max_label_length),
-                              self.fill_space(syn_type, syn_type_length),
-                              self.fill_space(self.format_frequency(t["testFrequency"]), test_frequency_length),
-                              self.fill_space(str(success_rate_value),
-                                              success_rate_length),
-                              self.fill_space(current_response_time,
-                                              response_time_length),
-                              self.fill_space(str(t["active"]), active_length),
-                              self.fill_space(location_str),
-                              t['configuration']['url'] if 'url' in t['configuration'] else 'None')
-                        output_lists.append(t)
-                if (t['configuration']['syntheticType'] in [HTTPScript_TYPE, WebpageScript_TYPE, BrowserScript_TYPE, DNSAction_TYPE]):
-                    if len(t['locations']) > 0:
-                        location_str = ','.join(t['locationDisplayLabels'])
-                    else:
-                        location_str = NOT_APPLICABLE
-                    if test_type == "" or (test_type != "" and current_type == test_type):
-                        print(self.fill_space(t["id"], id_length),
-                              self.fill_space(t['label'], max_label_length),
-                              self.fill_space(syn_type, syn_type_length),
-                              self.fill_space(self.format_frequency(t["testFrequency"]), test_frequency_length),
-                              self.fill_space(str(success_rate_value),
-                                              success_rate_length),
-                              self.fill_space(current_response_time,
-                                              response_time_length),
-                              self.fill_space(str(t["active"]), active_length),
-                              self.fill_space(location_str),
-                              "N/A")  # None URL => N/A
-                        output_lists.append(t)
-        print('total:', len(output_lists))
-
-    def print_tests_without_locations(self):
+                        test_summary["response_time"])+"ms" if test_summary["response_time"] != "N/A" else "N/A"
+                row += [success_rate_value, current_response_time]
+            row += [t["active"], location_str, url]
+            table.write_row(row)
+        print('total:', table.close())
+
+    def print_tests_without_locations(self, full_syn_tests=None):
         show_syn_id_lists = []
-        full_syn_tests = self.retrieve_all_synthetic_tests()
+        if full_syn_tests is None:
+            full_syn_tests = self.retrieve_all_synthetic_tests()
         for syn in full_syn_tests:
             label = syn["label"]
             syn_locations = syn["locations"]
@@ -3811,121 +4755,69 @@ class SmartAlert(Base):
     def retrieve_all_smart_alerts(self):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/events/settings/global-alert-configs/synthetics/"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            alert_result = requests.get(retrieve_url,
-                                        headers=headers,
-                                        timeout=60,
-                                        verify=self.insecure)
+        alert_result = self.request("GET", retrieve_url)
 
-            if _status_is_200(alert_result.status_code):
-                data = alert_result.json()
-                return data
-            else:
-                self.exit_synctl(ERROR_CODE, f'get alert failed, status code: {alert_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        if _status_is_200(alert_result.status_code):
+            data = alert_result.json()
+            return data
+        else:
+            self.exit_synctl(ERROR_CODE, f'get alert failed, status code: {alert_result.status_code}')
 
     def retrieve_a_smart_alert(self, alert_id=""):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/events/settings/global-alert-configs/synthetics/{alert_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            alert_result = requests.get(retrieve_url,
-                                        headers=headers,
-                                        timeout=60,
-                                        verify=self.insecure)
-
-            if _status_is_200(alert_result.status_code):
-                data = alert_result.json()
-
-                if isinstance(data, list):
-                    self.alert_lists = data
-                    return data
-                elif isinstance(data, dict):
-                    self.alert_lists = [data]
-                    return [data]
-                else:
-                    print('unknown data:', data)
-            elif _status_is_404(alert_result.status_code):
-                self.exit_synctl(ERROR_CODE,
-                                 message=f'alert {alert_id} not found')
+        alert_result = self.request("GET", retrieve_url)
+
+        if _status_is_200(alert_result.status_code):
+            data = alert_result.json()
+
+            if isinstance(data, list):
+                self.alert_lists = data
+                return data
+            elif isinstance(data, dict):
+                self.alert_lists = [data]
+                return [data]
             else:
-                self.exit_synctl(ERROR_CODE, f'get alert failed, status code: {alert_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+                print('unknown data:', data)
+        elif _status_is_404(alert_result.status_code):
+            self.exit_synctl(ERROR_CODE,
+                             message=f'alert {alert_id} not found')
+        else:
+            self.exit_synctl(ERROR_CODE, f'get alert failed, status code: {alert_result.status_code}')
 
     def retrieve_all_alerting_channel(self):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/events/settings/alertingChannels/"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            alert_channel_result = requests.get(retrieve_url,
-                                                headers=headers,
-                                                timeout=60,
-                                                verify=self.insecure)
+        alert_channel_result = self.request("GET", retrieve_url)
 
-            if _status_is_200(alert_channel_result.status_code):
-                data = alert_channel_result.json()
-                return data
-            else:
-                self.exit_synctl(ERROR_CODE, f'get alert channel failed, status code: {alert_channel_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        if _status_is_200(alert_channel_result.status_code):
+            data = alert_channel_result.json()
+            return data
+        else:
+            self.exit_synctl(ERROR_CODE, f'get alert channel failed, status code: {alert_channel_result.status_code}')
 
     def retrieve_a_single_alerting_channel(self, alert_channel):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         retrieve_url = f"{host}/api/events/settings/alertingChannels/{alert_channel}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            alert_channel_result = requests.get(retrieve_url,
-                                                headers=headers,
-                                                timeout=60,
-                                                verify=self.insecure)
+        alert_channel_result = self.request("GET", retrieve_url)
 
-            if _status_is_200(alert_channel_result.status_code):
-                data = alert_channel_result.json()
-                return data
-            else:
-                self.exit_synctl(ERROR_CODE, f'get alert channel failed, status code: {alert_channel_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        if _status_is_200(alert_channel_result.status_code):
+            data = alert_channel_result.json()
+            return data
+        else:
+            self.exit_synctl(ERROR_CODE, f'get alert channel failed, status code: {alert_channel_result.status_code}')
             self.exit_synctl(f"Connection to {host} timed out")
 
 
@@ -3933,37 +4825,23 @@ class SmartAlert(Base):
         alert_payload = self.payload
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         create_url = f"{host}/api/events/settings/global-alert-configs/synthetics"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            create_res = requests.post(create_url,
-                                       headers=headers,
-                                       data=alert_payload,
-                                       timeout=60,
-                                       verify=self.insecure)
-
-            if _status_is_200(create_res.status_code):
-                # extracting data in json format
-                data = create_res.json()
-                alert_id = data["id"]
-                alert_name = data["name"]
-                print(f"smart alert \"{alert_name}\" created, id is \"{alert_id}\"")
-            elif _status_is_429(create_res.status_code):
-                self.exit_synctl(-1, TOO_MANY_REQUEST_ERROR)
-            else:
-                print('create test failed, status code:', create_res.status_code)
-                if create_res.text:
-                    print(create_res.text)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        create_res = self.request("POST", create_url, data=alert_payload)
+
+        if _status_is_200(create_res.status_code):
+            # extracting data in json format
+            data = create_res.json()
+            alert_id = data["id"]
+            alert_name = data["name"]
+            print(f"smart alert \"{alert_name}\" created, id is \"{alert_id}\"")
+        elif _status_is_429(create_res.status_code):
+            self.exit_synctl(-1, TOO_MANY_REQUEST_ERROR)
+        else:
+            print('create test failed, status code:', create_res.status_code)
+            if create_res.text:
+                print(create_res.text)
 
     def invalid_create_options(self, invalid_options, items, tag_filter_type=None):
         for key, value in items:
@@ -3979,28 +4857,16 @@ class SmartAlert(Base):
         host = self.auth["host"]
 
         delete_url = f"{host}/api/events/settings/global-alert-configs/synthetics/{alert_id}"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "apiToken %s" % (self.auth["token"])
-        }
-        try:
-            result = requests.delete(delete_url,
-                                     headers=headers,
-                                     timeout=60,
-                                     verify=self.insecure)
-
-            if _status_is_204(result.status_code):
-                print(f'alert \"{alert_id}\" deleted')
-            elif _status_is_404(result.status_code):
-                self.exit_synctl(ERROR_CODE, f"{alert_id} not found")
-            elif _status_is_429(result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                self.exit_synctl(ERROR_CODE, f"Failed to delete {alert_id}, status code {result.status_code}")
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        result = self.request("DELETE", delete_url)
+
+        if _status_is_204(result.status_code):
+            print(f'alert \"{alert_id}\" deleted')
+        elif _status_is_404(result.status_code):
+            self.exit_synctl(ERROR_CODE, f"{alert_id} not found")
+        elif _status_is_429(result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            self.exit_synctl(ERROR_CODE, f"Failed to delete {alert_id}, status code {result.status_code}")
 
     def delete_multiple_smart_alerts(self, alert_list):
         start_time = time.time()
@@ -4084,6 +4950,8 @@ class UpdateSyntheticTest(SyntheticTest):
     def __init__(self) -> None:
         super().__init__()
         self.update_config = None
+        # the test as retrieved, compared with update_config to only send changes
+        self.current_config = None
         self.test_id = ""
 
     def set_updated_payload(self, payload):
@@ -4091,6 +4959,7 @@ class UpdateSyntheticTest(SyntheticTest):
             print("payload should not be none")
         else:
             self.update_config = payload[0]
+            self.current_config = copy.deepcopy(payload[0])
 
     def invalid_update_options(self, invalid_options, items, syn_type=None, toggle=None):
         for key, value in items:
@@ -4104,7 +4973,6 @@ class UpdateSyntheticTest(SyntheticTest):
         """API https://instana.github.io/openapi/#operation/updateSyntheticTest"""
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if new_payload is None:
             self.exit_synctl(ERROR_CODE, "config cannot be empty")
 
@@ -4114,30 +4982,58 @@ class UpdateSyntheticTest(SyntheticTest):
         else:
             put_url = f"{host}/api/synthetics/settings/tests/{test_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
+        update_result = self.request("PUT", put_url, data=new_payload)
+
+        if _status_is_200(update_result.status_code):
+            print(f"test {test_id} updated")
+        elif _status_is_400(update_result.status_code):
+            print(f'Error: {update_result}', update_result.content)
+        elif _status_is_429(update_result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'update test {test_id} failed, status code: {update_result.status_code}')
+
+    def __patch_changed_fields(self, test_id, delta):
+        host = self.auth["host"]
+        patch_url = f"{host}/api/synthetics/settings/tests/{test_id}"
+        patch_result = self.request("PATCH", patch_url, data=json.dumps(delta))
+
+        if _status_is_200(patch_result.status_code):
+            print(f"test {test_id} updated")
+        elif _status_is_400(patch_result.status_code):
+            print(f'Error: {patch_result}', patch_result.content)
+        elif _status_is_429(patch_result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'update test {test_id} failed, status code: {patch_result.status_code}')
+
+    def apply_update(self, test_id, new_payload):
+        """send only the changed fields with PATCH, the whole test with PUT when a field
+        is removed or the synthetic type changes, nothing when the test is unchanged"""
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        if new_payload is None:
+            self.exit_synctl(ERROR_CODE, "config cannot be empty")
         try:
-            update_result = requests.put(put_url,
-                                         headers=headers,
-                                         data=new_payload,
-                                         timeout=60,
-                                         verify=self.insecure)
-
-            if _status_is_200(update_result.status_code):
-                print(f"test {test_id} updated")
-            elif _status_is_400(update_result.status_code):
-                print(f'Error: {update_result}', update_result.content)
-            elif _status_is_429(update_result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'update test {test_id} failed, status code: {update_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+            new_config = json.loads(new_payload)
+        except ValueError as e:
+            self.exit_synctl(ERROR_CODE, f"invalid test config: {e}")
+        if isinstance(new_config, list) and len(new_config) == 1:
+            new_config = new_config[0]
+        if self.current_config is None or not isinstance(new_config, dict):
+            self.update_a_synthetic_test(test_id, new_payload)
+            return
+
+        delta = payload_delta(self.current_config, new_config, ignored=TEST_READ_ONLY_FIELDS)
+        if delta is None or "syntheticType" in delta.get("configuration", {}):
+            self.update_a_synthetic_test(test_id, new_payload)
+        elif not delta:
+            print(f"test {test_id} unchanged")
+        else:
+            if "configuration" in delta:
+                delta["configuration"]["syntheticType"] = self.current_config["configuration"]["syntheticType"]
+            self.__patch_changed_fields(test_id, delta)
 
     def update_using_file(self, file_name):
         with open(file_name, 'rb') as json_file:
@@ -4173,7 +5069,7 @@ class UpdateSyntheticTest(SyntheticTest):
     def update_active(self, active):
         """active"""
         if active is not None and active.upper() in ("TRUE", "FALSE"):
-            self.update_config["active"] = active
+            self.update_config["active"] = active.upper() == "TRUE"
         else:
             self.exit_synctl(ERROR_CODE, "active should not be none")
 
@@ -4515,6 +5411,7 @@ class UpdateSmartAlert(SmartAlert):
     def __init__(self) -> None:
         super().__init__()
         self.update_config = None
+        self.journal_writer = None
 
     def set_updated_payload(self, payload):
         if payload is None:
@@ -4538,7 +5435,6 @@ class UpdateSmartAlert(SmartAlert):
         """API https://instana.github.io/openapi/#operation/updateSyntheticAlertConfig"""
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
         if new_payload is None:
             self.exit_synctl(ERROR_CODE, "config cannot be empty")
 
@@ -4547,32 +5443,19 @@ class UpdateSmartAlert(SmartAlert):
         else:
             update_url = f"{host}/api/events/settings/global-alert-configs/synthetics/{alert_id}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            update_result = requests.post(update_url,
-                                          headers=headers,
-                                          data=new_payload,
-                                          timeout=60,
-                                          verify=self.insecure)
-
-            if _status_is_200(update_result.status_code):
-                print(f"alert {alert_id} updated")
-            elif _status_is_204(update_result.status_code):
-                print(f"alert {alert_id} did not change")
-            elif _status_is_400(update_result.status_code):
-                print(f'Error: {update_result}', update_result.content)
-            elif _status_is_429(update_result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'update alert {alert_id} failed, status code: {update_result.status_code}, {update_result.text}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        update_result = self.request("POST", update_url, data=new_payload)
+
+        if _status_is_200(update_result.status_code):
+            print(f"alert {alert_id} updated")
+        elif _status_is_204(update_result.status_code):
+            print(f"alert {alert_id} did not change")
+        elif _status_is_400(update_result.status_code):
+            print(f'Error: {update_result}', update_result.content)
+        elif _status_is_429(update_result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'update alert {alert_id} failed, status code: {update_result.status_code}, {update_result.text}')
 
     def toggle_smart_alert(self, alert_id, toggle):
         """API https://instana.github.io/openapi/#operation/enableSyntheticAlertConfig
@@ -4580,7 +5463,6 @@ class UpdateSmartAlert(SmartAlert):
 
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         if alert_id is None:
             self.exit_synctl(ERROR_CODE, "alert id should not be none")
@@ -4588,29 +5470,99 @@ class UpdateSmartAlert(SmartAlert):
             if toggle in ('enable', 'disable'):
                 put_url = f"{host}/api/events/settings/global-alert-configs/synthetics/{alert_id}/{toggle}"
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
+        update_result = self.request("PUT", put_url)
+
+        if _status_is_204(update_result.status_code):
+            print(f"alert {alert_id} {toggle}d")
+        elif _status_is_400(update_result.status_code):
+            print(f'Error: {update_result}', update_result.content)
+        elif _status_is_429(update_result.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'update alert {alert_id} failed, status code: {update_result.status_code}, {update_result.text}')
+
+    def select_alerts(self, name_regex=None, test_ids=None):
+        """smart alerts whose name matches name_regex and which alert on one of test_ids, from one listing"""
+        prog = re.compile(name_regex) if name_regex is not None else None
+        selected_alerts = []
+        for alert in self.retrieve_all_smart_alerts():
+            if prog is not None and prog.match(alert.get("name", "")) is None:
+                continue
+            if test_ids is not None and not set(test_ids) & set(alert.get("syntheticTestIds", [])):
+                continue
+            selected_alerts.append(alert)
+        return selected_alerts
+
+    def __toggle_one_alert(self, item):
+        """enable or disable one alert of toggle_selected_alerts and restore_alerts, return the status code,
+        with a journal open the state before the change is written to it"""
+        alert_id, toggle, enabled_before = item
+        host = self.auth["host"]
+        update_result = self.request("PUT", f"{host}/api/events/settings/global-alert-configs/synthetics/{alert_id}/{toggle}")
+        if _status_is_204(update_result.status_code):
+            if self.journal_writer is not None:
+                with self.journal_lock:
+                    self.journal_writer.write(json.dumps({"id": alert_id, "enabled": enabled_before}) + "\n")
+                    self.journal_writer.flush()
+        else:
+            self.print_line(f'{toggle} alert {alert_id} failed, status code: {update_result.status_code}', update_result.text)
+        return update_result.status_code
+
+    def toggle_selected_alerts(self, selected_alerts, toggle, journal_file, dry_run=False, assume_yes=False):
+        """enable or disable the selected alerts with --concurrency workers, assume_yes skips the confirmation,
+        alerts which change are written to journal_file, restore_alerts reverts them"""
+        enabled = toggle == "enable"
+        to_change = [alert for alert in selected_alerts if alert.get("enabled", True) != enabled]
+        for alert in to_change:
+            print(f'alert "{alert.get("name", "")}" {alert["id"]}')
+        print(f"total match: {len(selected_alerts)}, to {toggle}: {len(to_change)}, "
+              f"already {toggle}d: {len(selected_alerts) - len(to_change)}")
+        if dry_run or len(to_change) == 0:
+            return
+        if os.path.isfile(journal_file) and os.path.getsize(journal_file) > 0:
+            self.exit_synctl(ERROR_CODE, f"{journal_file} exists, restore it with --restore or use another --journal")
+        if not assume_yes and not self.ask_answer(f"are you sure to {toggle} these alerts?"):
+            return
+
+        self.journal_lock = threading.Lock()
         try:
-            update_result = requests.put(put_url,
-                                         headers=headers,
-                                         timeout=60,
-                                         verify=self.insecure)
-
-            if _status_is_204(update_result.status_code):
-                print(f"alert {alert_id} {toggle}d")
-            elif _status_is_400(update_result.status_code):
-                print(f'Error: {update_result}', update_result.content)
-            elif _status_is_429(update_result.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'update alert {alert_id} failed, status code: {update_result.status_code}, {update_result.text}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+            with open(journal_file, "w", encoding="utf-8") as self.journal_writer:
+                self.journal_writer.write(json.dumps({"host": self.auth["host"], "toggle": toggle}) + "\n")
+                report = self.run_bulk(self.__toggle_one_alert,
+                                       [(alert["id"], toggle, alert.get("enabled", True)) for alert in to_change],
+                                       progress=f"{toggle}d")
+        except OSError as e:
+            self.exit_synctl(ERROR_CODE, e)
+        finally:
+            self.journal_writer = None
+        report.print_report(f"{toggle}d")
+        print(f"changed alerts saved to {journal_file}, revert them with: synctl update alert --restore {journal_file}")
+
+    def restore_alerts(self, journal_file):
+        """set every alert of the journal back to its state before toggle_selected_alerts,
+        the journal is removed when all alerts are restored"""
+        items = []
+        try:
+            with open(journal_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "host" in entry and entry["host"] != self.auth["host"]:
+                        self.exit_synctl(ERROR_CODE, f"{journal_file} is a journal of {entry['host']}")
+                    if "id" in entry:
+                        items.append((entry["id"], "enable" if entry["enabled"] else "disable", None))
+        except OSError as e:
+            self.exit_synctl(ERROR_CODE, e)
+
+        report = self.run_bulk(self.__toggle_one_alert, items, progress="restored")
+        report.print_report("restored")
+        if report.succeeded() == report.total():
+            os.remove(journal_file)
+        else:
+            self.exit_synctl(ERROR_CODE, f"some alerts are not restored, run --restore {journal_file} again")
 
     def update_alert_name(self, name):
         """update alert name"""
@@ -4682,6 +5634,11 @@ class PatchSyntheticTest(SyntheticTest):
     def __init__(self) -> None:
         super().__init__()
         self.test_id = ""
+        # all patch_xxx() are merged into one document and sent by apply_patch()
+        self.patch_payload = {}
+        self.current_test = None
+        # synthetic types of the tests of select_tests, the same patch is sent to all of them
+        self.selected_types = None
 
     def __ensure_test_id_not_none(self, test_id):
         if test_id is None or test_id == "":
@@ -4690,7 +5647,6 @@ class PatchSyntheticTest(SyntheticTest):
     def __patch_a_synthetic_test(self, test_id, data):
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         self.__ensure_test_id_not_none(test_id)
         patch_url = f"{host}/api/synthetics/settings/tests/{test_id}"
@@ -4698,34 +5654,83 @@ class PatchSyntheticTest(SyntheticTest):
         if data is None:
             self.exit_synctl(ERROR_CODE, "Patch Error:data cannot be empty")
 
-        headers = {
-            'Content-Type': 'application/json',
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            patch_result = requests.patch(patch_url,
-                                          headers=headers,
-                                          data=data,
-                                          timeout=60,
-                                          verify=self.insecure)
-
-            if _status_is_200(patch_result.status_code):
-                print(f"{test_id} updated")
-            elif _status_is_400(patch_result.status_code):
-                print(f'Patch Error: {patch_result}', patch_result.json())
-            elif _status_is_429(patch_result.status_code):
-                print(TOO_MANY_REQUEST_ERROR)
-            else:
-                print(
-                    f'patch test {test_id} failed, status code: {patch_result.status_code}')
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        patch_result = self.request("PATCH", patch_url, data=data)
+
+        if _status_is_200(patch_result.status_code):
+            print(f"{test_id} updated")
+        elif _status_is_400(patch_result.status_code):
+            print(f'Patch Error: {patch_result}', patch_result.json())
+        elif _status_is_429(patch_result.status_code):
+            print(TOO_MANY_REQUEST_ERROR)
+        else:
+            print(
+                f'patch test {test_id} failed, status code: {patch_result.status_code}')
+
+    def __merge_patch(self, payload):
+        deep_merge(self.patch_payload, payload)
+
+    def get_current_test(self):
+        """the test being patched, only retrieved once"""
+        if self.current_test is None:
+            self.current_test = self.retrieve_a_synthetic_test(self.test_id)[0]
+        return self.current_test
+
+    def apply_patch(self):
+        """send all merged fields in one request"""
+        if not self.patch_payload:
+            return
+        self.__patch_a_synthetic_test(self.test_id, json.dumps(self.patch_payload))
+        self.patch_payload = {}
+
+    def select_tests(self, label_regex=None, syn_type=None, location=None):
+        """tests whose label matches label_regex, of syn_type and running on location, from one listing"""
+        prog = re.compile(label_regex) if label_regex is not None else None
+        selected_tests = []
+        for syn in self.retrieve_all_synthetic_tests():
+            if prog is not None and prog.match(syn["label"]) is None:
+                continue
+            if syn_type is not None and syn["configuration"]["syntheticType"] != syn_type:
+                continue
+            if location is not None and location not in syn["locations"]:
+                continue
+            selected_tests.append(syn)
+        # patch_xxx validates against the synthetic type when all selected tests have the same type
+        syn_types = {syn["configuration"]["syntheticType"] for syn in selected_tests}
+        self.selected_types = syn_types
+        self.current_test = {"configuration": {"syntheticType": next(iter(syn_types)) if len(syn_types) == 1 else None}}
+        return selected_tests
+
+    def __patch_selected_test(self, test_id):
+        """patch one test of patch_selected_tests, only failures are printed"""
+        host = self.auth["host"]
+        patch_result = self.request("PATCH", f"{host}/api/synthetics/settings/tests/{test_id}",
+                                    data=self.selected_patch_data)
+        if not _status_is_200(patch_result.status_code):
+            self.print_line(f'patch test {test_id} failed, status code: {patch_result.status_code}', patch_result.text)
+        return patch_result.status_code
+
+    def patch_selected_tests(self, selected_tests, dry_run=False, assume_yes=False):
+        """send the merged patch to every selected test with --concurrency workers,
+        assume_yes skips the confirmation"""
+        if not self.patch_payload:
+            self.exit_synctl(ERROR_CODE, "Patch Error: no option to patch")
+        for syn in selected_tests:
+            print(f'test "{syn["label"]}"')
+        print('total match:', len(selected_tests))
+        print('patch:', json.dumps(self.patch_payload))
+        if dry_run or len(selected_tests) == 0:
+            return
+        if not assume_yes and not self.ask_answer("are you sure to patch these tests?"):
+            return
+        self.selected_patch_data = json.dumps(self.patch_payload)
+        report = self.run_bulk(self.__patch_selected_test, [syn["id"] for syn in selected_tests], progress="patched")
+        report.print_report("patched")
 
     def set_test_id(self, test_id):
         """set test id"""
         self.__ensure_test_id_not_none(test_id)
+        if test_id != self.test_id:
+            self.current_test = None
         self.test_id = test_id
 
     def patch_label(self, label):
@@ -4735,7 +5740,7 @@ class PatchSyntheticTest(SyntheticTest):
             print("no label")
         else:
             payload["label"] = label
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_description(self, description):
         """description"""
@@ -4744,19 +5749,19 @@ class PatchSyntheticTest(SyntheticTest):
             print("no description")
         else:
             payload["description"] = description
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_record_video(self, record_video=False):
         payload = {"configuration": {"recordVideo": False}}
         if record_video is not None and record_video.upper() in ("TRUE", "FALSE"):
             payload["configuration"]["recordVideo"] = record_video
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_browser(self, browser):
         payload = {"configuration": {"browser": "chrome"}}
         if browser is not None:
             payload["configuration"]["browser"] = browser
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_active(self, active):
         """active"""
@@ -4767,12 +5772,17 @@ class PatchSyntheticTest(SyntheticTest):
             payload["active"] = False
         if active == "true":
             payload["active"] = True
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_frequency(self, frequency):
         """patch frequency [1,120], SSLCertificate test [1,1440]"""
-        test_payload = self.retrieve_a_synthetic_test(self.test_id)
-        synthetic_type = test_payload[0]["configuration"]["syntheticType"]
+        if self.selected_types is not None and len(self.selected_types) > 1 and \
+                SSLCertificate_TYPE in self.selected_types and frequency is not None and frequency > 120:
+            other_types = ", ".join(sorted(x for x in self.selected_types if x != SSLCertificate_TYPE))
+            self.exit_synctl(ERROR_CODE, f"frequency {frequency} is only valid for SSLCertificate tests, "
+                                         f"the selected tests are also {other_types}, "
+                                         f"select SSLCertificate tests with --type 5 to patch them")
+        synthetic_type = self.get_current_test()["configuration"]["syntheticType"]
         if synthetic_type == SSLCertificate_TYPE:
             payload = {"testFrequency": 1440}
         else:
@@ -4787,7 +5797,7 @@ class PatchSyntheticTest(SyntheticTest):
             self.exit_synctl(ERROR_CODE, "frequency is not valid, it should be in [1,1440]")
         else:
             self.exit_synctl(ERROR_CODE, "frequency is not valid, it should be in [1,120]")
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_locations(self, locations):
         """--locations patch locations"""
@@ -4797,7 +5807,7 @@ class PatchSyntheticTest(SyntheticTest):
             return
         else:
             payload["locations"] = locations
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_config_timeout(self, timeout):
         """--timeout 2m, <number>(ms|s|m)"""
@@ -4806,7 +5816,7 @@ class PatchSyntheticTest(SyntheticTest):
             return
         else:
             payload["configuration"]["timeout"] = timeout
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_retries(self, retry: int):
         """retries"""
@@ -4816,7 +5826,7 @@ class PatchSyntheticTest(SyntheticTest):
         else:
             print("retry should be in [0, 2]")
             return
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_retry_interval(self, interval: int):
         """retryInterval"""
@@ -4828,7 +5838,7 @@ class PatchSyntheticTest(SyntheticTest):
         else:
             print("retryInterval should be in [1,10]")
             return
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_ping_operation(self, method: str = "GET"):
         """operation"""
@@ -4837,7 +5847,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"operation": ""}}
         if method is not None and method.upper() in valid_methods:
             payload["configuration"]["operation"] = method.upper()
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print(f"{method} is not allowed")
             return
@@ -4848,7 +5858,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"markSyntheticCall": ""}}
         if markSyntheticCall is not None and markSyntheticCall.lower() in markSyntheticCall_options:
             payload["configuration"]["markSyntheticCall"] = markSyntheticCall
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("markSyntheticCall should be true or false")
 
@@ -4857,7 +5867,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"script": ""}}
         if script is not None:
             payload["configuration"]["script"] = script
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("script cannot be none")
             return
@@ -4873,9 +5883,11 @@ class PatchSyntheticTest(SyntheticTest):
 
     def patch_bundle(self, test_id, bundle):
         """update bundle"""
-        test_result = self.retrieve_a_synthetic_test(test_id)
+        test_result = self.get_current_test()
         try:
-            bundle_entry_file = test_result[0]["configuration"]["scripts"]["scriptFile"]
+            # keep the entry file of this patch if there is one
+            pending_scripts = self.patch_payload.get("configuration", {}).get("scripts", {})
+            bundle_entry_file = pending_scripts.get("scriptFile", test_result["configuration"]["scripts"]["scriptFile"])
             payload = {
                 "configuration":
                     {
@@ -4894,14 +5906,15 @@ class PatchSyntheticTest(SyntheticTest):
                         'utf-8')
             else:
                 payload["configuration"]["scripts"]["bundle"] = bundle
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         except Exception as e:
             print(f"Error: Test {test_id} not found, exception {e}")
 
     def patch_bundle_entry_file(self, script_file, test_id):
-        test_result = self.retrieve_a_synthetic_test(test_id)
+        test_result = self.get_current_test()
         try:
-            test_bundle = test_result[0]["configuration"]["scripts"]["bundle"]
+            pending_scripts = self.patch_payload.get("configuration", {}).get("scripts", {})
+            test_bundle = pending_scripts.get("bundle", test_result["configuration"]["scripts"]["bundle"])
             payload = {
                 "configuration":
                     {
@@ -4916,7 +5929,7 @@ class PatchSyntheticTest(SyntheticTest):
                 print("script_file should not be None")
             else:
                 payload["configuration"]["scripts"]["scriptFile"] = script_file
-                self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+                self.__merge_patch(payload)
         except:
             print(f"Error: Test {test_id} not found")
 
@@ -4925,7 +5938,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"url": ""}}
         if url is not None:
             payload["configuration"]["url"] = url
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("url should not be none")
 
@@ -4935,7 +5948,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"followRedirect": ""}}
         if follow_redirect is not None and follow_redirect in follow_redirect_options:
             payload["configuration"]["followRedirect"] = follow_redirect
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("followRedirect should be true/false ")
 
@@ -4944,7 +5957,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"expectStatus": ""}}
         if expect_status is not None:
             payload["configuration"]["expectStatus"] = expect_status
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("expectStatus should not be none")
 
@@ -4954,7 +5967,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"allowInsecure": ""}}
         if allow_insecure is not None and allow_insecure.lower() in allow_insecure_opions:
             payload["configuration"]["allowInsecure"] = allow_insecure
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("allowInsecure should be true/false")
 
@@ -4963,7 +5976,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"expectJson": ""}}
         if expect_json is not None:
             payload["configuration"]["expectJson"] = json.loads(expect_json)
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("expectJson should not be none")
 
@@ -4972,7 +5985,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"expectNotEmpty": ""}}
         if expect_not_empty is not None:
             payload["configuration"]["expectNotEmpty"] = json.loads(expect_not_empty)
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("expectNotEmpty should not be none")
 
@@ -4981,7 +5994,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"expectExists": ""}}
         if expect_exists is not None:
             payload["configuration"]["expectExists"] = json.loads(expect_exists)
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("expectExists should not be none")
 
@@ -4990,7 +6003,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"expectMatch": ""}}
         if expect_match is not None:
             payload["configuration"]["expectMatch"] = expect_match
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("expectMatch should not be none")
 
@@ -5001,13 +6014,13 @@ class PatchSyntheticTest(SyntheticTest):
             print("validation string should not be none")
         else:
             payload["configuration"]["validationString"] = validation_string
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
 
     def patch_custom_properties(self, test_id, custom_property):
         """update custom properties"""
-        test_result = self.retrieve_a_synthetic_test(test_id)
-        payload = test_result[0]
+        test_result = self.get_current_test()
+        payload = {"customProperties": dict(test_result.get("customProperties") or {})}
         if any(s == '' or s.isspace() for s in custom_property):
             self.exit_synctl(ERROR_CODE, "Custom property should be <key>=<value>")
 
@@ -5017,22 +6030,22 @@ class PatchSyntheticTest(SyntheticTest):
                 self.exit_synctl(ERROR_CODE, "Custom property should be <key>=<value>")
 
             payload["customProperties"][key] = value
-        self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+        self.__merge_patch(payload)
 
     def patch_application_id(self, apps):
-        payload = {"configuration": {"applications": ""}}
+        payload = {"applications": []}
         if apps is None or apps == "":
             print("app id should not be empty")
         else:
             payload["applications"] = apps
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
 
     def patch_host(self, test_id, host):
         """update host for SSL test"""
         payload = {"configuration": {"hostname": ""}}
         if host is not None:
             payload["configuration"]["hostname"] = host
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("host should not be none")
 
@@ -5041,7 +6054,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"port": ""}}
         if port is not None:
             payload["configuration"]["port"] = port
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("port should not be none")
 
@@ -5049,15 +6062,16 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"daysRemainingCheck": ""}}
         if rem_days is not None:
             payload["configuration"]["daysRemainingCheck"] = rem_days
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("remaining days should not be none")
 
     def patch_cname(self, cname):
         cname_opions = ["true", "false"]
+        payload = {"configuration": {"acceptCNAME": ""}}
         if cname is not None and cname.lower() in cname_opions:
             payload["configuration"]["acceptCNAME"] = cname
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("cname days should not be none")
 
@@ -5065,7 +6079,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"lookup": ""}}
         if lookup is not None:
             payload["configuration"]["lookup"] = lookup
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("lookup should not be None")
 
@@ -5074,7 +6088,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"lookupServerName": ""}}
         if lookup_server_name is not None and lookup_server_name.lower() in lookup_server_options:
             payload["configuration"]["lookupServerName"] = lookup_server_name
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("lookup server name should not be None")
 
@@ -5082,7 +6096,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"queryTime": ""}}
         if query_time is not None:
             payload["configuration"]["queryTime"] = query_time
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("query time should not be None")
 
@@ -5090,7 +6104,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"queryType": ""}}
         if query_type is not None:
             payload["configuration"]["queryType"] = query_type
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("query type should not be None")
 
@@ -5098,7 +6112,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"recursiveLookups": ""}}
         if recursive_lookups is not None:
             payload["configuration"]["recursiveLookups"] = recursive_lookups
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("recursive lookups server should not be None")
 
@@ -5106,7 +6120,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"server": ""}}
         if server is not None:
             payload["configuration"]["server"] = server
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("server should not be None")
 
@@ -5114,7 +6128,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"serverRetries": ""}}
         if server_retries is not None:
             payload["configuration"]["serverRetries"] = server_retries
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("server retries should not be None")
 
@@ -5122,7 +6136,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"targetValues": ""}}
         if target_values is not None:
             payload["configuration"]["targetValues"] = target_values
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("target values should not be None")
 
@@ -5130,7 +6144,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"transport": ""}}
         if transport is not None:
             payload["configuration"]["transport"] = transport
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("transport should not be None")
     # ICMP patch methods
@@ -5138,7 +6152,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"targetHost": ""}}
         if target_host is not None:
             payload["configuration"]["targetHost"] = target_host
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("target host should not be None")
 
@@ -5146,7 +6160,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"packetCount": ""}}
         if packet_count is not None:
             payload["configuration"]["packetCount"] = packet_count
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("packet count should not be None")
 
@@ -5154,7 +6168,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"packetSize": ""}}
         if packet_size is not None:
             payload["configuration"]["packetSize"] = packet_size
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("packet size should not be None")
 
@@ -5162,7 +6176,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"packetTimeout": ""}}
         if packet_timeout is not None:
             payload["configuration"]["packetTimeout"] = packet_timeout
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("packet timeout should not be None")
 
@@ -5171,7 +6185,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"useIPv6": ""}}
         if use_ipv6 is not None and use_ipv6.lower() in ipv6_options:
             payload["configuration"]["useIPv6"] = use_ipv6.lower() == "true"
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("use ipv6 should be true or false")
 
@@ -5180,7 +6194,7 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"useDNS": ""}}
         if use_dns is not None and use_dns.lower() in dns_options:
             payload["configuration"]["useDNS"] = use_dns.lower() == "true"
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("use dns should be true or false")
 
@@ -5188,22 +6202,556 @@ class PatchSyntheticTest(SyntheticTest):
         payload = {"configuration": {"validationRules": ""}}
         if validation_rules is not None:
             payload["configuration"]["validationRules"] = validation_rules
-            self.__patch_a_synthetic_test(self.test_id, json.dumps(payload))
+            self.__merge_patch(payload)
         else:
             print("validation rules should not be None")
 
 
 
-class SyntheticResult(Base):
+class SyntheticTestPlan(SyntheticTest):
+    """compare test configs in a directory with the tests on the server and apply the changes"""
 
     def __init__(self) -> None:
         super().__init__()
-        self.default_page_size = 200
+        self.actions = []
+        self.unchanged = 0
+
+    def load_test_files(self, directory):
+        """return [(file name, test config)] of every .json file in directory"""
+        if directory is None or not os.path.isdir(directory):
+            self.exit_synctl(ERROR_CODE, f"{directory} is not a directory")
+        test_files = []
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, file_name), "r", encoding="utf-8") as json_file:
+                    config = json.load(json_file)
+            except ValueError as e:
+                self.exit_synctl(ERROR_CODE, f"{file_name} is not a valid json file: {e}")
+            for test in config if isinstance(config, list) else [config]:
+                if not isinstance(test, dict) or "label" not in test or "configuration" not in test:
+                    self.exit_synctl(ERROR_CODE, f"{file_name}: label and configuration are required")
+                test_files.append((file_name, test))
+        return test_files
+
+    def normalize_test(self, test, shape=None):
+        """drop fields set by the server, with shape only keep the fields shape has"""
+        normalized = {}
+        for key, value in test.items():
+            if key in TEST_READ_ONLY_FIELDS or (shape is not None and key not in shape):
+                continue
+            if key == "configuration" and shape is not None and isinstance(value, dict):
+                value = {k: v for k, v in value.items() if k in shape["configuration"]}
+            normalized[key] = value
+        return normalized
+
+    def hash_config(self, config) -> str:
+        config_str = json.dumps(config, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(config_str.encode("utf-8")).hexdigest()
+
+    def __find_server_test(self, test, tests_by_id, tests_by_label):
+        """a file with an id matches that test, otherwise the test with the same label"""
+        if test.get("id"):
+            return tests_by_id.get(test["id"])
+        matched = tests_by_label.get(test["label"], [])
+        if len(matched) > 1:
+            self.exit_synctl(ERROR_CODE,
+                             f'label "{test["label"]}" is used by {len(matched)} tests, add "id" to its file')
+        return matched[0] if matched else None
+
+    def make_plan(self, directory, prune=False):
+        """fetch all tests once and work out which tests to create, update and delete"""
+        test_files = self.load_test_files(directory)
+        if prune and len(test_files) == 0:
+            # every test on the server would be deleted
+            self.exit_synctl(ERROR_CODE, f"no test file in {directory}, --prune is refused")
+        server_tests = self.retrieve_all_synthetic_tests(full=True)
+        tests_by_id = {x["id"]: x for x in server_tests}
+        tests_by_label = {}
+        for x in server_tests:
+            tests_by_label.setdefault(x["label"], []).append(x)
+
+        self.actions = []
+        self.unchanged = 0
+        matched_ids = set()
+        for file_name, test in test_files:
+            new_test = self.normalize_test(test)
+            server_test = self.__find_server_test(test, tests_by_id, tests_by_label)
+            if server_test is None:
+                self.actions.append({"action": "create", "file": file_name, "label": test["label"],
+                                     "id": "", "payload": new_test})
+                continue
+            if server_test["id"] in matched_ids:
+                self.exit_synctl(ERROR_CODE, f'test {server_test["id"]} is matched by more than one file')
+            matched_ids.add(server_test["id"])
 
-    def __parse_window_size_num(self, num: str):
-        match1 = re.match(r"(^[1-9]+[0-9]*)", num)
-        if match1 is not None:
-            return int(match1.group())
+            if self.hash_config(self.normalize_test(server_test, shape=new_test)) == self.hash_config(new_test):
+                self.unchanged += 1
+                continue
+            server_config = server_test.get("configuration", {})
+            if new_test["configuration"].get("syntheticType", server_config.get("syntheticType")) != \
+                    server_config.get("syntheticType"):
+                # another synthetic type cannot be patched, replace the whole test
+                self.actions.append({"action": "replace", "file": file_name, "label": test["label"],
+                                     "id": server_test["id"], "payload": new_test})
+                continue
+            merged_test = dict(server_test, **new_test)
+            merged_test["configuration"] = dict(server_config, **new_test["configuration"])
+            delta = payload_delta(server_test, merged_test, ignored=TEST_READ_ONLY_FIELDS)
+            if "configuration" in delta:
+                delta["configuration"]["syntheticType"] = server_config["syntheticType"]
+            self.actions.append({"action": "update", "file": file_name, "label": test["label"],
+                                 "id": server_test["id"], "payload": delta})
+
+        if prune:
+            for x in server_tests:
+                if x["id"] not in matched_ids:
+                    self.actions.append({"action": "delete", "file": "", "label": x["label"],
+                                         "id": x["id"], "payload": None})
+        return self.actions
+
+    def print_plan(self):
+        if len(self.actions) == 0:
+            print(f"no changes, {self.unchanged} unchanged")
+            return
+        action_length = 10
+        label_length = max([len(x["label"]) for x in self.actions] + [20]) + 2
+        id_length = 24
+        print(self.fill_space("ACTION", action_length),
+              self.fill_space("LABEL", label_length),
+              self.fill_space("ID", id_length),
+              "FILE")
+        for x in self.actions:
+            fields = ""
+            if x["action"] == "update":
+                changed = [k for k in x["payload"] if k != "configuration"]
+                changed += [f"configuration.{k}" for k in x["payload"].get("configuration", {})
+                            if k != "syntheticType"]
+                fields = f' ({", ".join(changed)})'
+            print(self.fill_space(x["action"], action_length),
+                  self.fill_space(x["label"], label_length),
+                  self.fill_space(x["id"] if x["id"] else "-", id_length),
+                  x["file"] + fields)
+        count = {action: len([x for x in self.actions if x["action"] == action])
+                 for action in ("create", "update", "replace", "delete")}
+        print(f'plan: {count["create"]} to create, {count["update"]} to update, {count["replace"]} to replace, '
+              f'{count["delete"]} to delete, {self.unchanged} unchanged')
+
+    def __apply_action(self, action):
+        """run one action of the plan, return the status code"""
+        host = self.auth["host"]
+        if action["action"] == "delete":
+            return self.delete_a_synthetic_test(action["id"])
+        if action["action"] == "create":
+            result = self.request("POST", f"{host}/api/synthetics/settings/tests/",
+                                  data=json.dumps(action["payload"]))
+            if _status_is_201(result.status_code):
+                self.print_line(f'test "{action["label"]}" created, id is "{result.json()["id"]}"')
+            else:
+                self.print_line(f'create test "{action["label"]}" failed, status code: {result.status_code}', result.text)
+            return result.status_code
+
+        test_url = f'{host}/api/synthetics/settings/tests/{action["id"]}'
+        if action["action"] == "replace":
+            result = self.request("PUT", test_url, data=json.dumps(dict(action["payload"], id=action["id"])))
+        else:
+            result = self.request("PATCH", test_url, data=json.dumps(action["payload"]))
+        if _status_is_200(result.status_code):
+            self.print_line(f'test "{action["id"]}" updated')
+        else:
+            self.print_line(f'update test "{action["id"]}" failed, status code: {result.status_code}', result.text)
+        return result.status_code
+
+    def apply_plan(self, assume_yes=False):
+        """run the actions of the plan with --concurrency workers, deletes are confirmed first"""
+        if len(self.actions) == 0:
+            print(f"nothing to apply, {self.unchanged} unchanged")
+            return
+        delete_actions = [x for x in self.actions if x["action"] == "delete"]
+        if len(delete_actions) > 0 and not assume_yes:
+            for x in delete_actions:
+                print(f'test "{x["label"]}" ({x["id"]}) will be deleted')
+            print('total delete:', len(delete_actions))
+            if not self.ask_answer("are you sure to delete these tests?"):
+                print("nothing is applied")
+                return
+        report = self.run_bulk(self.__apply_action, self.actions)
+        report.print_report("applied")
+
+
+class TenantBackup(Base):
+    """export tests, smart alerts, alert channels, credentials and locations of a tenant to files,
+    and import such an export to another tenant"""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def __client(self, client_class):
+        client = client_class()
+        client.set_auth(self.auth)
+        client.set_insecure(self.insecure)
+        return client
+
+    def __file_name(self, resource_id) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", str(resource_id))
+
+    def __json_bytes(self, data) -> bytes:
+        return (json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def collect_tenant(self):
+        """retrieve all resources at the same time, script tests missing their script are retrieved one by one"""
+        syn_instance = self.__client(SyntheticTest)
+        alert_instance = self.__client(SmartAlert)
+        cred_instance = self.__client(SyntheticCredential)
+        pop_instance = self.__client(SyntheticLocation)
+        app_instance = self.__client(Application)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            tests = executor.submit(syn_instance.retrieve_all_synthetic_tests, full=True)
+            alerts = executor.submit(alert_instance.retrieve_all_smart_alerts)
+            alert_channels = executor.submit(alert_instance.retrieve_all_alerting_channel)
+            credentials = executor.submit(cred_instance.retrieve_credentials, show_details=True)
+            locations = executor.submit(pop_instance.retrieve_synthetic_locations)
+            applications = executor.submit(app_instance.retrieve_all_applications)
+            tenant = {"tests": tests.result(), "alerts": alerts.result(), "alert-channels": alert_channels.result(),
+                      "credentials": credentials.result(), "locations": locations.result(),
+                      "applications": applications.result()}
+
+        script_types = (HTTPScript_TYPE, BrowserScript_TYPE, WebpageScript_TYPE)
+        missing_script = [i for i, test in enumerate(tenant["tests"])
+                          if test["configuration"]["syntheticType"] in script_types
+                          and "script" not in test["configuration"] and "scripts" not in test["configuration"]]
+        if len(missing_script) > 0:
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                full_tests = executor.map(lambda i: syn_instance.retrieve_a_synthetic_test(tenant["tests"][i]["id"])[0],
+                                          missing_script)
+                for i, full_test in zip(missing_script, full_tests):
+                    tenant["tests"][i] = full_test
+        return tenant
+
+    def export_files(self, tenant) -> dict:
+        """return {relative path: content} of the export, scripts and bundles are saved next to the test json"""
+        files = {}
+        for test in tenant["tests"]:
+            test = copy.deepcopy(test)
+            name = self.__file_name(test["id"])
+            configuration = test["configuration"]
+            if configuration.get("script") is not None:
+                extension = ".side" if configuration["syntheticType"] == WebpageScript_TYPE else ".js"
+                files[f"tests/{name}{extension}"] = configuration.pop("script").encode("utf-8")
+            if isinstance(configuration.get("scripts"), dict) and configuration["scripts"].get("bundle"):
+                files[f"tests/{name}.zip"] = b64decode(configuration["scripts"].pop("bundle"))
+            files[f"tests/{name}.json"] = self.__json_bytes(test)
+        for alert in tenant["alerts"]:
+            files[f"alerts/{self.__file_name(alert['id'])}.json"] = self.__json_bytes(alert)
+        for alert_channel in tenant["alert-channels"]:
+            files[f"alert-channels/{self.__file_name(alert_channel['id'])}.json"] = self.__json_bytes(alert_channel)
+        for location in tenant["locations"]:
+            # status and lastSeen change all the time, they are not part of the configuration
+            location = {k: v for k, v in location.items() if k not in ("status", "lastSeen")}
+            files[f"locations/{self.__file_name(location['id'])}.json"] = self.__json_bytes(location)
+        credentials = sorted(tenant["credentials"] or [], key=lambda x: x.get("credentialName", "") if isinstance(x, dict) else x)
+        files["credentials.json"] = self.__json_bytes(credentials)
+        # only id and label, an import maps application ids of tests by label
+        applications = sorted(({"id": app["id"], "label": app.get("label", "")} for app in tenant["applications"]),
+                              key=lambda x: x["id"])
+        files["applications.json"] = self.__json_bytes(applications)
+        return files
+
+    def __manifest(self, files) -> dict:
+        return {
+            "host": self.auth["host"],
+            "files": {path: hashlib.sha256(content).hexdigest() for path, content in sorted(files.items())},
+        }
+
+    def write_export(self, files, output):
+        """write files and manifest.json to a directory, only files whose hash changed are written,
+        files of the last export which are gone are removed. .tar.gz/.tgz/.tar writes an archive"""
+        manifest = self.__manifest(files)
+        if output.endswith((".tar.gz", ".tgz", ".tar")):
+            self.__write_archive(files, manifest, output)
+            return
+
+        manifest_file = os.path.join(output, "manifest.json")
+        old_hashes = {}
+        if os.path.isfile(manifest_file):
+            try:
+                with open(manifest_file, "r", encoding="utf-8") as f:
+                    old_hashes = json.load(f).get("files", {})
+            except ValueError:
+                old_hashes = {}
+
+        written = 0
+        for path, content in sorted(files.items()):
+            file_path = os.path.join(output, path)
+            if old_hashes.get(path) == manifest["files"][path] and os.path.isfile(file_path):
+                continue
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(content)
+            written += 1
+        # the old manifest is not trusted, only files inside output which this export does not write are removed
+        export_dir = os.path.realpath(output)
+        kept = {os.path.realpath(os.path.join(output, path)) for path in files}
+        kept.add(os.path.realpath(manifest_file))
+        removed = 0
+        for path in old_hashes:
+            old_file = os.path.realpath(os.path.join(output, path))
+            if os.path.commonpath([export_dir, old_file]) != export_dir or old_file in kept:
+                continue
+            if os.path.isfile(old_file):
+                os.remove(old_file)
+                removed += 1
+        os.makedirs(output, exist_ok=True)
+        with open(manifest_file, "wb") as f:
+            f.write(self.__json_bytes(manifest))
+        print(f"exported {len(files)} files to {output}, written: {written}, "
+              f"unchanged: {len(files) - written}, removed: {removed}")
+
+    def __write_archive(self, files, manifest, output):
+        """same files in a tar, sorted and without timestamps, so the same tenant gives the same archive"""
+        mode = "w" if output.endswith(".tar") else "w:gz"
+        all_files = dict(files, **{"manifest.json": self.__json_bytes(manifest)})
+        with open(output, "wb") as f:
+            # gzip writes the current time into its header unless mtime is given
+            gzip_file = None if mode == "w" else gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0)
+            with tarfile.open(fileobj=gzip_file or f, mode="w") as tar:
+                for path, content in sorted(all_files.items()):
+                    info = tarfile.TarInfo(path)
+                    info.size = len(content)
+                    info.mode = 0o644
+                    tar.addfile(info, io.BytesIO(content))
+            if gzip_file is not None:
+                gzip_file.close()
+        print(f"exported {len(files)} files to {output}")
+
+    def export_tenant(self, output):
+        if output is None or output == "":
+            self.exit_synctl(ERROR_CODE, "output should not be empty")
+        start_time = time.time()
+        tenant = self.collect_tenant()
+        self.write_export(self.export_files(tenant), output)
+        print(f'tests: {len(tenant["tests"])}, alerts: {len(tenant["alerts"])}, '
+              f'alert channels: {len(tenant["alert-channels"])}, credentials: {len(tenant["credentials"] or [])}, '
+              f'locations: {len(tenant["locations"])}, time used: {round(time.time() - start_time, 3)}s')
+
+    def read_export(self, input_path) -> dict:
+        """return {relative path: content} of an export directory or archive"""
+        files = {}
+        try:
+            if os.path.isdir(input_path):
+                with open(os.path.join(input_path, "manifest.json"), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                for path in manifest.get("files", {}):
+                    with open(os.path.join(input_path, path), "rb") as f:
+                        files[path] = f.read()
+            else:
+                with tarfile.open(input_path, "r:*") as tar:
+                    for member in tar.getmembers():
+                        if member.isfile() and member.name != "manifest.json":
+                            files[member.name] = tar.extractfile(member).read()
+        except (OSError, ValueError, tarfile.TarError) as e:
+            self.exit_synctl(ERROR_CODE, f"{input_path} is not a synctl export, {e}")
+        return files
+
+    def load_tenant(self, files) -> dict:
+        """tests with their script and bundle, alerts, alert channels, locations and applications of an export"""
+        tenant = {"tests": [], "alerts": [], "alert-channels": [], "locations": [], "applications": [], "credentials": []}
+        for path in sorted(files):
+            folder, _, file_name = path.rpartition("/")
+            if not file_name.endswith(".json"):
+                continue
+            data = json.loads(files[path])
+            if folder == "tests":
+                configuration = data["configuration"]
+                base_path = path[:-len(".json")]
+                for extension in (".js", ".side"):
+                    if base_path + extension in files:
+                        configuration["script"] = files[base_path + extension].decode("utf-8")
+                if base_path + ".zip" in files:
+                    configuration.setdefault("scripts", {})["bundle"] = b64encode(files[base_path + ".zip"]).decode()
+                tenant["tests"].append(data)
+            elif folder in ("alerts", "alert-channels", "locations"):
+                tenant[folder].append(data)
+            elif path in ("applications.json", "credentials.json"):
+                tenant[file_name[:-len(".json")]] = data
+        return tenant
+
+    def get_lookup_tables(self, tenant) -> dict:
+        """source id => target id of locations and applications by label, alert channels by name,
+        the target tenant is listed once, all listings at the same time"""
+        pop_instance = self.__client(SyntheticLocation)
+        app_instance = self.__client(Application)
+        alert_instance = self.__client(SmartAlert)
+        cred_instance = self.__client(SyntheticCredential)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            locations = executor.submit(pop_instance.retrieve_synthetic_locations)
+            applications = executor.submit(app_instance.retrieve_all_applications)
+            alert_channels = executor.submit(alert_instance.retrieve_all_alerting_channel)
+            credentials = executor.submit(cred_instance.retrieve_credentials)
+            target = {"locations": locations.result(), "applications": applications.result(),
+                      "alert-channels": alert_channels.result(), "credentials": credentials.result() or []}
+
+        def id_map(resource, key):
+            target_ids = {}
+            for item in target[resource]:
+                target_ids.setdefault(item.get(key), item["id"])
+            return {item["id"]: target_ids[item.get(key)] for item in tenant[resource] if item.get(key) in target_ids}
+
+        return {
+            "locations": id_map("locations", "label"),
+            "applications": id_map("applications", "label"),
+            "alert-channels": id_map("alert-channels", "name"),
+            "credentials": set(target["credentials"]),
+        }
+
+    def remap_test(self, test, lookup):
+        """payload of a test for the target tenant, return (payload, source ids which have no target)"""
+        payload = {k: v for k, v in test.items() if k not in TEST_READ_ONLY_FIELDS}
+        unmapped = [x for x in test.get("locations", []) if x not in lookup["locations"]]
+        payload["locations"] = [lookup["locations"][x] for x in test.get("locations", []) if x in lookup["locations"]]
+        if payload.get("applicationId"):
+            unmapped += [payload["applicationId"]] if payload["applicationId"] not in lookup["applications"] else []
+            payload["applicationId"] = lookup["applications"].get(payload["applicationId"])
+        if payload.get("applications"):
+            unmapped += [x for x in payload["applications"] if x not in lookup["applications"]]
+            payload["applications"] = [lookup["applications"][x] for x in payload["applications"] if x in lookup["applications"]]
+        return payload, unmapped
+
+    def remap_alert(self, alert, lookup, test_ids):
+        """payload of a smart alert with the new test ids, None when one of its tests is not created yet"""
+        if any(x not in test_ids for x in alert.get("syntheticTestIds", [])):
+            return None
+        payload = {k: v for k, v in alert.items() if k not in ("id", "created", "lastUpdated", "readOnly")}
+        payload["syntheticTestIds"] = [test_ids[x] for x in alert.get("syntheticTestIds", [])]
+        payload["alertChannelIds"] = [lookup["alert-channels"][x] for x in alert.get("alertChannelIds", [])
+                                      if x in lookup["alert-channels"]]
+
+        def remap_elements(expression):
+            # tag filters may also select tests by id
+            if isinstance(expression, dict):
+                if isinstance(expression.get("value"), str) and expression["value"] in test_ids:
+                    expression["value"] = test_ids[expression["value"]]
+                for element in expression.get("elements", []):
+                    remap_elements(element)
+
+        if "tagFilterExpression" in payload:
+            payload["tagFilterExpression"] = copy.deepcopy(payload["tagFilterExpression"])
+            remap_elements(payload["tagFilterExpression"])
+        return payload
+
+    def read_journal(self, journal_file) -> dict:
+        """source id => created id of tests and alerts done by an earlier import to the same host"""
+        journal = {"test": {}, "alert": {}}
+        if not os.path.isfile(journal_file):
+            return journal
+        with open(journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line of an interrupted import may be cut
+                    continue
+                if "host" in entry and entry["host"] != self.auth["host"]:
+                    self.exit_synctl(ERROR_CODE, f"{journal_file} is the journal of an import to {entry['host']}, "
+                                                 f"use another --journal")
+                if entry.get("type") in journal:
+                    journal[entry["type"]][entry["source"]] = entry["id"]
+        return journal
+
+    def __write_journal(self, entry):
+        with self.journal_lock:
+            self.journal_writer.write(json.dumps(entry) + "\n")
+            self.journal_writer.flush()
+
+    def __import_one(self, item):
+        """create a test or an alert of import_tenant, the new id is written to the journal, return the status code"""
+        resource, source_id, payload = item
+        host = self.auth["host"]
+        if resource == "test":
+            create_res = self.request("POST", f"{host}/api/synthetics/settings/tests/", data=json.dumps(payload))
+            created = _status_is_201(create_res.status_code)
+        else:
+            create_res = self.request("POST", f"{host}/api/events/settings/global-alert-configs/synthetics",
+                                      data=json.dumps(payload))
+            created = _status_is_200(create_res.status_code)
+        if created:
+            new_id = create_res.json()["id"]
+            self.journal[resource][source_id] = new_id
+            self.__write_journal({"type": resource, "source": source_id, "id": new_id})
+        else:
+            name = payload.get("label", payload.get("name", ""))
+            self.print_line(f'create {resource} "{name}" failed, status code: {create_res.status_code}', create_res.text)
+        return create_res.status_code
+
+    def import_tenant(self, input_path, journal_file):
+        """create the tests of an export on this tenant, then the smart alerts of those tests,
+        ids of locations, applications and alert channels are mapped by label, tests and alerts
+        in the journal are already imported and skipped"""
+        self.check_host_and_token(self.auth["host"], self.auth["token"])
+        start_time = time.time()
+        tenant = self.load_tenant(self.read_export(input_path))
+        lookup = self.get_lookup_tables(tenant)
+        self.journal = self.read_journal(journal_file)
+        self.journal_lock = threading.Lock()
+
+        new_tests = []
+        unmapped = set()
+        for test in tenant["tests"]:
+            if test["id"] not in self.journal["test"]:
+                payload, test_unmapped = self.remap_test(test, lookup)
+                unmapped.update(test_unmapped)
+                new_tests.append(("test", test["id"], payload))
+        if unmapped:
+            print("Warning: not found in this tenant, removed from tests:", ", ".join(sorted(unmapped)))
+        missing_cred = sorted(set(x["credentialName"] for x in tenant["credentials"] if isinstance(x, dict))
+                              - lookup["credentials"])
+        if missing_cred:
+            print("Warning: credentials are not exported, create them before the tests run:", ", ".join(missing_cred))
+
+        try:
+            with open(journal_file, "a", encoding="utf-8") as self.journal_writer:
+                if os.path.getsize(journal_file) == 0:
+                    self.__write_journal({"host": self.auth["host"]})
+                print(f"tests to import: {len(new_tests)}, already imported: {len(tenant['tests']) - len(new_tests)}")
+                test_report = self.run_bulk(self.__import_one, new_tests, progress="created")
+                test_report.print_report("created")
+
+                # alerts after tests, they refer to the new test ids
+                new_alerts = []
+                waiting = 0
+                for alert in tenant["alerts"]:
+                    if alert["id"] in self.journal["alert"]:
+                        continue
+                    payload = self.remap_alert(alert, lookup, self.journal["test"])
+                    if payload is None:
+                        waiting += 1
+                    else:
+                        new_alerts.append(("alert", alert["id"], payload))
+                print(f"alerts to import: {len(new_alerts)}, "
+                      f"already imported: {len(tenant['alerts']) - len(new_alerts) - waiting}, "
+                      f"waiting for tests: {waiting}")
+                alert_report = self.run_bulk(self.__import_one, new_alerts, progress="created")
+                alert_report.print_report("created")
+        except OSError as e:
+            self.exit_synctl(ERROR_CODE, e)
+
+        print(f"time used: {round(time.time() - start_time, 3)}s")
+        failed = test_report.total() - test_report.succeeded() + alert_report.total() - alert_report.succeeded()
+        if failed > 0 or waiting > 0:
+            self.exit_synctl(ERROR_CODE, f"import is not complete, run the same command again to continue from {journal_file}")
+
+
+class SyntheticResult(Base):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.default_page_size = 200
+
+    def __parse_window_size_num(self, num: str):
+        match1 = re.match(r"(^[1-9]+[0-9]*)", num)
+        if match1 is not None:
+            return int(match1.group())
         else:
             self.exit_synctl(ERROR_CODE, f"{num} is not correct, use <num>m, <num>h")
 
@@ -5266,7 +6814,6 @@ class SyntheticResult(Base):
         #     The granularity values are the same for all metrics
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         summary_config = {
             "syntheticMetrics": ["synthetic.metricsStatus", "synthetic.metricsResponseTime"],
@@ -5298,38 +6845,25 @@ class SyntheticResult(Base):
 
         test_summary_list_url = f"{host}/api/synthetics/results/testsummarylist"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
-        try:
-            summary_res = requests.post(test_summary_list_url,
-                                        headers=headers,
-                                        data=json.dumps(summary_config),
-                                        timeout=60,
-                                        verify=self.insecure)
-
-            if _status_is_200(summary_res.status_code):
-                # extracting data in json format
-                data = summary_res.json()
-                return data
-            elif _status_is_400(summary_res.status_code):
-                print(f'Bad Request: status code: {summary_res.status_code}')
-                if summary_res.text:
-                    print("Error Message:", summary_res.text)
-                self.exit_synctl(error_code=ERROR_CODE)
-            elif _status_is_429(summary_res.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print('retrieve test summary list failed, status code:',
-                      summary_res.status_code)
-                if summary_res.text:
-                    print("Error Message:", summary_res.text)
-                self.exit_synctl(ERROR_CODE)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        summary_res = self.request("POST", test_summary_list_url, data=json.dumps(summary_config))
+
+        if _status_is_200(summary_res.status_code):
+            # extracting data in json format
+            data = summary_res.json()
+            return data
+        elif _status_is_400(summary_res.status_code):
+            print(f'Bad Request: status code: {summary_res.status_code}')
+            if summary_res.text:
+                print("Error Message:", summary_res.text)
+            self.exit_synctl(error_code=ERROR_CODE)
+        elif _status_is_429(summary_res.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print('retrieve test summary list failed, status code:',
+                  summary_res.status_code)
+            if summary_res.text:
+                print("Error Message:", summary_res.text)
+            self.exit_synctl(ERROR_CODE)
 
     def convert_summary_list_dict(self, summary_result, metrics_summary):
         if summary_result is None or not isinstance(summary_result, dict):
@@ -5359,30 +6893,16 @@ class SyntheticResult(Base):
         """convert summary list to a dict"""
         metrics_summary = {}
         window_size_ms = self.get_window_size(window_size)
-        summary_result = self.__get_test_summary_list(page=1,
-                                                      page_size=self.default_page_size,
-                                                      window_size=window_size_ms,
-                                                      test_id=test_id)
-        self.convert_summary_list_dict(summary_result, metrics_summary)
-
-        page = summary_result["page"] if "page" in summary_result else 1
-        page_size = summary_result["pageSize"] if "pageSize" in summary_result else 200
-        if "totalHits" in summary_result:
-            total_hits = summary_result["totalHits"]
-
-        if page_size >= total_hits:
-            return metrics_summary
-        else:
-            total_pages = total_hits/page_size
-            if (total_pages - round(total_pages)) > 0:
-                total_pages += 1
-            for x in range(1, round(total_pages)):
-                summary_result = self.__get_test_summary_list(page=x+1,
-                                                              page_size=self.default_page_size,
-                                                              window_size=window_size_ms,
-                                                              test_id=test_id)
-                self.convert_summary_list_dict(summary_result, metrics_summary)
-            return metrics_summary
+
+        def fetch_page(page):
+            return self.__get_test_summary_list(page=page,
+                                                page_size=self.default_page_size,
+                                                window_size=window_size_ms,
+                                                test_id=test_id)
+
+        for summary_result in self.get_all_pages(fetch_page, page_size=self.default_page_size):
+            self.convert_summary_list_dict(summary_result, metrics_summary)
+        return metrics_summary
 
 
 class Application(Base):
@@ -5419,14 +6939,9 @@ class Application(Base):
         # --header "Content-Type: application/json"
         self.check_host_and_token(self.auth["host"], self.auth["token"])
         host = self.auth["host"]
-        token = self.auth["token"]
 
         application_list_url = f"{host}/api/application-monitoring/applications"
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apiToken {token}"
-        }
 
         params_list = {
             # "nameFilter": "",  # Name of application
@@ -5440,29 +6955,20 @@ class Application(Base):
             params_list["nameFilter"] = self.name_filter
         if application_boundary_scope is not None:
                 params_list["applicationBoundaryScope"] = application_boundary_scope
-        try:
-            app_res = requests.get(application_list_url,
-                                   headers=headers,
-                                   params=params_list,
-                                   timeout=60,
-                                   verify=False)
-
-            if _status_is_200(app_res.status_code):
-                # extracting data in json format
-                data = app_res.json()
-                return data
-            elif _status_is_429(app_res.status_code):
-                self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
-            else:
-                print('retrieve test summary list failed, status code:',
-                      app_res.status_code)
-                if app_res.text:
-                    print(app_res.text)
-                self.exit_synctl(ERROR_CODE)
-        except requests.ConnectTimeout as timeout_error:
-            self.exit_synctl(f"Connection to {host} timed out, error is {timeout_error}")
-        except requests.ConnectionError as connect_error:
-            self.exit_synctl(f"Connection to {host} failed, error is {connect_error}")
+        app_res = self.request("GET", application_list_url, params=params_list)
+
+        if _status_is_200(app_res.status_code):
+            # extracting data in json format
+            data = app_res.json()
+            return data
+        elif _status_is_429(app_res.status_code):
+            self.exit_synctl(ERROR_CODE, TOO_MANY_REQUEST_ERROR)
+        else:
+            print('retrieve test summary list failed, status code:',
+                  app_res.status_code)
+            if app_res.text:
+                print(app_res.text)
+            self.exit_synctl(ERROR_CODE)
 
     def __get_all_application(self,
                               name_filter=None,
@@ -5471,46 +6977,38 @@ class Application(Base):
                               window_size=60*60*1000,
                               application_boundary_scope=None):
         """get all application list more than one pages"""
-        total_hits = 0
-        app_result = self.__get_application_list(to=to,
-                                                 page=page,
-                                                 window_size=window_size,
-                                                 application_boundary_scope=application_boundary_scope)
-
-        page = app_result["page"] if "page" in app_result else 1
-        page_size = app_result["pageSize"] if "pageSize" in app_result else 200
-        if "totalHits" in app_result:
-            total_hits = app_result["totalHits"]
-
-        if page_size >= total_hits:
-            yield app_result
-        else:
-            total_pages = total_hits/page_size
-            if (total_pages - round(total_pages)) > 0:
-                total_pages += 1
-            for page_x in range(0, round(total_pages)):
-                if page_x == 0:  # first page
-                    yield app_result
-                else:
-                    app_result = self.__get_application_list(page=page_x+1,
-                                                             window_size=60*60*1000)
-                    yield app_result
+        def fetch_page(page_x):
+            return self.__get_application_list(to=to,
+                                               page=page_x,
+                                               window_size=window_size,
+                                               application_boundary_scope=application_boundary_scope)
+
+        yield from self.get_all_pages(fetch_page, page_size=self.default_page_size)
+
+    def iter_application_pages(self):
+        """yield the application perspectives page by page"""
+        for app_res_gen in self.__get_all_application():
+            yield app_res_gen.get("items", [])
+
+    def retrieve_all_applications(self):
+        """all application perspectives of all pages"""
+        applications = []
+        for app_res_gen in self.__get_all_application():
+            applications.extend(app_res_gen.get("items", []))
+        return applications
 
     def print_app_list(self, name_filter=None, to=0, window_size=60*60*1000):
-        """show all applications, synctl get app"""
+        """show all applications, synctl get app
+
+        rows are written page by page, the label width is taken from the first
+        rows and longer labels are cut
+        """
         id_length = 24
-        label_length = 60
-        app_count = 0  # count total application number
-        print("id".upper().ljust(id_length),
-              "label".upper().ljust(label_length),
-              'Type'.upper())
-        for app_res_gen in self.__get_all_application():
-            if "items" in app_res_gen and len(app_res_gen["items"]) > 0:
-                for i in app_res_gen["items"]:
-                    print(i["id"].ljust(id_length),
-                          i["label"].ljust(label_length),
-                          i["entityType"], flush=True)
-                    app_count += 1
+        label_length = None  # sampled, at most 60
+        table = TableWriter([("ID", id_length), ("LABEL", label_length), ("TYPE", 0)], sample_size=200)
+        for items in self.iter_application_pages():
+            table.write_page((i["id"], i["label"], i["entityType"]) for i in items)
+        app_count = table.close()
         print(f"total app: {app_count}")
 
 
@@ -5607,6 +7105,26 @@ class ParseParameter:
         self.parser_delete._positionals.title = POSITION_PARAMS
         self.parser_delete._optionals.title = OPTIONS_PARAMS
 
+        self.parser_plan = sub_parsers.add_parser(
+            'plan', help='show changes between test files and the server', usage=PLAN_USAGE, formatter_class=CustomHelpFormatter)
+        self.parser_plan._positionals.title = POSITION_PARAMS
+        self.parser_plan._optionals.title = OPTIONS_PARAMS
+
+        self.parser_apply = sub_parsers.add_parser(
+            'apply', help='apply test files to the server', usage=APPLY_USAGE, formatter_class=CustomHelpFormatter)
+        self.parser_apply._positionals.title = POSITION_PARAMS
+        self.parser_apply._optionals.title = OPTIONS_PARAMS
+
+        self.parser_export = sub_parsers.add_parser(
+            'export', help='export a tenant to files', usage=EXPORT_USAGE, formatter_class=CustomHelpFormatter)
+        self.parser_export._positionals.title = POSITION_PARAMS
+        self.parser_export._optionals.title = OPTIONS_PARAMS
+
+        self.parser_import = sub_parsers.add_parser(
+            'import', help='import an export to a tenant', usage=IMPORT_USAGE, formatter_class=CustomHelpFormatter)
+        self.parser_import._positionals.title = POSITION_PARAMS
+        self.parser_import._optionals.title = OPTIONS_PARAMS
+
     def global_options(self):
         self.parser.add_argument(
             '--version', '-v', action="store_true", default=True, help="show version")
@@ -5628,10 +7146,18 @@ class ParseParameter:
     def runNow_command_options(self):
         self.parser_runNow.add_argument(
             '--verify-tls', action="store_true", default=False, help="verify tls certificate")
+        self.parser_runNow.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_runNow.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_runNow.add_argument(
             'run_type', type=str, choices=["test"], metavar="<id>", help="test")
         self.parser_runNow.add_argument(
-            'id', metavar='<id>', help='test id')
+            'id', metavar='<id>', nargs='+', help='test id, support multiple tests')
+        self.parser_runNow.add_argument(
+            '--wait', action="store_true", default=False, help="wait until all runs are completed, exit with error if any run fails")
+        self.parser_runNow.add_argument(
+            '--wait-timeout', type=str, default="10m", metavar="<num>s|m|h", help="max time to wait, default is 10m")
         self.parser_runNow.add_argument(
             '--location', '--lo', type=str, nargs='+', metavar="<id>", help="location id")
         self.parser_runNow.add_argument(
@@ -5655,6 +7181,10 @@ class ParseParameter:
     def create_command_options(self):
         self.parser_create.add_argument(
             "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_create.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_create.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_create.add_argument(
             'syn_type', type=str, choices=["test", "cred", "alert"], metavar="test/cred/alert", help="specify test/cred/alert")
 
@@ -5670,6 +7200,10 @@ class ParseParameter:
         self.parser_create.add_argument('--description', '-d', type=str, metavar="<string>", help="the description of Synthetic test")
         self.parser_create.add_argument('--frequency', type=int, metavar="<int>", help="the range is from 1 to 120 minute, default is 15. For SSLCertificate test, the default is 1440")
         self.parser_create.add_argument('-f', '--from-file', type=str, metavar="<file>", help='Synthetic payload from (.json) file')
+        self.parser_create.add_argument('--from-dir', type=str, metavar="<dir>", help='create a test for every .json file in a directory')
+        self.parser_create.add_argument('--from-ndjson', type=str, metavar="<file>", help='create a test for every line of a ndjson file, - reads stdin')
+        self.parser_create.add_argument('--id-map', type=str, default="id-map.json", metavar="<file>", help='file to save label and id of tests created from --from-dir/--from-ndjson')
+        self.parser_create.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar="<num>", help="number of tests created at the same time")
     # [0, 2]
         self.parser_create.add_argument('--retries', type=int, choices=range(0, 3), metavar="<int>", help='retry times, value is [0, 2]')
         self.parser_create.add_argument('--retry-interval', type=int, default=1, choices=range(1, 11), metavar="<int>", help="retry interval, range is [1, 10]")
@@ -5763,6 +7297,10 @@ class ParseParameter:
     def get_command_options(self):
         self.parser_get.add_argument(
             "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_get.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_get.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_get.add_argument(
             'op_type', choices=['location', 'lo', 'datacenter', 'test', 'application', 'app', 'cred', 'alert', 'alert-channel', 'result', 'metric', 'pop-size', 'size', 'pop-cost', 'cost'],
             help="command list")
@@ -5824,6 +7362,13 @@ class ParseParameter:
         self.parser_get.add_argument(
             '--analytics', type=str,  metavar="<string>", help="get test by analytics")
 
+        # structured output, written record by record
+        output_group = self.parser_get.add_argument_group("structured output")
+        output_group.add_argument(
+            '--output', '-o', type=str, choices=OUTPUT_FORMATS, default=None, help="output records as json, ndjson or csv instead of a table")
+        output_group.add_argument(
+            '--fields', type=str, default=None, metavar="<fields>", help='fields of each record, e.g. "id,label,configuration.url"')
+
 
 
         host_token_group = self.parser_get.add_argument_group()
@@ -5837,128 +7382,149 @@ class ParseParameter:
     def patch_command_options(self):
         self.parser_patch.add_argument(
             "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_patch.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_patch.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_patch.add_argument(
             'syn_type', type=str, choices=["test", "cred"], help="specify test/cred/")
 
         self.parser_patch.add_argument(
-            'id', type=str, help="Synthetic test id")
-
-        patch_exclusive_group = self.parser_patch.add_mutually_exclusive_group()
+            'id', type=str, nargs='?', help="Synthetic test id")
+
+        # patch tests in batch, select tests instead of giving an id
+        select_group = self.parser_patch.add_argument_group("select tests")
+        select_group.add_argument(
+            '--match-regex', type=str, default=None, metavar="<regex>", help='patch tests which label match regex')
+        select_group.add_argument(
+            '--type', '-t', type=int, choices=[0, 1, 2, 3, 4, 5, 6, 7], metavar='<int>', help='patch tests of a Synthetic type, 0 HTTPAction, 1 HTTPScript, 2 BrowserScript, 3 WebpageScript, 4 WebpageAction, 5 SSLCertificate, 6 DNS, 7 ICMP')
+        select_group.add_argument(
+            '--match-location', type=str, default=None, metavar="<id>", help='patch tests running on this location')
+        select_group.add_argument(
+            '--dry-run', action="store_true", default=False, help='only show the selected tests and the patch')
+        select_group.add_argument(
+            '--yes', '-y', action="store_true", default=False, help="patch the selected tests without asking")
+        select_group.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar="<num>", help="number of tests or credentials patched at the same time")
+
+        patch_group = self.parser_patch.add_argument_group("patch options")
         # common options
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--active', type=str, choices=["false", "true"], metavar="<boolean>", help='set active')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--frequency', type=int, metavar="<int>", help='set frequency')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--location', nargs="+", metavar="<id>", help="set location")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--description', type=str, metavar="<string>", help="set description")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--label', type=str, metavar="<string>", help='set label')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--retries', type=int, metavar="<int>", help="set retries, min is 0 and max is 2")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--retry-interval', type=int, metavar="<int>", help="set retry-interval, min is 1, max is 10")
         # timeout Expected <number>(ms|s|m)
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--timeout', type=str, metavar="<num>ms|s|m", help='set timeout, accept <number>(ms|s|m)')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--custom-properties', type=str, metavar="<string>", help="set custom property of a test")
 
         # API Simple
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--operation', type=str, metavar="<method>", help="HTTP request methods, GET, POST, HEAD, PUT, etc.")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--mark-synthetic-call', type=str, metavar="<boolean>", help='set markSyntheticCall')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--url', type=str, metavar="<url>", help="HTTP URL")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--follow-redirect', type=str, metavar="<boolean>", help='set follow-redirect')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--validation-string', type=str, metavar="<string>", help='set validation-string')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--expect-status', type=int, metavar="<int>", help='set expected HTTP status code')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--expect-json', type=str, metavar="<string>", help='An optional object to be used to check against the test response object')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--expect-match', type=str, metavar="<string>", help='An optional regular expression string to be used to check the test response')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--expect-exists', type=str, metavar="<string>", help='An optional list of property labels used to check if they are present in the test response object')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--expect-not-empty', type=str, metavar="<string>", help='An optional list of property labels used to check if they are present in the test response object with a non-empty value')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--allow-insecure', type=str, choices=['false', 'true'], metavar="<boolean>", help='if set to true then allow insecure certificates')
 
         # API Script / Browser test
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--record-video', type=str, choices=['true', 'false'], metavar="<boolean>", help='set true to record video')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--browser', type=str, choices=["chrome", "firefox"], metavar="<string>", help="browser type, support chrome and firefox")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--script', type=str, metavar="<filename>", help="specify a script file to update APIScript (.js), BrowserScript (.js) or WebpageScript (.side)")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--bundle', type=str, metavar="<bundle>", help='set bundle')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--bundle-entry-file', type=str, metavar="<string>", help="entry file of a bundle test")
 
         # SSL Certificate
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--hostname', type=str, metavar="<url>", help='set host name')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--port', type=int, help='set port')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--remaining-days-check', type=int, metavar="<int>", help='check remaining days for expiration of SSL certificate')
 
         # DNS
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--cname', type=str, choices=['true', 'false', 'True', 'False'], metavar="<boolean>", help='enable the canonical name in the DNS response, false by default')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--lookup', type=str, help='set the name or IP address of the host')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--lookup-server-name', type=str, choices=['true', 'false', 'True', 'False'], metavar="<boolean>", help='set recursive DNS lookups, false by default')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--query-time', type=str, help='an object with name/value pairs used to validate the test response time')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--query-type', type=str, help='set DNS query type')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--recursive-lookups', type=str, choices=['true', 'false', 'True', 'False'], metavar="<boolean>", help='enables recursive DNS lookups, false by default')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--server', type=str, help='set IP address of the DNS server')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--server-retries', type=int, help='set number of times to try a timed-out DNS lookup before returning failure, default is 1')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--target-values', type=str, help='set list of filters to be used to validate the test response')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--transport', type=str, help='set protocol used to do DNS check. Only UDP is supported.')
         # ICMP
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--target-host', type=str, help='set the target host for ICMP ping test')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--packet-count', type=int, help='set number of packets to send')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--packet-size', type=int, help='set packet size in bytes')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--packet-timeout', type=str, help='set per-packet timeout (e.g., "3s")')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--use-ipv6', type=str, choices=['true', 'false', 'True', 'False'], metavar="<boolean>", help='use IPv6 instead of IPv4')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--use-dns', type=str, choices=['true', 'false', 'True', 'False'], metavar="<boolean>", help='enable DNS resolution')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--validation-rules', type=str, help='set list of validation rules for ICMP test response')
 
 
         # Patch cred
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--value', type=str, metavar="<string>", help='set credential value')
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--apps','--applications', type=str, dest='apps', nargs=argparse.REMAINDER, metavar="<id>", help="set applications")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--websites', nargs="+", metavar="<id>", help="set websites")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--mobile-apps', '--mobile-applications', nargs="+", metavar="<id>", help="set mobile applications")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
+            '--from-file', '-f', type=str, metavar="<file>", help="set values of many credentials from a json file of name and value")
+        patch_group.add_argument(
             '--grace-period', type=str, metavar="<json>", help="The duration for which an alert remains open after conditions are no longer violated, with the alert auto-closing once the grace period expires.")
-        patch_exclusive_group.add_argument(
+        patch_group.add_argument(
             '--custom-payloads', type=str, metavar="<json>", help="Custom payload fields to send additional information in the alert notifications. Can be left empty.")
 
 
@@ -5973,10 +7539,14 @@ class ParseParameter:
     def update_command_options(self):
         self.parser_update.add_argument(
             "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_update.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_update.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_update.add_argument(
             'syn_type', type=str, choices=["test", "alert", "cred"], help="Synthetic type/ smart alert/ credential")
         self.parser_update.add_argument(
-            'id', type=str, help="Synthetic test id")
+            'id', type=str, nargs='?', help="Synthetic test id")
 
         update_exclusive_group = self.parser_update.add_mutually_exclusive_group()
         update_group = self.parser_update.add_argument_group()
@@ -6077,6 +7647,21 @@ class ParseParameter:
             '--enable', action='store_true', help='enable smart alert')
         update_exclusive_group.add_argument(
             '--disable', action='store_true', help='disable smart alert')
+        update_exclusive_group.add_argument(
+            '--restore', type=str, metavar="<journal>", help='set alerts of a journal back to their state before --enable/--disable')
+
+        # enable/disable smart alerts without id
+        select_group = self.parser_update.add_argument_group("select alerts, with --enable/--disable and no id")
+        select_group.add_argument(
+            '--match-regex', type=str, default=None, metavar="<regex>", help='alerts whose name match regex')
+        select_group.add_argument(
+            '--journal', type=str, default="alert-journal.ndjson", metavar="<file>", help='file to save the changed alerts for --restore')
+        select_group.add_argument(
+            '--dry-run', action="store_true", default=False, help='only show the alerts to change')
+        select_group.add_argument(
+            '--yes', '-y', action="store_true", default=False, help="change the selected alerts without asking")
+        select_group.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar="<num>", help="number of requests sent at the same time")
         # update cred
         update_group.add_argument(
             '--value', type=str, metavar="<value>", help='set credential value')
@@ -6091,6 +7676,10 @@ class ParseParameter:
     def delete_command_options(self):
         self.parser_delete.add_argument(
             "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_delete.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_delete.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
         self.parser_delete.add_argument(
             'delete_type', choices=['location', 'lo', 'test', 'cred', 'alert'], help='specify Synthetic type: location/test/credential/smart alert')
         self.parser_delete.add_argument(
@@ -6106,6 +7695,8 @@ class ParseParameter:
             '--match-location', type=str, default=None, metavar="<id>", help='delete tests match this location id')
         delete_exclusive_group.add_argument(
             '--no-locations', action="store_true", help="delete tests with no locations")
+        self.parser_delete.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar="<num>", help="number of deletes sent at the same time")
 
         self.parser_delete.add_argument(
             '--use-env', '-e', type=str, default=None, metavar="<name>", help='specify a config name')
@@ -6114,6 +7705,95 @@ class ParseParameter:
         self.parser_delete.add_argument(
             '--token', type=str, metavar="<token>", help='set token')
 
+    def __test_dir_options(self, parser):
+        parser.add_argument(
+            "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        parser.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        parser.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
+        parser.add_argument(
+            '--dir', '-d', type=str, required=True, metavar="<dir>", help="directory of test json files")
+        parser.add_argument(
+            '--prune', action="store_true", default=False, help="delete tests on the server which have no file")
+
+        parser.add_argument(
+            '--use-env', '-e', type=str, default=None, metavar="<name>", help='specify a config name')
+        parser.add_argument(
+            '--host', type=str, metavar="<host>", help='set hostname')
+        parser.add_argument(
+            '--token', type=str, metavar="<token>", help='set token')
+
+    def plan_command_options(self):
+        self.__test_dir_options(self.parser_plan)
+
+    def apply_command_options(self):
+        self.__test_dir_options(self.parser_apply)
+        self.parser_apply.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar="<num>", help="number of requests sent at the same time")
+        self.parser_apply.add_argument(
+            '--yes', '-y', action="store_true", default=False, help="delete tests of --prune without asking")
+
+    def export_command_options(self):
+        self.parser_export.add_argument(
+            "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_export.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_export.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
+        self.parser_export.add_argument(
+            '--output', '-o', type=str, required=True, metavar="<dir>", help="output directory, or a .tar.gz/.tar archive")
+
+        self.parser_export.add_argument(
+            '--use-env', '-e', type=str, default=None, metavar="<name>", help='specify a config name')
+        self.parser_export.add_argument(
+            '--host', type=str, metavar="<host>", help='set hostname')
+        self.parser_export.add_argument(
+            '--token', type=str, metavar="<token>", help='set token')
+
+    def import_command_options(self):
+        self.parser_import.add_argument(
+            "--verify-tls", action="store_true", default=False, help="verify tls certificate")
+        self.parser_import.add_argument(
+            '--rate-limit', type=float, default=None, metavar="<rps>", help="max requests per second sent to the server")
+        self.parser_import.add_argument(
+            '--no-cache', action="store_true", default=False, help="do not use cached listings")
+        self.parser_import.add_argument(
+            '--input', '-i', type=str, required=True, metavar="<dir>", help="export directory, or a .tar.gz/.tar archive")
+        self.parser_import.add_argument(
+            '--journal', type=str, default="import-journal.ndjson", metavar="<file>",
+            help="ids of imported tests and alerts, an interrupted import continues from it")
+        self.parser_import.add_argument(
+            '--concurrency', type=int, default=IMPORT_CONCURRENCY, metavar="<num>", help="number of requests sent at the same time")
+
+        self.parser_import.add_argument(
+            '--use-env', '-e', type=str, default=None, metavar="<name>", help='specify a config name')
+        self.parser_import.add_argument(
+            '--host', type=str, metavar="<host>", help='set hostname')
+        self.parser_import.add_argument(
+            '--token', type=str, metavar="<token>", help='set token')
+
+    def set_command_options(self, command=None):
+        """only add options of the given command, all options if the command is unknown"""
+        command_options = {
+            COMMAND_CONFIG: self.config_command_options,
+            COMMAND_RUN: self.runNow_command_options,
+            COMMAND_CREATE: self.create_command_options,
+            COMMAND_GET: self.get_command_options,
+            COMMAND_PATCH: self.patch_command_options,
+            COMMAND_UPDATE: self.update_command_options,
+            COMMAND_DELETE: self.delete_command_options,
+            COMMAND_PLAN: self.plan_command_options,
+            COMMAND_APPLY: self.apply_command_options,
+            COMMAND_EXPORT: self.export_command_options,
+            COMMAND_IMPORT: self.import_command_options,
+        }
+        if command not in command_options:
+            self.set_options()
+            return
+        self.global_options()
+        command_options[command]()
+
     def set_options(self):
         self.global_options()
         self.config_command_options()
@@ -6123,967 +7803,1197 @@ class ParseParameter:
         self.patch_command_options()
         self.update_command_options()
         self.delete_command_options()
+        self.plan_command_options()
+        self.apply_command_options()
+        self.export_command_options()
+        self.import_command_options()
 
     def get_parser(self):
         return self.parser
 
 
-def ctrl_exit_handler(signal_received, frame):
-    print("\nsynctl exited")
-    sys.exit(0)
+class SyntheticClients(Base):
+    """create the API clients of a command on first use, all share the same auth and tls settings"""
 
-def main():
-    """main function"""
-    signal.signal(signal.SIGINT, ctrl_exit_handler)
-    identify_hyphen()
-
-    para_instanace = ParseParameter()
-    para_instanace.set_options()
-    get_args = para_instanace.get_parser().parse_args()
-    update_args = get_args.__dict__.items()
+    def __init__(self, auth: dict, insecure=False) -> None:
+        Base.__init__(self)
+        self.set_auth(auth)
+        self.set_insecure(insecure)
+        self.clients = {}
 
-    sys_args = sys.argv
-    validate_args(sys_args)
+    def get(self, client_class):
+        if client_class not in self.clients:
+            client = client_class()
+            client.set_auth(self.auth)
+            client.set_insecure(self.insecure)
+            self.clients[client_class] = client
+        return self.clients[client_class]
 
-    if len(sys_args) <= 1:
-        general_helper()
-        sys.exit(0)
 
-    # show synctl version
-    if '-v' in sys_args or '--version' in sys_args:
-        show_version()
-        sys.exit(NORMAL_CODE)
+def ctrl_exit_handler(signal_received, frame):
+    print("\nsynctl exited")
+    sys.exit(0)
 
-    pop_estimate = PopConfiguration()
+def command_config(get_args, clients):
+    """synctl config"""
     auth_instance = Authentication()
 
-    syn_instance = SyntheticTest()
-    alert_instance = SmartAlert()
-    cred_instance = SyntheticCredential()
-    patch_instance = PatchSyntheticTest()
-    syn_update_instance = UpdateSyntheticTest()
-    update_alert = UpdateSmartAlert()
-    pop_instance = SyntheticLocation()
-    datacenter_instance = SyntheticDatacenter()
-    metric_instance = SyntheticMetric()
-
-    summary_instance = SyntheticResult()
-    app_instance = Application()
-
-
-    # both host and token are required when using in command line
-    if get_args.host is not None and get_args.token is not None:
-        syn_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        alert_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        cred_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        pop_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        metric_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        datacenter_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        patch_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        syn_update_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        update_alert.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        summary_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-        app_instance.set_host_token(
-            new_host=get_args.host, new_token=get_args.token)
-
-    else:
-        if COMMAND_CONFIG != get_args.sub_command:
-            auth = auth_instance.get_auth(get_args.use_env)
-            syn_instance.set_auth(auth)
-            alert_instance.set_auth(auth)
-            cred_instance.set_auth(auth)
-            pop_instance.set_auth(auth)
-            metric_instance.set_auth(auth)
-            datacenter_instance.set_auth(auth)
-            patch_instance.set_auth(auth)
-            syn_update_instance.set_auth(auth)
-            update_alert.set_auth(auth)
-            summary_instance.set_auth(auth)
-            app_instance.set_auth(auth)
-
-            # set --verify-tls
-            if get_args.verify_tls is not None :
-                syn_instance.set_insecure(get_args.verify_tls)
-                alert_instance.set_insecure(get_args.verify_tls)
-                cred_instance.set_insecure(get_args.verify_tls)
-                patch_instance.set_insecure(get_args.verify_tls)
-                syn_update_instance.set_insecure(get_args.verify_tls)
-                update_alert.set_insecure(get_args.verify_tls)
-                pop_instance.set_insecure(get_args.verify_tls)
-                metric_instance.set_insecure(get_args.verify_tls)
-                datacenter_instance.set_insecure(get_args.verify_tls)
-                app_instance.set_insecure(get_args.verify_tls)
-
-    if COMMAND_CONFIG == get_args.sub_command:
-        if get_args.config_type == "list":
-            if get_args.show_token is True:
-                if get_args.env is None:
-                    auth_instance.print_config_file(show_token=True)
-                else:
-                    auth_instance.print_config_file(name=get_args.env, show_token=True)
-            else:
-                if get_args.env is None:
-                    auth_instance.print_config_file()
-                else:
-                    auth_instance.print_config_file(name=get_args.env)
-        elif get_args.config_type == "set":
-            if get_args.host is None or get_args.env is None:
-                print("--env and --host are required")
-            else:
-                if get_args.token is None:
-                    get_args.token = getpass.getpass('Token:')
-                set_as_default = False
-                if get_args.default is True:
-                    set_as_default = True
-                auth_instance.add_an_item_to_config(
-                    name=get_args.env,
-                    host=get_args.host,
-                    token=get_args.token,
-                    set_default=set_as_default
-                )
-        elif get_args.config_type == "use":
+    if get_args.config_type == "list":
+        if get_args.show_token is True:
             if get_args.env is None:
-                print('--env is required when set it as default')
+                auth_instance.print_config_file(show_token=True)
             else:
-                auth_instance.set_env_to_default(get_args.env)
-        elif get_args.config_type == "remove":
+                auth_instance.print_config_file(name=get_args.env, show_token=True)
+        else:
             if get_args.env is None:
-                print('--env is required when remove a config')
+                auth_instance.print_config_file()
             else:
-                auth_instance.remove_an_item_from_config(get_args.env)
+                auth_instance.print_config_file(name=get_args.env)
+    elif get_args.config_type == "set":
+        if get_args.host is None or get_args.env is None:
+            print("--env and --host are required")
+        else:
+            if get_args.token is None:
+                get_args.token = getpass.getpass('Token:')
+            set_as_default = False
+            if get_args.default is True:
+                set_as_default = True
+            auth_instance.add_an_item_to_config(
+                name=get_args.env,
+                host=get_args.host,
+                token=get_args.token,
+                set_default=set_as_default
+            )
+    elif get_args.config_type == "use":
+        if get_args.env is None:
+            print('--env is required when set it as default')
+        else:
+            auth_instance.set_env_to_default(get_args.env)
+    elif get_args.config_type == "remove":
+        if get_args.env is None:
+            print('--env is required when remove a config')
+        else:
+            auth_instance.remove_an_item_from_config(get_args.env)
+
+
+def command_run(get_args, clients):
+    """synctl run"""
+    syn_instance = clients.get(SyntheticTest)
+
+    runNow_payload = RunNowConfiguration()
+
+    if get_args.run_type == SYN_TEST:
+        if get_args.location is not None:
+            runNow_payload.set_locations(get_args.location)
+        if get_args.retries is not None:
+            runNow_payload.set_retries(get_args.retries)
+            # retryInterval [0, 10]
+        if get_args.retry_interval is not None:
+            runNow_payload.set_retry_interval(get_args.retry_interval)
+        if get_args.timeout is not None:
+            runNow_payload.set_timeout(get_args.timeout)
+        if get_args.custom_properties is not None:
+            try:
+                custom_properties = json.loads(get_args.custom_properties)
+                if isinstance(custom_properties, dict):
+                    print("Warning: The '{\"key1\":\"value1\"}' format will be deprecated soon. Please use 'key1=value1' instead.")
+                    runNow_payload.set_custom_properties(custom_properties)
+                else:
+                    raise json.JSONDecodeError("Not a dict", get_args.custom_properties)
+            except json.JSONDecodeError:
+                if "=" in get_args.custom_properties:
+                    try:
+                        dict_custom_properties = dict(
+                            pair.strip().split("=", 1) for pair in get_args.custom_properties.split(",")
+                        )
+                        runNow_payload.set_custom_properties(dict_custom_properties)
+                    except ValueError:
+                        print(runNow_payload.exit_synctl('Ensure key-value pairs are formatted as "key=value"'))
+                else:
+                    print(runNow_payload.exit_synctl('Invalid format: Use JSON or "key=value,key2=value2"'))
 
-    elif COMMAND_RUN == get_args.sub_command:
-        runNow_payload = RunNowConfiguration()
+        wait_timeout = syn_instance.parse_wait_timeout(get_args.wait_timeout) if get_args.wait else None
+        payload = runNow_payload.get_json_for_tests(get_args.id)
+        run_results = syn_instance.run_now_test(payload)
+        if get_args.wait:
+            if run_results is None:
+                sys.exit(ERROR_CODE)
+            failed = syn_instance.wait_runNow_results(run_results, wait_timeout)
+            sys.exit(ERROR_CODE if failed > 0 else NORMAL_CODE)
 
-        if get_args.run_type == SYN_TEST:
-            if get_args.id is not None:
-                runNow_payload.set_test(get_args.id)
-            if get_args.location is not None:
-                runNow_payload.set_locations(get_args.location)
-            if get_args.retries is not None:
-                runNow_payload.set_retries(get_args.retries)
-                # retryInterval [0, 10]
-            if get_args.retry_interval is not None:
-                runNow_payload.set_retry_interval(get_args.retry_interval)
-            if get_args.timeout is not None:
-                runNow_payload.set_timeout(get_args.timeout)
-            if get_args.custom_properties is not None:
-                try:
-                    custom_properties = json.loads(get_args.custom_properties)
-                    if isinstance(custom_properties, dict):
-                        print("Warning: The '{\"key1\":\"value1\"}' format will be deprecated soon. Please use 'key1=value1' instead.")
-                        runNow_payload.set_custom_properties(custom_properties)
-                    else:
-                        raise json.JSONDecodeError("Not a dict", get_args.custom_properties)
-                except json.JSONDecodeError:
-                    if "=" in get_args.custom_properties:
-                        try:
-                            dict_custom_properties = dict(
-                                pair.strip().split("=", 1) for pair in get_args.custom_properties.split(",")
-                            )
-                            runNow_payload.set_custom_properties(dict_custom_properties)
-                        except ValueError:
-                            print(runNow_payload.exit_synctl('Ensure key-value pairs are formatted as "key=value"'))
-                    else:
-                        print(runNow_payload.exit_synctl('Invalid format: Use JSON or "key=value,key2=value2"'))
-
-            payload = runNow_payload.get_json()
-            syn_instance.run_now_test(payload)
-
-    elif COMMAND_GET == get_args.sub_command:
-        if get_args.op_type == SYN_TEST:
-            # synctl_instanace.synctl_get()
-            # deal test
-            syn_type_t = None
-            syn_window_size = get_args.window_size
-            if get_args.type is not None:
-                try:
-                    syn_type_t = synthetic_type[get_args.type]
-                except IndexError:
-                    print("Synthetic type only support 0 1 2 3 4 5 6 7", syn_type_t)
 
-            if get_args.id is None:
-                if get_args.analytics is not None:
-                    if get_args.metric is None:
-                        print("Synthetic metrics shouldn't be none")
-                    if any(v is not None for v in (get_args.tag_filter_expression, get_args.order, get_args.window_size)):
-                        test_result = syn_instance.retrieve_synthetic_tests_by_analytics(get_args.analytics, get_args.metric, get_args.tag_filter_expression, get_args.order, get_args.window_size)
-                        syn_instance.print_analytic_result_list(test_result["items"])
-                        sys.exit(NORMAL_CODE)
-                if get_args.CI_CD is True:
-                    if get_args.result is not None:
-                        syn_instance.print_a_runNow_test(get_args.result)
-                    else:
-                        syn_instance.print_runNow_tests()
+def command_get_records(get_args, clients):
+    """synctl get -o json|ndjson|csv, records are written while pages arrive"""
+    syn_instance = clients.get(SyntheticTest)
+    writer = RecordWriter(get_args.output, fields=RecordWriter.parse_fields(get_args.fields))
+
+    if get_args.op_type == SYN_TEST:
+        syn_type_t = synthetic_type[get_args.type] if get_args.type is not None else None
+        if get_args.id is not None:
+            fetches = FetchGraph().add("tests", lambda: syn_instance.retrieve_a_synthetic_test(get_args.id) or [])
+        elif get_args.analytics is not None:
+            fetches = FetchGraph().add("tests", lambda: syn_instance.retrieve_synthetic_tests_by_analytics(
+                get_args.analytics, get_args.metric, get_args.tag_filter_expression, get_args.order,
+                get_args.window_size)["items"])
+        elif get_args.filter is not None:
+            fetches = FetchGraph().add("tests", lambda: syn_instance.retrieve_synthetic_test_by_filter(
+                get_args.filter.split('=')) or [])
+        else:
+            # tests are written while the response is parsed
+            fetches = FetchGraph().add("tests", lambda: syn_instance.iter_synthetic_tests(
+                syn_type_t, CI_CD=get_args.CI_CD, full=True))
+        if get_args.show_result is True:
+            summary_instance = clients.get(SyntheticResult)
+            fetches.add("summary", lambda: summary_instance.get_summary_list(get_args.window_size, test_id=get_args.id))
+        fetched = fetches.run()
+        summary_list = fetched.get("summary")
+        for test in fetched["tests"]:
+            if get_args.no_locations is True and len(test.get("locations") or []) > 0:
+                continue
+            if summary_list is not None:
+                test = dict(test, summary=summary_list.get(test.get("id")))
+            writer.write(test)
+    elif get_args.op_type in (SYN_LOCATION, SYN_LO):
+        pop_instance = clients.get(SyntheticLocation)
+        fetched = (FetchGraph()
+                   .add("locations", lambda: pop_instance.retrieve_synthetic_locations(get_args.id) or [])
+                   .add("summary", pop_instance.get_all_location_summary_list)
+                   .run())
+        summary = fetched["summary"] or {}
+        index = ResourceIndex(location_summaries=summary.get("items", []))
+        for location in fetched["locations"]:
+            writer.write(dict(location, summary=index.summary_of_location(location["id"])))
+    elif get_args.op_type in (SYN_APPLICATION, SYN_APP):
+        app_instance = clients.get(Application)
+        if get_args.name_filter is not None:
+            app_instance.set_name_filter(get_args.name_filter)
+        for items in app_instance.iter_application_pages():
+            writer.write_page(items)
+    elif get_args.op_type == SYN_CRED:
+        cred_instance = clients.get(SyntheticCredential)
+        if get_args.id is not None:
+            writer.write(cred_instance.retrieve_a_credential(get_args.id))
+        else:
+            for credential in cred_instance.retrieve_credentials(get_args.show_details) or []:
+                # without --show-details the API returns names only
+                writer.write(credential if isinstance(credential, dict) else {"credentialName": credential})
+    elif get_args.op_type == SYN_DATACENTER:
+        datacenter_instance = clients.get(SyntheticDatacenter)
+        for datacenter in datacenter_instance.retrieve_synthetic_datacenters(datacenter_id=get_args.id) or []:
+            writer.write(datacenter)
+    elif get_args.op_type == SYN_ALERT:
+        alert_instance = clients.get(SmartAlert)
+        if get_args.id is None:
+            alerts = alert_instance.retrieve_all_smart_alerts()
+        else:
+            alerts = alert_instance.retrieve_a_smart_alert(get_args.id.strip())
+        for alert in alerts or []:
+            writer.write(alert)
+    elif get_args.op_type == "alert-channel":
+        alert_instance = clients.get(SmartAlert)
+        if get_args.id is None:
+            channels = alert_instance.retrieve_all_alerting_channel()
+        else:
+            channels = [alert_instance.retrieve_a_single_alerting_channel(get_args.id)]
+        for channel in channels or []:
+            writer.write(channel)
+    elif get_args.op_type == SYN_RESULT:
+        if get_args.test is None:
+            syn_instance.exit_synctl(ERROR_CODE, "testid is required")
+        window_size = "1h" if get_args.window_size is None else get_args.window_size
+        if get_args.id is None:
+            window_size_ms = clients.get(SyntheticResult).get_window_size(window_size)
+            for items in syn_instance.iter_test_result_pages(get_args.test, window_size=window_size_ms):
+                writer.write_page(items)
+        else:
+            for result in syn_instance.get_a_test_result(get_args.test, get_args.id, window_size):
+                writer.write(result)
+    elif get_args.op_type == SYN_METRIC:
+        if get_args.tag is None or get_args.metric is None:
+            syn_instance.exit_synctl(ERROR_CODE, "groups and metrics are required")
+        metric_payload = SyntheticMetricConfiguration()
+        metric_payload.set_group_by_tag(metric_payload.parse_arguments(get_args.tag))
+        metric_payload.set_metrics(metric_payload.parse_arguments(get_args.metric))
+        if get_args.tag_filter_expression is not None:
+            metric_payload.set_tag_filter_expression(json.loads(get_args.tag_filter_expression))
+        metric_results = clients.get(SyntheticMetric).retreive_synthetic_metrics(metric_payload) or {}
+        for metric in metric_results.get("metricsResult", []):
+            writer.write(metric)
+    else:
+        syn_instance.exit_synctl(ERROR_CODE, f"--output is not supported by get {get_args.op_type}")
+    writer.close()
+
+
+def command_get(get_args, clients):
+    """synctl get"""
+    if get_args.output is not None:
+        command_get_records(get_args, clients)
+        return
+    if get_args.op_type == SYN_TEST:
+        syn_instance = clients.get(SyntheticTest)
+        summary_instance = clients.get(SyntheticResult)
+        # synctl_instanace.synctl_get()
+        # deal test
+        syn_type_t = None
+        syn_window_size = get_args.window_size
+        if get_args.type is not None:
+            try:
+                syn_type_t = synthetic_type[get_args.type]
+            except IndexError:
+                print("Synthetic type only support 0 1 2 3 4 5 6 7", syn_type_t)
+
+        if get_args.id is None:
+            if get_args.analytics is not None:
+                if get_args.metric is None:
+                    print("Synthetic metrics shouldn't be none")
+                if any(v is not None for v in (get_args.tag_filter_expression, get_args.order, get_args.window_size)):
+                    test_result = syn_instance.retrieve_synthetic_tests_by_analytics(get_args.analytics, get_args.metric, get_args.tag_filter_expression, get_args.order, get_args.window_size)
+                    syn_instance.print_analytic_result_list(test_result["items"])
                     sys.exit(NORMAL_CODE)
+            if get_args.CI_CD is True:
+                if get_args.result is not None:
+                    syn_instance.print_a_runNow_test(get_args.result)
                 else:
-                    out_list = syn_instance.retrieve_all_synthetic_tests(
-                        syn_type_t)
-                if get_args.filter is not None:
-                    split_string = get_args.filter.split('=')
-                    filtered_payload = syn_instance.retrieve_synthetic_test_by_filter(split_string)
-                    syn_instance.print_synthetic_test(out_list=filtered_payload)
-                    sys.exit(ERROR_CODE)
-
-                if get_args.show_result is True:
-                    out_list = syn_instance.retrieve_all_synthetic_tests(
-                        syn_type_t)
-                    summary_result = summary_instance.get_summary_list(syn_window_size,
-                                                                       test_id=get_args.id)
-                    syn_instance.print_synthetic_test(out_list=out_list,
-                                                      summary_list=summary_result)
-                    sys.exit(NORMAL_CODE)
-
-                # print all tests with no location
-                if get_args.no_locations is True:
-                    syn_instance.print_tests_without_locations()
-
-                syn_instance.print_synthetic_test(out_list=out_list)
+                    syn_instance.print_runNow_tests()
+                sys.exit(NORMAL_CODE)
+            if get_args.filter is not None:
+                split_string = get_args.filter.split('=')
+                filtered_payload = syn_instance.retrieve_synthetic_test_by_filter(split_string)
+                syn_instance.print_synthetic_test(out_list=filtered_payload)
+                sys.exit(ERROR_CODE)
+
+            # the test list and the summary list do not depend on each other
+            fetches = FetchGraph().add("tests", lambda: syn_instance.retrieve_all_synthetic_tests(syn_type_t))
+            if get_args.show_result is True:
+                fetches.add("summary", lambda: summary_instance.get_summary_list(syn_window_size))
+            fetched = fetches.run()
+            out_list = fetched["tests"]
+
+            if get_args.show_result is True:
+                syn_instance.print_synthetic_test(out_list=out_list,
+                                                  summary_list=fetched["summary"])
+                sys.exit(NORMAL_CODE)
+
+            # print all tests with no location
+            if get_args.no_locations is True:
+                syn_instance.print_tests_without_locations(out_list)
+
+            syn_instance.print_synthetic_test(out_list=out_list)
+        else:
+            if get_args.CI_CD is True:
+                syn_instance.print_a_runNow_test(get_args.id)
+
+            # a_single_payload type: list, the summary is only shown in the test list
+            fetches = FetchGraph().add("test", lambda: syn_instance.retrieve_a_synthetic_test(get_args.id))
+            show_summary = not (get_args.show_script or get_args.show_json or get_args.save_script or get_args.show_details)
+            if show_summary:
+                fetches.add("summary", lambda: summary_instance.get_summary_list(syn_window_size, test_id=get_args.id))
+            fetched = fetches.run()
+            a_single_payload = fetched["test"]
+            summary_result = fetched.get("summary")
+            if get_args.show_script is True:
+                syn_instance.print_a_synthetic_details(
+                    a_single_payload, show_script=True)
+            elif get_args.show_json is True:
+                syn_instance.print_a_synthetic_details(
+                    a_single_payload, show_json=True)
+            elif get_args.save_script is True:
+                syn_instance.save_api_script_to_local(a_single_payload[0])
+            elif get_args.show_details is True:
+                syn_instance.print_a_synthetic_details(
+                    a_single_payload, show_details=True)
             else:
-                if get_args.CI_CD is True:
-                    syn_instance.print_a_runNow_test(get_args.id)
-
-                summary_result = summary_instance.get_summary_list(syn_window_size,
-                                                                   test_id=get_args.id)
-                # if get_args.id is not None:
-                # a_single_payload type: list
-                a_single_payload = syn_instance.retrieve_a_synthetic_test(
-                    get_args.id)
-                if get_args.show_script is True:
-                    syn_instance.print_a_synthetic_details(
-                        a_single_payload, show_script=True)
-                elif get_args.show_json is True:
-                    syn_instance.print_a_synthetic_details(
-                        a_single_payload, show_json=True)
-                elif get_args.save_script is True:
-                    syn_instance.save_api_script_to_local(a_single_payload[0])
-                elif get_args.show_details is True:
-                    syn_instance.print_a_synthetic_details(
-                        a_single_payload, show_details=True)
-                else:
-                    syn_instance.print_synthetic_test(out_list=a_single_payload,
-                                                      test_type=syn_type_t,
-                                                      summary_list=summary_result)
-        elif get_args.op_type in (SYN_LOCATION, SYN_LO):
-            # deal pop
-            pop_locations_json = []
-            pop_location = pop_instance.retrieve_synthetic_locations(
-                get_args.id)
+                syn_instance.print_synthetic_test(out_list=a_single_payload,
+                                                  test_type=syn_type_t,
+                                                  summary_list=summary_result)
+    elif get_args.op_type in (SYN_LOCATION, SYN_LO):
+        pop_instance = clients.get(SyntheticLocation)
+        # deal pop, the locations are retrieved once, with the summary list at the same time
+        show_location = get_args.show_details is True or get_args.show_json is True
+        fetches = FetchGraph().add("locations", lambda: pop_instance.retrieve_synthetic_locations(get_args.id))
+        if not show_location:
+            fetches.add("summary", pop_instance.get_all_location_summary_list)
+        fetched = fetches.run()
+        pop_locations_json = fetched["locations"]
+        if get_args.show_details is True:
+            pop_instance.print_a_location_details(
+                get_args.id, pop_locations_json, show_details=True)
+            pop_instance.exit_synctl(ERROR_CODE)
+        if get_args.show_json is True:
+            pop_instance.print_a_location_details(
+                get_args.id, pop_locations_json, show_json=True)
+            pop_instance.exit_synctl(ERROR_CODE)
+        pop_instance.print_synthetic_locations(
+            pop_locations_json, fetched["summary"])
+    elif get_args.op_type in (SYN_APPLICATION, SYN_APP):
+        app_instance = clients.get(Application)
+        if get_args.name_filter is not None:
+            app_instance.set_name_filter(get_args.name_filter)
+        app_instance.print_app_list()
+    elif get_args.op_type == SYN_CRED:
+        cred_instance = clients.get(SyntheticCredential)
+        if get_args.id is None:
             if get_args.show_details is True:
-                pop_instance.print_a_location_details(
-                    get_args.id, pop_location, show_details=True)
-                syn_instance.exit_synctl(ERROR_CODE)
-            if get_args.show_json is True:
-                pop_instance.print_a_location_details(
-                    get_args.id, pop_location, show_json=True)
-                syn_instance.exit_synctl(ERROR_CODE)
-            if get_args.id is None:
-                pop_locations_json = pop_instance.retrieve_synthetic_locations()
-            else:
-                pop_locations_json = pop_instance.retrieve_synthetic_locations(
-                    location_id=get_args.id)
-            pop_locations_summary_result = pop_instance.get_all_location_summary_list()
-            pop_instance.print_synthetic_locations(
-                pop_locations_json, pop_locations_summary_result)
-        elif get_args.op_type in (SYN_APPLICATION, SYN_APP):
-            if get_args.name_filter is not None:
-                app_instance.set_name_filter(get_args.name_filter)
-            app_instance.print_app_list()
-        elif get_args.op_type == SYN_CRED:
-            if get_args.id is None:
-                if get_args.show_details is True:
-                    cred_details = cred_instance.retrieve_credentials(get_args.show_details)
-                    cred_instance.print_credentials(cred_details, get_args.show_details)
-                else:
-                    credentials = cred_instance.retrieve_credentials()
-                    cred_instance.print_credentials(credentials)
+                cred_details = cred_instance.retrieve_credentials(get_args.show_details)
+                cred_instance.print_credentials(cred_details, get_args.show_details)
             else:
-                credential = cred_instance.retrieve_a_credential(get_args.id)
-                cred_instance.print_a_credential(credential)
-        elif get_args.op_type == SYN_DATACENTER:
-            if get_args.id is None:
-                pop_datacenter = datacenter_instance.retrieve_synthetic_datacenters()
-            else:
-                pop_datacenter = datacenter_instance.retrieve_synthetic_datacenters(datacenter_id=get_args.id)
-                if get_args.show_details is True:
-                    datacenter_instance.print_a_datacenter_details(pop_datacenter, show_details=True)
-                    datacenter_instance.exit_synctl(ERROR_CODE)
-                elif get_args.show_json is True:
-                    datacenter_instance.print_a_datacenter_details(pop_datacenter, show_json=True)
-                    datacenter_instance.exit_synctl(ERROR_CODE)
-            datacenter_instance.print_synthetic_datacenter(pop_datacenter)
-
-        elif get_args.op_type == SYN_ALERT:
-            if get_args.id is None:
-                alerts = alert_instance.retrieve_all_smart_alerts()
-                alert_instance.print_synthetic_alerts(alerts)
+                credentials = cred_instance.retrieve_credentials()
+                cred_instance.print_credentials(credentials)
+        else:
+            credential = cred_instance.retrieve_a_credential(get_args.id)
+            cred_instance.print_a_credential(credential)
+    elif get_args.op_type == SYN_DATACENTER:
+        datacenter_instance = clients.get(SyntheticDatacenter)
+        if get_args.id is None:
+            pop_datacenter = datacenter_instance.retrieve_synthetic_datacenters()
+        else:
+            pop_datacenter = datacenter_instance.retrieve_synthetic_datacenters(datacenter_id=get_args.id)
+            if get_args.show_details is True:
+                datacenter_instance.print_a_datacenter_details(pop_datacenter, show_details=True)
+                datacenter_instance.exit_synctl(ERROR_CODE)
+            elif get_args.show_json is True:
+                datacenter_instance.print_a_datacenter_details(pop_datacenter, show_json=True)
+                datacenter_instance.exit_synctl(ERROR_CODE)
+        datacenter_instance.print_synthetic_datacenter(pop_datacenter)
+
+    elif get_args.op_type == SYN_ALERT:
+        alert_instance = clients.get(SmartAlert)
+        if get_args.id is None:
+            alerts = alert_instance.retrieve_all_smart_alerts()
+            alert_instance.print_synthetic_alerts(alerts)
+        else:
+            get_args.id = get_args.id.lstrip() if get_args.id.startswith(' ') else get_args.id
+            single_alert = alert_instance.retrieve_a_smart_alert(get_args.id)
+            if get_args.show_details is True:
+                alert_instance.print_a_alert_details(get_args.id, single_alert, show_details=True)
+            elif get_args.show_json is True:
+                alert_instance.print_a_alert_details(get_args.id, single_alert, show_json=True)
             else:
-                get_args.id = get_args.id.lstrip() if get_args.id.startswith(' ') else get_args.id
-                single_alert = alert_instance.retrieve_a_smart_alert(get_args.id)
-                if get_args.show_details is True:
-                    alert_instance.print_a_alert_details(get_args.id, single_alert, show_details=True)
-                elif get_args.show_json is True:
-                    alert_instance.print_a_alert_details(get_args.id, single_alert, show_json=True)
-                else:
-                    alert_instance.print_synthetic_alerts(single_alert)
-        elif get_args.op_type == "alert-channel":
+                alert_instance.print_synthetic_alerts(single_alert)
+    elif get_args.op_type == "alert-channel":
+        alert_instance = clients.get(SmartAlert)
+        if get_args.id is None:
+            alerting_channel = alert_instance.retrieve_all_alerting_channel()
+            alert_instance.print_alerting_channels(alerting_channel)
+        else:
+            single_alert = alert_instance.retrieve_a_single_alerting_channel(get_args.id)
+            alert_instance.print_alerting_channels([single_alert])
+    # show test results
+    elif get_args.op_type == SYN_RESULT:
+        syn_instance = clients.get(SyntheticTest)
+        if get_args.test is not None:
+            window_size = "1h" if get_args.window_size is None else get_args.window_size
             if get_args.id is None:
-                alerting_channel = alert_instance.retrieve_all_alerting_channel()
-                alert_instance.print_alerting_channels(alerting_channel)
+                test_result = syn_instance.get_all_test_results(get_args.test, window_size)
+                syn_instance.print_result_list(test_result)
             else:
-                single_alert = alert_instance.retrieve_a_single_alerting_channel(get_args.id)
-                alert_instance.print_alerting_channels([single_alert])
-        # show test results
-        elif get_args.op_type == SYN_RESULT:
-            if get_args.test is not None:
-                if get_args.window_size is None:
-                    test_result = syn_instance.get_all_test_results(get_args.test)
-                else:
-                    test_result = syn_instance.get_all_test_results(get_args.test, get_args.window_size)
-                if get_args.id is None:
-                    syn_instance.print_result_list(test_result["items"])
-                else:
-                    if get_args.har is None:
-                        a_result_details = syn_instance.retrieve_test_result_details(get_args.id, get_args.test)
-                    else:
-                        a_result_details = syn_instance.retrieve_test_result_details(get_args.id, get_args.test, get_args.har)
-                    syn_instance.print_result_details(a_result_details, test_result["items"])
-            # elif get_args.CI_CD is True:
-            #     if get_args.id is not None:
-            #         syn_instance.print_a_runNow_result(get_args.id)
-            #     else:
-            #         syn_instance.print_runNow_tests()
-            else:
-                print('testid is required')
-        elif get_args.op_type == SYN_METRIC:
-            metric_payload = SyntheticMetricConfiguration()
-            if get_args.tag is not None:
-                parsed_tag = metric_payload.parse_arguments(get_args.tag)
-                metric_payload.set_group_by_tag(parsed_tag)
-            else:
-                print("groups is required")
-            if get_args.metric is not None:
-                parsed_metric = metric_payload.parse_arguments(get_args.metric)
-                metric_payload.set_metrics(parsed_metric)
-            else:
-                print("metrics is required")
-            if get_args.tag_filter_expression is not None:
-                tag_filter_expression = json.loads(get_args.tag_filter_expression)
-                metric_payload.set_tag_filter_expression(tag_filter_expression)
-            metric_results = metric_instance.retreive_synthetic_metrics(metric_payload)
-            metric_instance.print_metrics(metric_results)
-        elif get_args.op_type == POP_SIZE or get_args.op_type == 'size':
-            pop_estimate.print_estimated_pop_size()
-        elif get_args.op_type == POP_COST or get_args.op_type == 'cost':
-            pop_estimate.print_estimated_cost()
-    elif COMMAND_CREATE == get_args.sub_command:
-
-        if get_args.syn_type == SYN_CRED:
-            cred_payload = CredentialConfiguration()
-            if get_args.key is not None:
-                cred_payload.set_credential_name(get_args.key)
-            if get_args.value is not None:
-                cred_payload.set_credential_value(get_args.value)
-            if get_args.apps is not None:
-                cred_payload.set_credential_applications(get_args.apps)
-            if get_args.websites is not None:
-                cred_payload.set_credential_websites(get_args.websites)
-            if get_args.mobile_apps is not None:
-                cred_payload.set_credential_mobile_apps(get_args.mobile_apps)
+                # only the result itself is retrieved, at the same time as its details
+                fetched = (FetchGraph()
+                           .add("details", lambda: syn_instance.retrieve_test_result_details(get_args.id, get_args.test, get_args.har))
+                           .add("result", lambda: syn_instance.get_a_test_result(get_args.test, get_args.id, window_size))
+                           .run())
+                syn_instance.print_result_details(fetched["details"], fetched["result"])
+        # elif get_args.CI_CD is True:
+        #     if get_args.id is not None:
+        #         syn_instance.print_a_runNow_result(get_args.id)
+        #     else:
+        #         syn_instance.print_runNow_tests()
+        else:
+            print('testid is required')
+    elif get_args.op_type == SYN_METRIC:
+        metric_instance = clients.get(SyntheticMetric)
+        metric_payload = SyntheticMetricConfiguration()
+        if get_args.tag is not None:
+            parsed_tag = metric_payload.parse_arguments(get_args.tag)
+            metric_payload.set_group_by_tag(parsed_tag)
+        else:
+            print("groups is required")
+        if get_args.metric is not None:
+            parsed_metric = metric_payload.parse_arguments(get_args.metric)
+            metric_payload.set_metrics(parsed_metric)
+        else:
+            print("metrics is required")
+        if get_args.tag_filter_expression is not None:
+            tag_filter_expression = json.loads(get_args.tag_filter_expression)
+            metric_payload.set_tag_filter_expression(tag_filter_expression)
+        metric_results = metric_instance.retreive_synthetic_metrics(metric_payload)
+        metric_instance.print_metrics(metric_results)
+    elif get_args.op_type == POP_SIZE or get_args.op_type == 'size':
+        clients.get(PopConfiguration).print_estimated_pop_size()
+    elif get_args.op_type == POP_COST or get_args.op_type == 'cost':
+        clients.get(PopConfiguration).print_estimated_cost()
+
+
+def command_create(get_args, clients):
+    """synctl create"""
+    if get_args.syn_type == SYN_CRED:
+        cred_instance = clients.get(SyntheticCredential)
+        cred_payload = CredentialConfiguration()
+        if get_args.key is not None:
+            cred_payload.set_credential_name(get_args.key)
+        if get_args.value is not None:
+            cred_payload.set_credential_value(get_args.value)
+        if get_args.apps is not None:
+            cred_payload.set_credential_applications(get_args.apps)
+        if get_args.websites is not None:
+            cred_payload.set_credential_websites(get_args.websites)
+        if get_args.mobile_apps is not None:
+            cred_payload.set_credential_mobile_apps(get_args.mobile_apps)
+
+        cred_instance.set_cred_payload(payload=cred_payload.get_json())
+        cred_instance.create_credential()
+        return
+    elif get_args.syn_type == SYN_ALERT:
+        alert_instance = clients.get(SmartAlert)
+        alert_payload = SmartAlertConfiguration()
+
+        # --from-file, -f  options
+        # create from a json file
+        # if use a json file, all options should config in json
+        if get_args.from_file is not None and get_args.from_file.endswith('.json') :
+            json_file = get_args.from_file
+            alert_payload.loads_from_json_file(json_file_name=json_file)
+            alert_instance.set_alert_payload(alert_payload.get_json())
+            alert_instance.create_synthetic_alert()
+            return
 
-            cred_instance.set_cred_payload(payload=cred_payload.get_json())
-            cred_instance.create_credential()
+        if get_args.name is not None:
+            alert_payload.set_alert_name(get_args.name)
+        if get_args.test is not None:
+            alert_payload.set_synthetic_tests(get_args.test)
+        if get_args.alert_channel is not None:
+            alert_payload.set_alert_channel(get_args.alert_channel)
+        if get_args.violation_count is not None:
+            alert_payload.set_violations_count(get_args.violation_count)
+        if get_args.severity is not None:
+            alert_payload.set_severity(get_args.severity)
+        if get_args.tag_filter_expression is not None:
+            tag_filter_expression = get_args.tag_filter_expression
+            tag_filter_expression_json = json.loads(tag_filter_expression)
+            alert_payload.set_tag_filter_expression(tag_filter_expression_json)
+        if get_args.custom_payloads is not None:
+            custom_payloads_json = json.loads(get_args.custom_payloads)
+            alert_payload.set_custom_payloads(custom_payloads_json)
+        if get_args.grace_period is not None:
+            alert_payload.set_grace_period(get_args.grace_period)
+        alert_instance.set_alert_payload(alert_payload.get_json())
+        alert_instance.create_synthetic_alert()
+    elif get_args.syn_type == SYN_TEST:
+        syn_instance = clients.get(SyntheticTest)
+        # bulk create, the synthetic type is read from each payload
+        if get_args.from_dir is not None or get_args.from_ndjson is not None:
+            syn_instance.set_concurrency(get_args.concurrency)
+            test_configs = syn_instance.load_test_payloads(get_args.from_dir, get_args.from_ndjson)
+            syn_instance.create_multiple_synthetic_tests(test_configs, get_args.id_map)
             return
-        elif get_args.syn_type == SYN_ALERT:
-            alert_payload = SmartAlertConfiguration()
+        if get_args.type is not None and get_args.type in [0, 1, 2, 3, 4, 5, 6, 7]:
+            syn_type_t = synthetic_type[get_args.type]
+            payload = SyntheticConfiguration(syn_type_t)
 
             # --from-file, -f  options
             # create from a json file
             # if use a json file, all options should config in json
+            # not support provide other options from command-line
             if get_args.from_file is not None and get_args.from_file.endswith('.json') :
                 json_file = get_args.from_file
-                alert_payload.loads_from_json_file(json_file_name=json_file)
+                payload.loads_from_json_file(json_file_name=json_file)
                 syn_instance.set_synthetic_payload(
-                    payload=alert_payload.get_json())
-                alert_instance.set_alert_payload(alert_payload.get_json())
-                alert_instance.create_synthetic_alert()
+                    payload=payload.get_json())
+                syn_instance.create_a_synthetic_test()
                 return
 
-            if get_args.name is not None:
-                alert_payload.set_alert_name(get_args.name)
-            if get_args.test is not None:
-                alert_payload.set_synthetic_tests(get_args.test)
-            if get_args.alert_channel is not None:
-                alert_payload.set_alert_channel(get_args.alert_channel)
-            if get_args.violation_count is not None:
-                alert_payload.set_violations_count(get_args.violation_count)
-            if get_args.severity is not None:
-                alert_payload.set_severity(get_args.severity)
-            if get_args.tag_filter_expression is not None:
-                tag_filter_expression = get_args.tag_filter_expression
-                tag_filter_expression_json = json.loads(tag_filter_expression)
-                alert_payload.set_tag_filter_expression(tag_filter_expression_json)
-            if get_args.custom_payloads is not None:
-                custom_payloads_json = json.loads(get_args.custom_payloads)
-                alert_payload.set_custom_payloads(custom_payloads_json)
-            if get_args.grace_period is not None:
-                alert_payload.set_grace_period(get_args.grace_period)
-            alert_instance.set_alert_payload(alert_payload.get_json())
-            alert_instance.create_synthetic_alert()
-        elif get_args.syn_type == SYN_TEST:
-            if get_args.type is not None and get_args.type in [0, 1, 2, 3, 4, 5, 6, 7]:
-                syn_type_t = synthetic_type[get_args.type]
-                payload = SyntheticConfiguration(syn_type_t)
-
-                # --from-file, -f  options
-                # create from a json file
-                # if use a json file, all options should config in json
-                # not support provide other options from command-line
-                if get_args.from_file is not None and get_args.from_file.endswith('.json') :
-                    json_file = get_args.from_file
-                    payload.loads_from_json_file(json_file_name=json_file)
-                    syn_instance.set_synthetic_payload(
-                        payload=payload.get_json())
-                    syn_instance.create_a_synthetic_test()
-                    return
-
-                # create test and get option from command line
-                # PING, create simple ping
-                if get_args.type == 0 or get_args.type is None:
-                    # request url is required
-                    if get_args.url is not None:
-                        payload.set_ping_url(get_args.url)
-                    else:
-                        payload.exit_synctl(ERROR_CODE, "URL is required")
-                    if get_args.operation is not None:
-                        payload.set_ping_operation(get_args.operation)
-                    if get_args.headers is not None:
-                        headers_str = get_args.headers
-                        headers_json = json.loads(headers_str)
-                        payload.set_ping_headers(headers_json)
-                    if get_args.body is not None:
-                        payload.set_ping_body(get_args.body)
-
-                    # followRedirect
-                    if get_args.follow_redirect is not None:
-                        payload.set_follow_redirect(get_args.follow_redirect)
-                    # expectStatus
-                    if get_args.expect_status is not None:
-                        payload.set_expect_status(get_args.expect_status)
-                    # expectJson, str -> dict
-                    # an example: --expect-json '{"name": "John","age": 30,"city": "New York"}'
-                    if get_args.expect_json is not None:
-                        expect_json_str = get_args.expect_json
-                        expect_json_json = json.loads(expect_json_str)
-                        payload.set_expect_json(expect_json=expect_json_json)
-                    # expectMatch
-                    # an example: --expect-match "ibm"
-                    if get_args.expect_match is not None:
-                        payload.set_expect_match(
-                            expect_match=get_args.expect_match)
-                    # expectExists
-                    # an example: --expect-exists '["slideshow"]'
-                    if get_args.expect_exists is not None:
-                        expect_exists_str = get_args.expect_exists
-                        expect_exists_list = json.loads(expect_exists_str)
-                        payload.set_expect_exists(expect_exists_list)
-                    # expectNotEmpty
-                    # an example: --expect-not-empty '["slideshow"]'
-                    if get_args.expect_not_empty is not None:
-                        expect_not_empty_str = get_args.expect_not_empty
-                        expect_not_empty_list = json.loads(
-                            expect_not_empty_str)
-                        payload.set_expect_not_empty(expect_not_empty_list)
-                    if get_args.allow_insecure is not None:
-                        payload.set_allow_insecure(get_args.allow_insecure)
-                    if get_args.validation_string is not None:
-                        payload.set_validation_string(get_args.validation_string)
-
-                # basic type HTTPScript and WebpageScript
-                elif get_args.type in (1, 2, 3) and get_args.bundle is None:
-                    syn_type_t = synthetic_type[get_args.type]
-                    payload = SyntheticConfiguration(syn_type=syn_type_t)
-                    if get_args.script is not None:
-                        script_content = payload.read_js_file(
-                            get_args.script)
-                        payload.set_api_script_script(
-                            script_str=script_content)
-                    if payload.get_api_script_script() == "":
-                        syn_instance.exit_synctl(ERROR_CODE, "script should not be empty")
-
-                # bundle script
-                elif get_args.type in (1, 2) and get_args.bundle is not None:
-                    syn_type_t = synthetic_type[get_args.type]
-                    payload = SyntheticConfiguration(
-                        syn_type_t, bundle_type=True)
-
-                    if payload.is_zip_file(get_args.bundle):
-                        bundle_base64_str = payload.read_zip_file_to_base64(
-                            get_args.bundle)
-                    else:
-                        bundle_base64_str = get_args.bundle
-                    # entry file
-                    if get_args.bundle_entry_file is not None:
-                        payload.set_api_bundle_script(
-                            bundle_base64_str, script_file=get_args.bundle_entry_file)
-                    else:
-                        # script file use index.js
-                        payload.set_api_bundle_script(bundle_base64_str)
-                # BrowserScript 2, WebpageScript 3, WebpageAction 4
-                if get_args.type in (2, 3, 4):
-                    payload.set_browser_type(get_args.browser)
-
-                    if get_args.record_video is not None:
-                        payload.set_record_video(get_args.record_video)
+            # create test and get option from command line
+            # PING, create simple ping
+            if get_args.type == 0 or get_args.type is None:
+                # request url is required
+                if get_args.url is not None:
+                    payload.set_ping_url(get_args.url)
+                else:
+                    payload.exit_synctl(ERROR_CODE, "URL is required")
+                if get_args.operation is not None:
+                    payload.set_ping_operation(get_args.operation)
+                if get_args.headers is not None:
+                    headers_str = get_args.headers
+                    headers_json = json.loads(headers_str)
+                    payload.set_ping_headers(headers_json)
+                if get_args.body is not None:
+                    payload.set_ping_body(get_args.body)
 
+                # followRedirect
+                if get_args.follow_redirect is not None:
+                    payload.set_follow_redirect(get_args.follow_redirect)
+                # expectStatus
+                if get_args.expect_status is not None:
+                    payload.set_expect_status(get_args.expect_status)
+                # expectJson, str -> dict
+                # an example: --expect-json '{"name": "John","age": 30,"city": "New York"}'
+                if get_args.expect_json is not None:
+                    expect_json_str = get_args.expect_json
+                    expect_json_json = json.loads(expect_json_str)
+                    payload.set_expect_json(expect_json=expect_json_json)
+                # expectMatch
+                # an example: --expect-match "ibm"
+                if get_args.expect_match is not None:
+                    payload.set_expect_match(
+                        expect_match=get_args.expect_match)
+                # expectExists
+                # an example: --expect-exists '["slideshow"]'
+                if get_args.expect_exists is not None:
+                    expect_exists_str = get_args.expect_exists
+                    expect_exists_list = json.loads(expect_exists_str)
+                    payload.set_expect_exists(expect_exists_list)
+                # expectNotEmpty
+                # an example: --expect-not-empty '["slideshow"]'
+                if get_args.expect_not_empty is not None:
+                    expect_not_empty_str = get_args.expect_not_empty
+                    expect_not_empty_list = json.loads(
+                        expect_not_empty_str)
+                    payload.set_expect_not_empty(expect_not_empty_list)
+                if get_args.allow_insecure is not None:
+                    payload.set_allow_insecure(get_args.allow_insecure)
+                if get_args.validation_string is not None:
+                    payload.set_validation_string(get_args.validation_string)
 
-                if get_args.type == 4:
-                    if get_args.url is not None:
-                        payload.set_ping_url(get_args.url)
-                    else:
-                        print("URL is required")
-
-                # SSLCertificate
-                if get_args.type == 5:
-                    if get_args.hostname is not None:
-                        payload.set_host(get_args.hostname)
-                    if get_args.port is not None:
-                        payload.set_port(get_args.port)
-                    if get_args.remaining_days_check is not None:
-                        payload.set_remaining_days(get_args.remaining_days_check)
-                    payload.set_frequency(get_args.type, 1440)
-
-                # DNS
-                if get_args.type == 6:
-                    if get_args.cname is not None:
-                        payload.set_cname(get_args.cname)
-                    if get_args.lookup is not None:
-                        payload.set_lookup(get_args.lookup)
-                    if get_args.lookup_server_name is not None:
-                        payload.set_lookup_server_name(get_args.lookup_server_name)
-                    if get_args.port is not None:
-                        payload.set_port(get_args.port)
-                    if get_args.query_time is not None:
-                        query_time_json = json.loads(get_args.query_time)
-                        payload.set_query_time(query_time_json)
-                    if get_args.query_type is not None:
-                        payload.set_query_type(get_args.query_type)
-                    if get_args.recursive_lookups is not None:
-                        payload.set_recursive_lookups(get_args.recursive_lookups)
-                    if get_args.server is not None:
-                        payload.set_server(get_args.server)
-                    if get_args.server_retries is not None:
-                        payload.set_server_retries(get_args.server_retries)
-                    if get_args.target_values is not None:
-                        target_values_json = json.loads(get_args.target_values)
-                        payload.set_target_values([target_values_json])
-                    if get_args.transport is not None:
-                        payload.set_transport(get_args.transport)
-                # ICMP
-                if get_args.type == 7:
-                    if get_args.target_host is not None:
-                        payload.set_target_host(get_args.target_host)
-                    if get_args.packet_count is not None:
-                        payload.set_packet_count(get_args.packet_count)
-                    if get_args.packet_size is not None:
-                        payload.set_packet_size(get_args.packet_size)
-                    if get_args.packet_timeout is not None:
-                        payload.set_packet_timeout(get_args.packet_timeout)
-                    if get_args.use_ipv6 is not None:
-                        payload.set_use_ipv6(get_args.use_ipv6)
-                    if get_args.use_dns is not None:
-                        payload.set_use_dns(get_args.use_dns)
-                    if get_args.validation_rules is not None:
-                        validation_rules_json = json.loads(get_args.validation_rules)
-                        payload.set_validation_rules(validation_rules_json)
-
-
-                # global operation, add label, location, description, frequency, etc.
-                if get_args.label is not None:
-                    payload.set_label(get_args.label)
-                if get_args.location is not None:
-                    payload.set_locations(get_args.location)
-                if get_args.description is not None:
-                    payload.set_description(get_args.description)
-                if get_args.frequency is not None:
-                    payload.set_frequency(get_args.type, get_args.frequency)
-                if get_args.apps is not None:
-                    print("Warning: --app-id/--application-id will be deprecated soon. Use --apps/--applications")
-                    payload.set_application_id(get_args.apps)
-                if get_args.websites is not None:
-                    payload.set_websites(get_args.websites)
-                if get_args.mobile_apps is not None:
-                    payload.set_mobile_apps(get_args.mobile_apps)
-                if get_args.timeout is not None:
-                    payload.set_timeout(get_args.timeout)
-
-                if get_args.custom_properties is not None:
-                    try:
-                        custom_properties = json.loads(get_args.custom_properties)
-                        if isinstance(custom_properties, dict):
-                            print("Warning: The '{\"key1\":\"value1\"}' format will be deprecated soon. Please use 'key1=value1' instead.")
-                            payload.set_custom_properties(custom_properties)
-                        else:
-                            raise json.JSONDecodeError("Not a dict", get_args.custom_properties)
-                    except json.JSONDecodeError:
-                        if "=" in get_args.custom_properties:
-                            try:
-                                dict_custom_properties = dict(
-                                    pair.strip().split("=", 1) for pair in get_args.custom_properties.split(",")
-                                )
-                                payload.set_custom_properties(dict_custom_properties)
-                            except ValueError:
-                                print(payload.exit_synctl('Ensure key-value pairs are formatted as "key=value"'))
-                        else:
-                            print(payload.exit_synctl('Invalid format: Use JSON or "key=value,key2=value2"'))
+            # basic type HTTPScript and WebpageScript
+            elif get_args.type in (1, 2, 3) and get_args.bundle is None:
+                syn_type_t = synthetic_type[get_args.type]
+                payload = SyntheticConfiguration(syn_type=syn_type_t)
+                if get_args.script is not None:
+                    script_content = payload.read_js_file(
+                        get_args.script)
+                    payload.set_api_script_script(
+                        script_str=script_content)
+                if payload.get_api_script_script() == "":
+                    syn_instance.exit_synctl(ERROR_CODE, "script should not be empty")
+
+            # bundle script
+            elif get_args.type in (1, 2) and get_args.bundle is not None:
+                syn_type_t = synthetic_type[get_args.type]
+                payload = SyntheticConfiguration(
+                    syn_type_t, bundle_type=True)
 
-                # configuration
-                # retries [0, 2]
-                if get_args.retries is not None:
-                    payload.set_retries(get_args.retries)
-                # retryInterval [0, 10]
-                if get_args.retry_interval is not None:
-                    payload.set_retry_interval(get_args.retry_interval)
+                if payload.is_zip_file(get_args.bundle):
+                    bundle_base64_str = payload.read_zip_file_to_base64(
+                        get_args.bundle)
+                else:
+                    bundle_base64_str = get_args.bundle
+                # entry file
+                if get_args.bundle_entry_file is not None:
+                    payload.set_api_bundle_script(
+                        bundle_base64_str, script_file=get_args.bundle_entry_file)
+                else:
+                    # script file use index.js
+                    payload.set_api_bundle_script(bundle_base64_str)
+            # BrowserScript 2, WebpageScript 3, WebpageAction 4
+            if get_args.type in (2, 3, 4):
+                payload.set_browser_type(get_args.browser)
 
-                syn_payload = payload.get_json()
-                syn_instance.set_synthetic_payload(payload=syn_payload)
+                if get_args.record_video is not None:
+                    payload.set_record_video(get_args.record_video)
 
-                syn_instance.create_a_synthetic_test()
 
-            else:
-                syn_instance.exit_synctl(ERROR_CODE, '-t/--type is required to create synthetic test')
-    elif COMMAND_PATCH == get_args.sub_command:
-        if get_args.id is not None:
-            patch_instance.set_test_id(get_args.id)
-        if get_args.active is not None:
-            patch_instance.patch_active(get_args.active)
-        elif get_args.timeout is not None:
-            # timeout Expected <number>(ms|s|m)
-            patch_instance.patch_config_timeout(get_args.timeout)
-        elif get_args.retries is not None:
-            patch_instance.patch_retries(get_args.retries)
-        elif get_args.frequency is not None:
-            patch_instance.patch_frequency(get_args.frequency)
-        elif get_args.retry_interval is not None:
-            patch_instance.patch_retry_interval(get_args.retry_interval)
-        elif get_args.operation is not None:
-            patch_instance.patch_ping_operation(get_args.operation)
-        elif get_args.script is not None:
-            patch_instance.patch_script_from_file(get_args.script)
-        elif get_args.description is not None:
-            patch_instance.patch_description(get_args.description)
-        elif get_args.record_video is not None:
-            patch_instance.patch_record_video(get_args.record_video)
-        elif get_args.browser is not None:
-            patch_instance.patch_browser(get_args.browser)
-        elif get_args.label is not None:
-            patch_instance.patch_label(get_args.label)
-        elif get_args.location is not None:
-            patch_instance.patch_locations(get_args.location)
-        elif get_args.mark_synthetic_call:
-            patch_instance.patch_mark_synthetic_call(
-                get_args.mark_synthetic_call)
-        elif get_args.allow_insecure is not None:
-            patch_instance.patch_allow_insecure(get_args.allow_insecure)
-        elif get_args.expect_json is not None:
-            patch_instance.patch_expect_json(get_args.expect_json)
-        elif get_args.expect_not_empty is not None:
-            patch_instance.patch_expect_not_empty(get_args.expect_not_empty)
-        elif get_args.expect_exists is not None:
-            patch_instance.patch_expect_exists(get_args.expect_exists)
-        elif get_args.expect_match is not None:
-            patch_instance.patch_expect_match(get_args.expect_match)
-        elif get_args.expect_status is not None:
-            patch_instance.patch_expect_status(get_args.expect_status)
-        elif get_args.bundle is not None:
-            patch_instance.patch_bundle(get_args.id, get_args.bundle)
-        elif get_args.bundle_entry_file is not None:
-            patch_instance.patch_bundle_entry_file(get_args.bundle_entry_file, get_args.id)
-        elif get_args.url is not None:
-            patch_instance.patch_url(get_args.url)
-        elif get_args.follow_redirect is not None:
-            patch_instance.patch_follow_redirect(get_args.follow_redirect)
-        elif get_args.validation_string is not None:
-            patch_instance.patch_validation_string(get_args.validation_string)
-        elif get_args.custom_properties is not None:
-            split_string = get_args.custom_properties.split(',')
-            patch_instance.patch_custom_properties(get_args.id, split_string)
-        elif get_args.apps is not None:
-            patch_instance.patch_application_id(get_args.apps)
-        elif get_args.hostname is not None:
-            patch_instance.patch_host(get_args.id, get_args.hostname)
-        elif get_args.port is not None:
-            patch_instance.patch_port(get_args.id, get_args.port)
-        elif get_args.remaining_days_check is not None:
-            patch_instance.patch_remaining_days(get_args.id, get_args.remaining_days_check)
-        elif get_args.cname is not None:
-            patch_instance.patch_cname(get_args.cname)
-        elif get_args.lookup is not None:
-            patch_instance.patch_lookup(get_args.lookup)
-        elif get_args.lookup_server_name is not None:
-            patch_instance.patch_lookup_server_name(get_args.lookup_server_name)
-        elif get_args.query_time is not None:
-            query_time_json = json.loads(get_args.query_time)
-            patch_instance.patch_query_time(query_time_json)
-        elif get_args.query_type is not None:
-            patch_instance.patch_query_type(get_args.query_type)
-        elif get_args.recursive_lookups is not None:
-            patch_instance.patch_recursive_lookups(get_args.recursive_lookups)
-        elif get_args.server is not None:
-            patch_instance.patch_server(get_args.server)
-        elif get_args.server_retries is not None:
-            patch_instance.patch_server_retries(get_args.server_retries)
-        elif get_args.target_values is not None:
-            target_values_json = json.loads(get_args.target_values)
-            patch_instance.patch_target_values([target_values_json])
-        elif get_args.transport is not None:
-            patch_instance.patch_transport(get_args.transport)
-        elif get_args.target_host is not None:
-            patch_instance.patch_target_host(get_args.target_host)
-        elif get_args.packet_count is not None:
-            patch_instance.patch_packet_count(get_args.packet_count)
-        elif get_args.packet_size is not None:
-            patch_instance.patch_packet_size(get_args.packet_size)
-        elif get_args.packet_timeout is not None:
-            patch_instance.patch_packet_timeout(get_args.packet_timeout)
-        elif get_args.use_ipv6 is not None:
-            patch_instance.patch_use_ipv6(get_args.use_ipv6)
-        elif get_args.use_dns is not None:
-            patch_instance.patch_use_dns(get_args.use_dns)
-        elif get_args.validation_rules is not None:
-            validation_rules_json = json.loads(get_args.validation_rules)
-            patch_instance.patch_validation_rules(validation_rules_json)
-        if get_args.syn_type == SYN_CRED:
-            if get_args.applications is not None:
-                cred_instance.patch_applications(get_args.id, get_args.applications)
-            if get_args.websites is not None:
-                cred_instance.patch_websites(get_args.id, get_args.websites)
-            if get_args.mobile_apps is not None:
-                cred_instance.patch_mobile_apps(get_args.id, get_args.mobile_apps)
-            if get_args.value is not None:
-                cred_instance.patch_credential_value(get_args.id, get_args.value)
-    elif COMMAND_UPDATE == get_args.sub_command:
-        if get_args.syn_type == SYN_TEST:
-            invalid_options = ["name", "severity", "alert_channel", "test", "violation_count"]
-            syn_update_instance.invalid_update_options(invalid_options, update_args, syn_type=get_args.syn_type)
-            if get_args.enable is True or get_args.disable is True:
-                syn_update_instance.exit_synctl(ERROR_CODE, "option: --enable/--disable not supported by synthetic tests")
-            payload = syn_instance.retrieve_a_synthetic_test(get_args.id)
-            syn_update_instance.set_updated_payload(payload)
-            # accept a full json payload
-            if get_args.from_file is not None and get_args.from_file.endswith('.json'):
-                new_payload = syn_update_instance.update_using_file(get_args.from_file)
-                syn_update_instance.update_a_synthetic_test(get_args.id, new_payload)
-            else:
-                if get_args.label is not None:
-                    syn_update_instance.update_label(get_args.label)
-                if get_args.active is not None:
-                    syn_update_instance.update_active(get_args.active)
-                if get_args.timeout is not None:
-                    syn_update_instance.update_config_timeout(get_args.timeout)
-                if get_args.retries is not None:
-                    syn_update_instance.update_retries(get_args.retries)
-                if get_args.frequency is not None:
-                    syn_update_instance.update_frequency(get_args.frequency)
-                if get_args.retry_interval is not None:
-                    syn_update_instance.update_retry_interval(get_args.retry_interval)
-                if get_args.operation is not None:
-                    syn_update_instance.update_ping_operation(get_args.operation)
-                if get_args.script is not None:
-                    syn_update_instance.update_config_script_file(get_args.script)
-                if get_args.description is not None:
-                    syn_update_instance.update_description(get_args.description)
-                if get_args.record_video is not None:
-                    syn_update_instance.update_record_video(get_args.record_video)
-                if get_args.browser is not None:
-                    syn_update_instance.update_browser(get_args.browser)
-                if get_args.location is not None:
-                    syn_update_instance.update_locations(get_args.location)
-                if get_args.mark_synthetic_call:
-                    syn_update_instance.update_mark_synthetic_call(get_args.mark_synthetic_call)
-                if get_args.bundle is not None:
-                    syn_update_instance.update_bundle(get_args.bundle)
-                if get_args.bundle_entry_file is not None:
-                    syn_update_instance.update_bundle_entry_file(get_args.bundle_entry_file)
+            if get_args.type == 4:
                 if get_args.url is not None:
-                    syn_update_instance.update_url(get_args.url)
-                if get_args.follow_redirect is not None:
-                    syn_update_instance.update_follow_redirect(get_args.follow_redirect)
-                if get_args.apps is not None:
-                    print("Warning: --app-id/--application-id will be deprecated soon. Use --apps/--applications")
-                    print("Note: If any app ID starts with '-', use --apps=\"<id1>,<id2>\"\n")
-                    app_ids = [id.strip() for item in get_args.apps for id in item.split(',') if id.strip()]
-                    syn_update_instance.update_application_id(app_ids)
-                if get_args.websites is not None:
-                    syn_update_instance.update_websites(get_args.websites)
-                if get_args.mobile_apps is not None:
-                    syn_update_instance.update_mobile_app(get_args.mobile_apps)
-                if get_args.expect_status is not None:
-                    syn_update_instance.update_expect_status(get_args.expect_status)
-                if get_args.allow_insecure is not None:
-                    syn_update_instance.update_allow_insecure(get_args.allow_insecure)
-                if get_args.expect_json is not None:
-                    syn_update_instance.update_expect_json(get_args.expect_json)
-                if get_args.expect_not_empty is not None:
-                    syn_update_instance.update_expect_not_empty(get_args.expect_not_empty)
-                if get_args.expect_exists is not None:
-                    syn_update_instance.update_expect_exists(get_args.expect_exists)
-                if get_args.expect_match is not None:
-                    syn_update_instance.update_expect_match(get_args.expect_match)
-                if get_args.validation_string is not None:
-                    syn_update_instance.update_validation_string(get_args.validation_string)
-                if get_args.custom_properties is not None:
-                    split_string = get_args.custom_properties.split(',')
-                    syn_update_instance.update_custom_properties(split_string)
-                if get_args.body is not None:
-                    syn_update_instance.update_body(get_args.body)
-                if get_args.headers is not None:
-                    split_string = get_args.headers.split(',')
-                    syn_update_instance.update_headers(split_string)
-                # SSLCertificate test
+                    payload.set_ping_url(get_args.url)
+                else:
+                    print("URL is required")
+
+            # SSLCertificate
+            if get_args.type == 5:
                 if get_args.hostname is not None:
-                    syn_update_instance.update_host(get_args.hostname)
+                    payload.set_host(get_args.hostname)
                 if get_args.port is not None:
-                    syn_update_instance.update_port(get_args.port)
+                    payload.set_port(get_args.port)
                 if get_args.remaining_days_check is not None:
-                    syn_update_instance.update_remaining_days(get_args.remaining_days_check)
-                # DNS test
+                    payload.set_remaining_days(get_args.remaining_days_check)
+                payload.set_frequency(get_args.type, 1440)
+
+            # DNS
+            if get_args.type == 6:
                 if get_args.cname is not None:
-                    syn_update_instance.update_cname(get_args.cname)
+                    payload.set_cname(get_args.cname)
                 if get_args.lookup is not None:
-                    syn_update_instance.update_lookup(get_args.lookup)
+                    payload.set_lookup(get_args.lookup)
                 if get_args.lookup_server_name is not None:
-                    syn_update_instance.update_lookup_server_name(get_args.lookup_server_name)
+                    payload.set_lookup_server_name(get_args.lookup_server_name)
+                if get_args.port is not None:
+                    payload.set_port(get_args.port)
                 if get_args.query_time is not None:
                     query_time_json = json.loads(get_args.query_time)
-                    syn_update_instance.update_query_time(query_time_json)
+                    payload.set_query_time(query_time_json)
                 if get_args.query_type is not None:
-                    syn_update_instance.update_query_type(get_args.query_type)
+                    payload.set_query_type(get_args.query_type)
                 if get_args.recursive_lookups is not None:
-                    syn_update_instance.update_recursive_lookups(get_args.recursive_lookups)
+                    payload.set_recursive_lookups(get_args.recursive_lookups)
                 if get_args.server is not None:
-                    syn_update_instance.update_server(get_args.server)
+                    payload.set_server(get_args.server)
                 if get_args.server_retries is not None:
-                    syn_update_instance.update_server_retries(get_args.server_retries)
+                    payload.set_server_retries(get_args.server_retries)
                 if get_args.target_values is not None:
                     target_values_json = json.loads(get_args.target_values)
-                    syn_update_instance.update_target_values([target_values_json])
+                    payload.set_target_values([target_values_json])
                 if get_args.transport is not None:
-                    syn_update_instance.update_transport(get_args.transport)
-                # ICMP test
+                    payload.set_transport(get_args.transport)
+            # ICMP
+            if get_args.type == 7:
                 if get_args.target_host is not None:
-                    syn_update_instance.update_target_host(get_args.target_host)
+                    payload.set_target_host(get_args.target_host)
                 if get_args.packet_count is not None:
-                    syn_update_instance.update_packet_count(get_args.packet_count)
+                    payload.set_packet_count(get_args.packet_count)
                 if get_args.packet_size is not None:
-                    syn_update_instance.update_packet_size(get_args.packet_size)
+                    payload.set_packet_size(get_args.packet_size)
                 if get_args.packet_timeout is not None:
-                    syn_update_instance.update_packet_timeout(get_args.packet_timeout)
+                    payload.set_packet_timeout(get_args.packet_timeout)
                 if get_args.use_ipv6 is not None:
-                    syn_update_instance.update_use_ipv6(get_args.use_ipv6)
+                    payload.set_use_ipv6(get_args.use_ipv6)
                 if get_args.use_dns is not None:
-                    syn_update_instance.update_use_dns(get_args.use_dns)
+                    payload.set_use_dns(get_args.use_dns)
                 if get_args.validation_rules is not None:
                     validation_rules_json = json.loads(get_args.validation_rules)
-                    syn_update_instance.update_validation_rules(validation_rules_json)
+                    payload.set_validation_rules(validation_rules_json)
+
+
+            # global operation, add label, location, description, frequency, etc.
+            if get_args.label is not None:
+                payload.set_label(get_args.label)
+            if get_args.location is not None:
+                payload.set_locations(get_args.location)
+            if get_args.description is not None:
+                payload.set_description(get_args.description)
+            if get_args.frequency is not None:
+                payload.set_frequency(get_args.type, get_args.frequency)
+            if get_args.apps is not None:
+                print("Warning: --app-id/--application-id will be deprecated soon. Use --apps/--applications")
+                payload.set_application_id(get_args.apps)
+            if get_args.websites is not None:
+                payload.set_websites(get_args.websites)
+            if get_args.mobile_apps is not None:
+                payload.set_mobile_apps(get_args.mobile_apps)
+            if get_args.timeout is not None:
+                payload.set_timeout(get_args.timeout)
+
+            if get_args.custom_properties is not None:
+                try:
+                    custom_properties = json.loads(get_args.custom_properties)
+                    if isinstance(custom_properties, dict):
+                        print("Warning: The '{\"key1\":\"value1\"}' format will be deprecated soon. Please use 'key1=value1' instead.")
+                        payload.set_custom_properties(custom_properties)
+                    else:
+                        raise json.JSONDecodeError("Not a dict", get_args.custom_properties)
+                except json.JSONDecodeError:
+                    if "=" in get_args.custom_properties:
+                        try:
+                            dict_custom_properties = dict(
+                                pair.strip().split("=", 1) for pair in get_args.custom_properties.split(",")
+                            )
+                            payload.set_custom_properties(dict_custom_properties)
+                        except ValueError:
+                            print(payload.exit_synctl('Ensure key-value pairs are formatted as "key=value"'))
+                    else:
+                        print(payload.exit_synctl('Invalid format: Use JSON or "key=value,key2=value2"'))
+
+            # configuration
+            # retries [0, 2]
+            if get_args.retries is not None:
+                payload.set_retries(get_args.retries)
+            # retryInterval [0, 10]
+            if get_args.retry_interval is not None:
+                payload.set_retry_interval(get_args.retry_interval)
+
+            syn_payload = payload.get_json()
+            syn_instance.set_synthetic_payload(payload=syn_payload)
+
+            syn_instance.create_a_synthetic_test()
+
+        else:
+            syn_instance.exit_synctl(ERROR_CODE, '-t/--type is required to create synthetic test')
 
-                updated_payload = syn_update_instance.get_updated_test_config()
-                syn_update_instance.update_a_synthetic_test(get_args.id, updated_payload)
-        if get_args.syn_type == SYN_ALERT:
-            get_args.id = get_args.id.lstrip() if get_args.id.startswith(' ') else get_args.id
-            invalid_options = ["label", "active", "frequency", "timeout", "retry_interval", "retries", "operation", "script_file",
-                               "location", "record_video", "mark_synthetic_call", "entry_file", "url", "follow_redirect",
-                               "expect_status", "validation_string", "bundle", "custom_properties"]
-            syn_update_instance.invalid_update_options(invalid_options, update_args, syn_type=get_args.syn_type)
-            payload = alert_instance.retrieve_a_smart_alert(get_args.id)
-            update_alert.set_updated_payload(payload)
-            if get_args.from_file is not None and get_args.from_file.endswith('.json'):
-                new_payload = update_alert.update_using_file(get_args.from_file)
-                update_alert.update_a_smart_alert(get_args.id, new_payload)
-            elif get_args.enable is True or get_args.disable is True:
-                operation = "enable" if get_args.enable else "disable"
-                invalid_options = ["name", "severity", "alert_channel", "test", "violation_count"]
-                syn_update_instance.invalid_update_options(invalid_options, update_args, toggle=operation)
-                update_alert.toggle_smart_alert(get_args.id, operation)
-            else:
-                if get_args.name is not None:
-                    update_alert.update_alert_name(get_args.name)
-                if get_args.description is not None:
-                    update_alert.update_description(get_args.description)
-                if get_args.severity is not None:
-                    update_alert.update_alert_severity(get_args.severity)
-                if get_args.alert_channel is not None:
-                    update_alert.update_alert_channel(get_args.alert_channel)
-                if get_args.test is not None:
-                    update_alert.update_tests(get_args.test)
-                if get_args.violation_count is not None:
-                    update_alert.update_violation_count(get_args.violation_count)
-                if get_args.tag_filter_expression is not None:
-                    tag_filter_expression = json.loads(get_args.tag_filter_expression)
-                    update_alert.update_tag_filter_expression(tag_filter_expression)
-                if get_args.custom_payloads is not None:
-                    custom_payloads_json = json.loads(get_args.custom_payloads)
-                    update_alert.update_custom_payloads(custom_payloads_json)
-                if get_args.grace_period is not None:
-                    update_alert.update_grace_period(get_args.grace_period)
-                updated_alert_config = update_alert.get_updated_alert_config()
-                update_alert.update_a_smart_alert(get_args.id, updated_alert_config)
-        if get_args.syn_type == SYN_CRED:
-            cred_payload = CredentialConfiguration()
-            if get_args.id is not None:
-                cred_payload.set_credential_name(get_args.id)
-                if get_args.value is not None:
-                    cred_payload.set_credential_value(get_args.value)
-                if get_args.apps is not None:
-                    cred_payload.set_credential_applications(get_args.apps)
-                if get_args.websites is not None:
-                    cred_payload.set_credential_websites(get_args.websites)
-                if get_args.mobile_apps is not None:
-                    cred_payload.set_credential_mobile_apps(get_args.mobile_apps)
-
-            cred_instance.set_cred_payload(payload=cred_payload.get_json())
-            cred_instance.update_a_credential(get_args.id)
-    elif COMMAND_DELETE == get_args.sub_command:
-        if get_args.delete_type == SYN_TEST:
-            if get_args.id is not None and len(get_args.id) > 0:
-                syn_instance.delete_multiple_synthetic_tests(
-                    get_args.id)
-            elif get_args.match_regex is not None:
-                syn_instance.delete_tests_label_match_regex(
-                    label_regex=get_args.match_regex)
-            elif get_args.match_location is not None:
-                syn_instance.delete_tests_match_location(
-                    match_location=get_args.match_location)
-            elif get_args.no_locations is True:
-                syn_instance.delete_tests_without_location()
-            else:
-                print('no synthetic test to delete')
-
-        if get_args.delete_type in (SYN_LOCATION, SYN_LO):
-            if get_args.id is not None:
-                pop_instance.delete_synthetic_locations(get_args.id)
-        if get_args.delete_type == SYN_CRED:
-            if get_args.id is not None:
-                cred_instance.delete_credentials(get_args.id)
-        if get_args.delete_type == SYN_ALERT:
-            if get_args.id is not None and len(get_args.id) > 0:
-                get_args.id = [a.lstrip() if a.startswith(' ') else a for a in get_args.id]
-                alert_instance.delete_multiple_smart_alerts(get_args.id)
-            else:
-                print('no smart alert to delete')
 
+def command_patch(get_args, clients):
+    """synctl patch"""
+    if get_args.syn_type == SYN_CRED:
+        cred_instance = clients.get(SyntheticCredential)
+        if get_args.from_file is not None:
+            cred_instance.set_concurrency(get_args.concurrency)
+            cred_instance.patch_credential_values(cred_instance.load_credential_values(get_args.from_file))
+            return
+        if get_args.id is None:
+            cred_instance.exit_synctl(ERROR_CODE, "credential name is required, or use --from-file")
+        if get_args.apps is not None:
+            cred_instance.patch_applications(get_args.id, get_args.apps)
+        if get_args.websites is not None:
+            cred_instance.patch_websites(get_args.id, get_args.websites)
+        if get_args.mobile_apps is not None:
+            cred_instance.patch_mobile_apps(get_args.id, get_args.mobile_apps)
+        if get_args.value is not None:
+            cred_instance.patch_credential_value(get_args.id, get_args.value)
+        return
+
+    patch_instance = clients.get(PatchSyntheticTest)
+    select_tests = get_args.match_regex is not None or get_args.type is not None or get_args.match_location is not None
+    selected_tests = None
+    if get_args.syn_type == SYN_TEST and select_tests:
+        if get_args.id is not None:
+            patch_instance.exit_synctl(ERROR_CODE, "--match-regex/--type/--match-location cannot be used with a test id")
+        if get_args.bundle is not None or get_args.bundle_entry_file is not None or get_args.custom_properties is not None:
+            patch_instance.exit_synctl(ERROR_CODE, "--bundle/--bundle-entry-file/--custom-properties can only patch one test")
+        patch_instance.set_concurrency(get_args.concurrency)
+        syn_type = synthetic_type[get_args.type] if get_args.type is not None else None
+        selected_tests = patch_instance.select_tests(get_args.match_regex, syn_type, get_args.match_location)
+    elif get_args.id is not None:
+        patch_instance.set_test_id(get_args.id)
+    else:
+        patch_instance.exit_synctl(ERROR_CODE, "id is required, or select tests with --match-regex/--type/--match-location")
+    # every option is merged into one PATCH request
+    if get_args.active is not None:
+        patch_instance.patch_active(get_args.active)
+    if get_args.timeout is not None:
+        # timeout Expected <number>(ms|s|m)
+        patch_instance.patch_config_timeout(get_args.timeout)
+    if get_args.retries is not None:
+        patch_instance.patch_retries(get_args.retries)
+    if get_args.frequency is not None:
+        patch_instance.patch_frequency(get_args.frequency)
+    if get_args.retry_interval is not None:
+        patch_instance.patch_retry_interval(get_args.retry_interval)
+    if get_args.operation is not None:
+        patch_instance.patch_ping_operation(get_args.operation)
+    if get_args.script is not None:
+        patch_instance.patch_script_from_file(get_args.script)
+    if get_args.description is not None:
+        patch_instance.patch_description(get_args.description)
+    if get_args.record_video is not None:
+        patch_instance.patch_record_video(get_args.record_video)
+    if get_args.browser is not None:
+        patch_instance.patch_browser(get_args.browser)
+    if get_args.label is not None:
+        patch_instance.patch_label(get_args.label)
+    if get_args.location is not None:
+        patch_instance.patch_locations(get_args.location)
+    if get_args.mark_synthetic_call:
+        patch_instance.patch_mark_synthetic_call(
+            get_args.mark_synthetic_call)
+    if get_args.allow_insecure is not None:
+        patch_instance.patch_allow_insecure(get_args.allow_insecure)
+    if get_args.expect_json is not None:
+        patch_instance.patch_expect_json(get_args.expect_json)
+    if get_args.expect_not_empty is not None:
+        patch_instance.patch_expect_not_empty(get_args.expect_not_empty)
+    if get_args.expect_exists is not None:
+        patch_instance.patch_expect_exists(get_args.expect_exists)
+    if get_args.expect_match is not None:
+        patch_instance.patch_expect_match(get_args.expect_match)
+    if get_args.expect_status is not None:
+        patch_instance.patch_expect_status(get_args.expect_status)
+    if get_args.bundle is not None:
+        patch_instance.patch_bundle(get_args.id, get_args.bundle)
+    if get_args.bundle_entry_file is not None:
+        patch_instance.patch_bundle_entry_file(get_args.bundle_entry_file, get_args.id)
+    if get_args.url is not None:
+        patch_instance.patch_url(get_args.url)
+    if get_args.follow_redirect is not None:
+        patch_instance.patch_follow_redirect(get_args.follow_redirect)
+    if get_args.validation_string is not None:
+        patch_instance.patch_validation_string(get_args.validation_string)
+    if get_args.custom_properties is not None:
+        split_string = get_args.custom_properties.split(',')
+        patch_instance.patch_custom_properties(get_args.id, split_string)
+    if get_args.apps is not None:
+        patch_instance.patch_application_id(get_args.apps)
+    if get_args.hostname is not None:
+        patch_instance.patch_host(get_args.id, get_args.hostname)
+    if get_args.port is not None:
+        patch_instance.patch_port(get_args.id, get_args.port)
+    if get_args.remaining_days_check is not None:
+        patch_instance.patch_remaining_days(get_args.id, get_args.remaining_days_check)
+    if get_args.cname is not None:
+        patch_instance.patch_cname(get_args.cname)
+    if get_args.lookup is not None:
+        patch_instance.patch_lookup(get_args.lookup)
+    if get_args.lookup_server_name is not None:
+        patch_instance.patch_lookup_server_name(get_args.lookup_server_name)
+    if get_args.query_time is not None:
+        query_time_json = json.loads(get_args.query_time)
+        patch_instance.patch_query_time(query_time_json)
+    if get_args.query_type is not None:
+        patch_instance.patch_query_type(get_args.query_type)
+    if get_args.recursive_lookups is not None:
+        patch_instance.patch_recursive_lookups(get_args.recursive_lookups)
+    if get_args.server is not None:
+        patch_instance.patch_server(get_args.server)
+    if get_args.server_retries is not None:
+        patch_instance.patch_server_retries(get_args.server_retries)
+    if get_args.target_values is not None:
+        target_values_json = json.loads(get_args.target_values)
+        patch_instance.patch_target_values([target_values_json])
+    if get_args.transport is not None:
+        patch_instance.patch_transport(get_args.transport)
+    if get_args.target_host is not None:
+        patch_instance.patch_target_host(get_args.target_host)
+    if get_args.packet_count is not None:
+        patch_instance.patch_packet_count(get_args.packet_count)
+    if get_args.packet_size is not None:
+        patch_instance.patch_packet_size(get_args.packet_size)
+    if get_args.packet_timeout is not None:
+        patch_instance.patch_packet_timeout(get_args.packet_timeout)
+    if get_args.use_ipv6 is not None:
+        patch_instance.patch_use_ipv6(get_args.use_ipv6)
+    if get_args.use_dns is not None:
+        patch_instance.patch_use_dns(get_args.use_dns)
+    if get_args.validation_rules is not None:
+        validation_rules_json = json.loads(get_args.validation_rules)
+        patch_instance.patch_validation_rules(validation_rules_json)
+    if selected_tests is not None:
+        patch_instance.patch_selected_tests(selected_tests, dry_run=get_args.dry_run, assume_yes=get_args.yes)
     else:
+        patch_instance.apply_patch()
+
+
+def command_update(get_args, clients):
+    """synctl update"""
+    syn_instance = clients.get(SyntheticTest)
+    syn_update_instance = clients.get(UpdateSyntheticTest)
+    update_alert = clients.get(UpdateSmartAlert)
+    alert_instance = clients.get(SmartAlert)
+    cred_instance = clients.get(SyntheticCredential)
+    update_args = get_args.__dict__.items()
+
+    if get_args.id is None and get_args.syn_type != SYN_ALERT:
+        syn_update_instance.exit_synctl(ERROR_CODE, f"{get_args.syn_type} id is required")
+
+    if get_args.syn_type == SYN_TEST:
+        invalid_options = ["name", "severity", "alert_channel", "test", "violation_count"]
+        syn_update_instance.invalid_update_options(invalid_options, update_args, syn_type=get_args.syn_type)
+        if get_args.enable is True or get_args.disable is True:
+            syn_update_instance.exit_synctl(ERROR_CODE, "option: --enable/--disable not supported by synthetic tests")
+        payload = syn_instance.retrieve_a_synthetic_test(get_args.id)
+        syn_update_instance.set_updated_payload(payload)
+        # accept a full json payload
+        if get_args.from_file is not None and get_args.from_file.endswith('.json'):
+            new_payload = syn_update_instance.update_using_file(get_args.from_file)
+            syn_update_instance.apply_update(get_args.id, new_payload)
+        else:
+            if get_args.label is not None:
+                syn_update_instance.update_label(get_args.label)
+            if get_args.active is not None:
+                syn_update_instance.update_active(get_args.active)
+            if get_args.timeout is not None:
+                syn_update_instance.update_config_timeout(get_args.timeout)
+            if get_args.retries is not None:
+                syn_update_instance.update_retries(get_args.retries)
+            if get_args.frequency is not None:
+                syn_update_instance.update_frequency(get_args.frequency)
+            if get_args.retry_interval is not None:
+                syn_update_instance.update_retry_interval(get_args.retry_interval)
+            if get_args.operation is not None:
+                syn_update_instance.update_ping_operation(get_args.operation)
+            if get_args.script is not None:
+                syn_update_instance.update_config_script_file(get_args.script)
+            if get_args.description is not None:
+                syn_update_instance.update_description(get_args.description)
+            if get_args.record_video is not None:
+                syn_update_instance.update_record_video(get_args.record_video)
+            if get_args.browser is not None:
+                syn_update_instance.update_browser(get_args.browser)
+            if get_args.location is not None:
+                syn_update_instance.update_locations(get_args.location)
+            if get_args.mark_synthetic_call:
+                syn_update_instance.update_mark_synthetic_call(get_args.mark_synthetic_call)
+            if get_args.bundle is not None:
+                syn_update_instance.update_bundle(get_args.bundle)
+            if get_args.bundle_entry_file is not None:
+                syn_update_instance.update_bundle_entry_file(get_args.bundle_entry_file)
+            if get_args.url is not None:
+                syn_update_instance.update_url(get_args.url)
+            if get_args.follow_redirect is not None:
+                syn_update_instance.update_follow_redirect(get_args.follow_redirect)
+            if get_args.apps is not None:
+                print("Warning: --app-id/--application-id will be deprecated soon. Use --apps/--applications")
+                print("Note: If any app ID starts with '-', use --apps=\"<id1>,<id2>\"\n")
+                app_ids = [id.strip() for item in get_args.apps for id in item.split(',') if id.strip()]
+                syn_update_instance.update_application_id(app_ids)
+            if get_args.websites is not None:
+                syn_update_instance.update_websites(get_args.websites)
+            if get_args.mobile_apps is not None:
+                syn_update_instance.update_mobile_app(get_args.mobile_apps)
+            if get_args.expect_status is not None:
+                syn_update_instance.update_expect_status(get_args.expect_status)
+            if get_args.allow_insecure is not None:
+                syn_update_instance.update_allow_insecure(get_args.allow_insecure)
+            if get_args.expect_json is not None:
+                syn_update_instance.update_expect_json(get_args.expect_json)
+            if get_args.expect_not_empty is not None:
+                syn_update_instance.update_expect_not_empty(get_args.expect_not_empty)
+            if get_args.expect_exists is not None:
+                syn_update_instance.update_expect_exists(get_args.expect_exists)
+            if get_args.expect_match is not None:
+                syn_update_instance.update_expect_match(get_args.expect_match)
+            if get_args.validation_string is not None:
+                syn_update_instance.update_validation_string(get_args.validation_string)
+            if get_args.custom_properties is not None:
+                split_string = get_args.custom_properties.split(',')
+                syn_update_instance.update_custom_properties(split_string)
+            if get_args.body is not None:
+                syn_update_instance.update_body(get_args.body)
+            if get_args.headers is not None:
+                split_string = get_args.headers.split(',')
+                syn_update_instance.update_headers(split_string)
+            # SSLCertificate test
+            if get_args.hostname is not None:
+                syn_update_instance.update_host(get_args.hostname)
+            if get_args.port is not None:
+                syn_update_instance.update_port(get_args.port)
+            if get_args.remaining_days_check is not None:
+                syn_update_instance.update_remaining_days(get_args.remaining_days_check)
+            # DNS test
+            if get_args.cname is not None:
+                syn_update_instance.update_cname(get_args.cname)
+            if get_args.lookup is not None:
+                syn_update_instance.update_lookup(get_args.lookup)
+            if get_args.lookup_server_name is not None:
+                syn_update_instance.update_lookup_server_name(get_args.lookup_server_name)
+            if get_args.query_time is not None:
+                query_time_json = json.loads(get_args.query_time)
+                syn_update_instance.update_query_time(query_time_json)
+            if get_args.query_type is not None:
+                syn_update_instance.update_query_type(get_args.query_type)
+            if get_args.recursive_lookups is not None:
+                syn_update_instance.update_recursive_lookups(get_args.recursive_lookups)
+            if get_args.server is not None:
+                syn_update_instance.update_server(get_args.server)
+            if get_args.server_retries is not None:
+                syn_update_instance.update_server_retries(get_args.server_retries)
+            if get_args.target_values is not None:
+                target_values_json = json.loads(get_args.target_values)
+                syn_update_instance.update_target_values([target_values_json])
+            if get_args.transport is not None:
+                syn_update_instance.update_transport(get_args.transport)
+            # ICMP test
+            if get_args.target_host is not None:
+                syn_update_instance.update_target_host(get_args.target_host)
+            if get_args.packet_count is not None:
+                syn_update_instance.update_packet_count(get_args.packet_count)
+            if get_args.packet_size is not None:
+                syn_update_instance.update_packet_size(get_args.packet_size)
+            if get_args.packet_timeout is not None:
+                syn_update_instance.update_packet_timeout(get_args.packet_timeout)
+            if get_args.use_ipv6 is not None:
+                syn_update_instance.update_use_ipv6(get_args.use_ipv6)
+            if get_args.use_dns is not None:
+                syn_update_instance.update_use_dns(get_args.use_dns)
+            if get_args.validation_rules is not None:
+                validation_rules_json = json.loads(get_args.validation_rules)
+                syn_update_instance.update_validation_rules(validation_rules_json)
+
+            updated_payload = syn_update_instance.get_updated_test_config()
+            syn_update_instance.apply_update(get_args.id, updated_payload)
+    if get_args.syn_type == SYN_ALERT and get_args.id is None:
+        # select alerts by name or test, --test selects alerts here instead of setting tests
+        update_alert.set_concurrency(get_args.concurrency)
+        if get_args.restore is not None:
+            update_alert.restore_alerts(get_args.restore)
+        elif (get_args.enable or get_args.disable) and (get_args.match_regex is not None or get_args.test is not None):
+            selected_alerts = update_alert.select_alerts(name_regex=get_args.match_regex, test_ids=get_args.test)
+            update_alert.toggle_selected_alerts(selected_alerts, "enable" if get_args.enable else "disable",
+                                                get_args.journal, dry_run=get_args.dry_run, assume_yes=get_args.yes)
+        else:
+            update_alert.exit_synctl(ERROR_CODE, "alert id is required, or use --match-regex/--test with --enable/--disable")
+    elif get_args.syn_type == SYN_ALERT:
+        get_args.id = get_args.id.lstrip() if get_args.id.startswith(' ') else get_args.id
+        invalid_options = ["label", "active", "frequency", "timeout", "retry_interval", "retries", "operation", "script_file",
+                           "location", "record_video", "mark_synthetic_call", "entry_file", "url", "follow_redirect",
+                           "expect_status", "validation_string", "bundle", "custom_properties"]
+        syn_update_instance.invalid_update_options(invalid_options, update_args, syn_type=get_args.syn_type)
+        payload = alert_instance.retrieve_a_smart_alert(get_args.id)
+        update_alert.set_updated_payload(payload)
+        if get_args.from_file is not None and get_args.from_file.endswith('.json'):
+            new_payload = update_alert.update_using_file(get_args.from_file)
+            update_alert.update_a_smart_alert(get_args.id, new_payload)
+        elif get_args.enable is True or get_args.disable is True:
+            operation = "enable" if get_args.enable else "disable"
+            invalid_options = ["name", "severity", "alert_channel", "test", "violation_count"]
+            syn_update_instance.invalid_update_options(invalid_options, update_args, toggle=operation)
+            update_alert.toggle_smart_alert(get_args.id, operation)
+        else:
+            if get_args.name is not None:
+                update_alert.update_alert_name(get_args.name)
+            if get_args.description is not None:
+                update_alert.update_description(get_args.description)
+            if get_args.severity is not None:
+                update_alert.update_alert_severity(get_args.severity)
+            if get_args.alert_channel is not None:
+                update_alert.update_alert_channel(get_args.alert_channel)
+            if get_args.test is not None:
+                update_alert.update_tests(get_args.test)
+            if get_args.violation_count is not None:
+                update_alert.update_violation_count(get_args.violation_count)
+            if get_args.tag_filter_expression is not None:
+                tag_filter_expression = json.loads(get_args.tag_filter_expression)
+                update_alert.update_tag_filter_expression(tag_filter_expression)
+            if get_args.custom_payloads is not None:
+                custom_payloads_json = json.loads(get_args.custom_payloads)
+                update_alert.update_custom_payloads(custom_payloads_json)
+            if get_args.grace_period is not None:
+                update_alert.update_grace_period(get_args.grace_period)
+            updated_alert_config = update_alert.get_updated_alert_config()
+            update_alert.update_a_smart_alert(get_args.id, updated_alert_config)
+    if get_args.syn_type == SYN_CRED:
+        cred_payload = CredentialConfiguration()
+        if get_args.id is not None:
+            cred_payload.set_credential_name(get_args.id)
+            if get_args.value is not None:
+                cred_payload.set_credential_value(get_args.value)
+            if get_args.apps is not None:
+                cred_payload.set_credential_applications(get_args.apps)
+            if get_args.websites is not None:
+                cred_payload.set_credential_websites(get_args.websites)
+            if get_args.mobile_apps is not None:
+                cred_payload.set_credential_mobile_apps(get_args.mobile_apps)
+
+        cred_instance.set_cred_payload(payload=cred_payload.get_json())
+        cred_instance.update_a_credential(get_args.id)
+
+
+def command_delete(get_args, clients):
+    """synctl delete"""
+    if get_args.delete_type == SYN_TEST:
+        syn_instance = clients.get(SyntheticTest)
+        syn_instance.set_concurrency(get_args.concurrency)
+        if get_args.id is not None and len(get_args.id) > 0:
+            syn_instance.delete_multiple_synthetic_tests(
+                get_args.id)
+        elif get_args.match_regex is not None:
+            syn_instance.delete_tests_label_match_regex(
+                label_regex=get_args.match_regex)
+        elif get_args.match_location is not None:
+            syn_instance.delete_tests_match_location(
+                match_location=get_args.match_location)
+        elif get_args.no_locations is True:
+            syn_instance.delete_tests_without_location()
+        else:
+            print('no synthetic test to delete')
+
+    if get_args.delete_type in (SYN_LOCATION, SYN_LO):
+        if get_args.id is not None:
+            pop_instance = clients.get(SyntheticLocation)
+            pop_instance.set_concurrency(get_args.concurrency)
+            pop_instance.delete_synthetic_locations(get_args.id)
+    if get_args.delete_type == SYN_CRED:
+        if get_args.id is not None:
+            cred_instance = clients.get(SyntheticCredential)
+            cred_instance.set_concurrency(get_args.concurrency)
+            cred_instance.delete_credentials(get_args.id)
+    if get_args.delete_type == SYN_ALERT:
+        alert_instance = clients.get(SmartAlert)
+        if get_args.id is not None and len(get_args.id) > 0:
+            get_args.id = [a.lstrip() if a.startswith(' ') else a for a in get_args.id]
+            alert_instance.delete_multiple_smart_alerts(get_args.id)
+        else:
+            print('no smart alert to delete')
+
+
+def command_plan(get_args, clients):
+    """synctl plan"""
+    plan_instance = clients.get(SyntheticTestPlan)
+
+    plan_instance.make_plan(get_args.dir, prune=get_args.prune)
+    plan_instance.print_plan()
+
+
+def command_apply(get_args, clients):
+    """synctl apply"""
+    plan_instance = clients.get(SyntheticTestPlan)
+
+    plan_instance.set_concurrency(get_args.concurrency)
+    plan_instance.make_plan(get_args.dir, prune=get_args.prune)
+    plan_instance.apply_plan(assume_yes=get_args.yes)
+
+
+def command_export(get_args, clients):
+    """synctl export"""
+    backup_instance = clients.get(TenantBackup)
+
+    backup_instance.export_tenant(get_args.output)
+
+
+def command_import(get_args, clients):
+    """synctl import"""
+    backup_instance = clients.get(TenantBackup)
+
+    backup_instance.set_concurrency(get_args.concurrency)
+    backup_instance.import_tenant(get_args.input, get_args.journal)
+
+
+# command name => handler, main() only builds the options and clients of the command being run
+COMMAND_HANDLERS = {
+    COMMAND_CONFIG: command_config,
+    COMMAND_RUN: command_run,
+    COMMAND_GET: command_get,
+    COMMAND_CREATE: command_create,
+    COMMAND_PATCH: command_patch,
+    COMMAND_UPDATE: command_update,
+    COMMAND_DELETE: command_delete,
+    COMMAND_PLAN: command_plan,
+    COMMAND_APPLY: command_apply,
+    COMMAND_EXPORT: command_export,
+    COMMAND_IMPORT: command_import,
+}
+
+
+def get_command_name(args):
+    """the command is the first argument which is not an option, e.g. `get` of `synctl get test`"""
+    for arg in args[1:]:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def main():
+    """main function"""
+    signal.signal(signal.SIGINT, ctrl_exit_handler)
+    identify_hyphen()
+
+    sys_args = sys.argv
+    para_instanace = ParseParameter()
+    para_instanace.set_command_options(get_command_name(sys_args))
+    get_args = para_instanace.get_parser().parse_args()
+
+    validate_args(sys_args)
+
+    if len(sys_args) <= 1:
+        general_helper()
+        sys.exit(0)
+
+    # show synctl version
+    if '-v' in sys_args or '--version' in sys_args:
+        show_version()
+        sys.exit(NORMAL_CODE)
+
+    command_handler = COMMAND_HANDLERS.get(get_args.sub_command)
+    if command_handler is None:
         print('unknown command:', get_args.sub_command)
+        sys.exit(ERROR_CODE)
+
+    clients = None
+    if COMMAND_CONFIG != get_args.sub_command:
+        # both host and token are required when using in command line
+        if get_args.host is not None and get_args.token is not None:
+            auth = {"host": get_args.host.rstrip('/'), "token": get_args.token}
+        else:
+            auth = Authentication().get_auth(get_args.use_env)
+        clients = SyntheticClients(auth, insecure=get_args.verify_tls)
+
+        transport = clients.get_transport()
+        transport.set_rate_limit(get_args.rate_limit)
+        if auth["host"] != "" and auth["token"] != "":
+            # other commands decide what to create, update or delete from listings,
+            # only get uses a cached listing without revalidating it with the server
+            ttl = CACHE_TTL if COMMAND_GET == get_args.sub_command else 0
+            transport.set_cache(ResponseCache(auth["host"], auth["token"], ttl=ttl),
+                                use_cache=not get_args.no_cache)
+        atexit.register(transport.print_throttle_summary)
+
+    command_handler(get_args, clients)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""timing comparisons of synctl internals, not part of the unit tests
+
+run it from the tests directory: python benchmark.py
+"""
+import contextlib
+import io
+import time
+import timeit
+
+from synctl.cli import Base, FetchGraph, ParseParameter, ResourceIndex, TableWriter
+
+
+def bench_startup():
+    """build the parser of one command against the parsers of all commands"""
+    all_time = min(timeit.repeat(lambda: ParseParameter().set_options(), number=20, repeat=5))
+    get_time = min(timeit.repeat(lambda: ParseParameter().set_command_options('get'), number=20, repeat=5))
+    print(f"parser, all commands: {all_time / 20 * 1000:.3f}ms, get only: {get_time / 20 * 1000:.3f}ms")
+
+
+def bench_fetch_graph():
+    """two independent 200ms fetches and a join, one by one against a FetchGraph"""
+    def slow_fetch():
+        time.sleep(0.2)
+        return 1
+
+    def one_by_one():
+        return slow_fetch() + slow_fetch()
+
+    def graph():
+        fetched = (FetchGraph().add("tests", slow_fetch).add("summary", slow_fetch)
+                   .add("joined", lambda tests, summary: tests + summary, depends_on=("tests", "summary")).run())
+        return fetched["joined"]
+
+    serial_time = min(timeit.repeat(one_by_one, number=1, repeat=3))
+    graph_time = min(timeit.repeat(graph, number=1, repeat=3))
+    print(f"fetches, one by one: {serial_time * 1000:.1f}ms, fetch graph: {graph_time * 1000:.1f}ms")
+
+
+def bench_resource_index():
+    """summary of 2k locations, a scan of the summary list per location against a ResourceIndex"""
+    locations = [{"id": f"l{i}", "label": f"loc-{i}"} for i in range(2000)]
+    summaries = [{"id": f"l{i}", "linkedTests": i} for i in range(2000)]
+
+    def scan():
+        for location in locations:
+            next((x for x in summaries if x["id"] == location["id"]), None)
+
+    def index():
+        resource_index = ResourceIndex(location_summaries=summaries)
+        for location in locations:
+            resource_index.summary_of_location(location["id"])
+
+    scan_time = min(timeit.repeat(scan, number=1, repeat=3))
+    index_time = min(timeit.repeat(index, number=1, repeat=3))
+    print(f"join locations and summaries, scan: {scan_time * 1000:.1f}ms, index: {index_time * 1000:.1f}ms")
+
+
+def bench_table_writer():
+    """50k result rows, print with fill_space per cell against a TableWriter"""
+    base = Base()
+    rows = [(f"r{i:05d}", "2024-01-01, 00:00:00", f"location-{i % 7}", "Successful", f"{i}ms", "0.01 MiB")
+            for i in range(50000)]
+    widths = (38, 30, 30, 15, 18, 8)
+
+    def print_rows():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for row in rows:
+                print(*[base.fill_space(x, w) for x, w in zip(row, widths)])
+
+    def write_rows():
+        table = TableWriter([(str(i), w) for i, w in enumerate(widths)], stream=io.StringIO(), sample_size=0)
+        table.write_rows(rows)
+        table.close()
+
+    print_time = min(timeit.repeat(print_rows, number=1, repeat=3))
+    write_time = min(timeit.repeat(write_rows, number=1, repeat=3))
+    print(f"50k table rows, print: {print_time * 1000:.1f}ms, TableWriter: {write_time * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    bench_startup()
+    bench_fetch_graph()
+    bench_resource_index()
+    bench_table_writer()
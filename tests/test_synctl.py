@@ -1,10 +1,23 @@
 #!/usr/bin/env python3
 from synctl.cli import ParseParameter, SyntheticConfiguration, SyntheticTest
-from synctl.cli import synthetic_type
+from synctl.cli import SmartAlert, SyntheticTransport, TokenBucket, ResponseCache
+from synctl.cli import SyntheticTestSummary, SyntheticClients, get_command_name
+from synctl.cli import PatchSyntheticTest, SyntheticTestPlan, TenantBackup, deep_merge, payload_delta
+from synctl.cli import UpdateSmartAlert, SyntheticCredential, FetchGraph, ResourceIndex, synthetic_type
+from synctl.cli import RecordWriter, TableWriter, Base, BulkReport, command_get, command_delete
 from pathlib import Path
 
 import unittest
 import json
+import tempfile
+import threading
+import time
+from unittest import mock
+import base64
+import contextlib
+import io
+import os
+import requests
 
 class TestStringMethods(unittest.TestCase):
 
@@ -310,5 +323,715 @@ class TestStringMethods(unittest.TestCase):
         syn_instance = SyntheticTest()
         syn_instance.set_synthetic_payload(payload=syn_payload)
 
+    def test_shared_transport(self):
+        syn_instance = SyntheticTest()
+        alert_instance = SmartAlert()
+        transport = syn_instance.get_transport()
+        self.assertIs(transport, alert_instance.get_transport())
+        self.assertEqual(transport.session.headers['Content-Type'], 'application/json')
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertGreater(bucket.reserve(), 0.0)
+
+    def test_retry_after(self):
+        transport = SyntheticTransport()
+        response = requests.Response()
+        response.status_code = 429
+        response.headers['Retry-After'] = '3'
+        self.assertGreaterEqual(transport.retry_delay(response, 0), 3)
+        self.assertLess(transport.retry_delay(response, 0), 4)
+
+    def test_get_all_pages_order(self):
+        def fetch_page(page):
+            items = list(range(10))[(page - 1) * 3:page * 3]
+            return {"items": items, "page": page, "pageSize": 3, "totalHits": 10}
+
+        pages = list(SyntheticTest().get_all_pages(fetch_page, page_size=3, workers=2))
+        self.assertEqual([p["page"] for p in pages], [1, 2, 3, 4])
+        self.assertEqual([i for p in pages for i in p["items"]], list(range(10)))
+
+    def test_iter_test_results(self):
+        class PagedTest(SyntheticTest):
+            def retrieve_test_results(self, test_id, page=1, page_size=200, window_size=60*60*1000):
+                items = [f"{test_id}-{i}" for i in range(5)][(page - 1) * page_size:page * page_size]
+                return {"items": items, "page": page, "pageSize": page_size, "totalHits": 5}
+
+        results = PagedTest().iter_test_results("t1", page_size=2)
+        self.assertEqual(list(results), [f"t1-{i}" for i in range(5)])
+
+    def test_run_bulk_report(self):
+        syn_instance = SyntheticTest()
+        report = syn_instance.run_bulk(lambda x: 204 if x % 4 else 404, list(range(20)), concurrency=4)
+        self.assertEqual(report.total(), 20)
+        self.assertEqual(report.succeeded(), 15)
+        self.assertEqual(report.status_count, {204: 15, 404: 5})
+        self.assertLessEqual(report.percentile(50), report.percentile(95))
+
+        # workers print whole lines, a slow stdout switches threads between the text and the newline
+        class SlowStdout(io.StringIO):
+            def write(self, s):
+                time.sleep(0.001)
+                return super().write(s)
+
+        class DeleteTest(SyntheticTest):
+            def request(self, method, url, **kwargs):
+                response = requests.Response()
+                response.status_code = 204
+                return response
+
+        delete_instance = DeleteTest()
+        delete_instance.set_auth({"host": "https://example.instana.io", "token": "y"})
+        with contextlib.redirect_stdout(SlowStdout()) as out:
+            delete_instance.run_bulk(delete_instance.delete_a_synthetic_test, [f"t{i}" for i in range(20)], concurrency=4)
+        self.assertEqual(sorted(out.getvalue().splitlines()), sorted(f'test "t{i}" deleted' for i in range(20)))
+
+    def test_response_cache(self):
+        host = 'https://example.instana.io'
+        tests_url = f'{host}/api/synthetics/settings/tests/'
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ResponseCache(host, 'token', folder=folder)
+            self.assertTrue(cache.is_cacheable('GET', tests_url))
+            self.assertFalse(cache.is_cacheable('GET', f'{host}/api/synthetics/settings/tests/abc'))
+            self.assertFalse(cache.is_cacheable('DELETE', tests_url))
+
+            response = requests.Response()
+            response.status_code = 200
+            response.headers['ETag'] = '"v1"'
+            response._content = b'[{"id": "abc"}]'
+            cache.put(tests_url, response)
+            entry = cache.get(tests_url)
+            self.assertTrue(cache.is_fresh(entry))
+            self.assertEqual(cache.conditional_headers(entry), {'If-None-Match': '"v1"'})
+            self.assertEqual(cache.to_response(entry).json(), [{"id": "abc"}])
+            # a streamed body is closed with the response, also once it was read
+            streamed = cache.to_response(entry, stream=True)
+            self.assertEqual(b''.join(streamed.iter_content(4)), b'[{"id": "abc"}]')
+            streamed.close()
+            self.assertTrue(streamed.raw.closed)
+            # listings may hold scripts, only the user can read them
+            self.assertEqual(os.stat(cache.folder).st_mode & 0o777, 0o700)
+            for root, _, file_names in os.walk(cache.folder):
+                for file_name in file_names:
+                    self.assertEqual(os.stat(os.path.join(root, file_name)).st_mode & 0o777, 0o600)
+
+            cache.invalidate(f'{host}/api/synthetics/settings/tests/abc')
+            self.assertIsNone(cache.get(tests_url))
+
+            # --no-cache neither reads nor stores listings
+            class ServerTransport(SyntheticTransport):
+                def send(self, method, url, token, verify=False, **kwargs):
+                    return response
+
+            transport = ServerTransport()
+            transport.set_cache(cache, use_cache=False)
+            self.assertEqual(transport.request('GET', tests_url, 'token').json(), [{"id": "abc"}])
+            self.assertIsNone(cache.get(tests_url))
+
+    def test_iter_json_array(self):
+        tests = [{"id": f"t{i}", "label": "ünïcode", "testFrequency": 15, "locations": [],
+                  "configuration": {"syntheticType": "HTTPScript", "script": "x" * 500}} for i in range(20)]
+        raw = json.dumps(tests, ensure_ascii=False).encode('utf-8')
+        chunks = [raw[i:i + 7] for i in range(0, len(raw), 7)]
+        syn_instance = SyntheticTest()
+        self.assertEqual(list(syn_instance.iter_json_array(chunks)), tests)
+        self.assertEqual(list(syn_instance.iter_json_array([b'[1, 2', b'3]'])), [1, 23])
+        self.assertEqual(list(syn_instance.iter_json_array([b'{"id": ', b'"t1"}'])), [{"id": "t1"}])
+
+        summary = SyntheticTestSummary(tests[0])
+        self.assertEqual(summary["label"], "ünïcode")
+        self.assertEqual(summary["configuration"], {"syntheticType": "HTTPScript"})
+        self.assertFalse(hasattr(summary, "__dict__"))
+
+    def test_set_command_options(self):
+        self.assertEqual(get_command_name(['synctl', '--version']), None)
+        self.assertEqual(get_command_name(['synctl', 'get', 'test', '--host', 'x']), 'get')
+
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('get')
+        get_args = para_instanace.get_parser().parse_args(['get', 'test', '--host', 'x', '--token', 'y'])
+        self.assertEqual(get_args.sub_command, 'get')
+        self.assertEqual(get_args.op_type, 'test')
+        with self.assertRaises(SystemExit):
+            para_instanace.get_parser().parse_args(['delete', 'test', 'abc'])
+
+        clients = SyntheticClients({"host": "https://example.instana.io", "token": "y"}, insecure=True)
+        syn_instance = clients.get(SyntheticTest)
+        self.assertIs(syn_instance, clients.get(SyntheticTest))
+        self.assertEqual(syn_instance.auth["token"], "y")
+        self.assertTrue(syn_instance.insecure)
+
+    def test_set_command_options_builds_one_parser(self):
+        # only the options of the given command are built, see benchmark.py for the time it saves
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('get')
+        self.assertGreater(len(para_instanace.parser_get._actions), 1)
+        for parser in (para_instanace.parser_create, para_instanace.parser_patch, para_instanace.parser_delete,
+                       para_instanace.parser_import):
+            self.assertEqual([x.dest for x in parser._actions], ["help"])
+
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('unknown')
+        self.assertGreater(len(para_instanace.parser_create._actions), 1)
+
+        # get and delete only create the client of the resource they use
+        deleted = []
+
+        class ServerCredential(SyntheticCredential):
+            def retrieve_credentials(self, show_details=False):
+                return ["cred1"]
+
+            def delete_credentials(self, cred_list):
+                deleted.extend(cred_list)
+
+        class RecordingClients(SyntheticClients):
+            created = []
+
+            def get(self, client_class):
+                self.created.append(client_class)
+                return ServerCredential() if client_class is SyntheticCredential else super().get(client_class)
+
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('get')
+        get_args = para_instanace.get_parser().parse_args(['get', 'cred'])
+        clients = RecordingClients({"host": "https://example.instana.io", "token": "y"})
+        with contextlib.redirect_stdout(io.StringIO()):
+            command_get(get_args, clients)
+        self.assertEqual(clients.created, [SyntheticCredential])
+
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('delete')
+        get_args = para_instanace.get_parser().parse_args(['delete', 'cred', 'cred1'])
+        clients = RecordingClients({"host": "https://example.instana.io", "token": "y"})
+        clients.created = []
+        command_delete(get_args, clients)
+        self.assertEqual((clients.created, deleted), ([SyntheticCredential], ["cred1"]))
+
+    def test_merge_patch(self):
+        self.assertEqual(deep_merge({"configuration": {"timeout": "1m", "retries": 0}, "label": "a"},
+                                    {"configuration": {"retries": 1}, "active": True}),
+                         {"configuration": {"timeout": "1m", "retries": 1}, "label": "a", "active": True})
+
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('patch')
+        get_args = para_instanace.get_parser().parse_args(['patch', 'test', 'abc', '--label', 'x', '--retries', '1'])
+        self.assertEqual((get_args.label, get_args.retries), ('x', 1))
+
+        patch_instance = PatchSyntheticTest()
+        patch_instance.set_test_id('abc')
+        patch_instance.current_test = {"configuration": {"syntheticType": "HTTPAction"}, "customProperties": {"a": "1"}}
+        patch_instance.patch_label('x')
+        patch_instance.patch_frequency(5)
+        patch_instance.patch_retries(1)
+        patch_instance.patch_config_timeout('2m')
+        patch_instance.patch_custom_properties('abc', ['b=2'])
+        self.assertEqual(patch_instance.patch_payload,
+                         {"label": "x", "testFrequency": 5,
+                          "configuration": {"retries": 1, "timeout": "2m"},
+                          "customProperties": {"a": "1", "b": "2"}})
+
+    def test_payload_delta(self):
+        test = {"id": "abc", "label": "a", "locations": ["l1"], "customProperties": {"k": "v"},
+                "configuration": {"syntheticType": "BrowserScript", "script": "x" * 1000, "timeout": "1m"}}
+        updated = json.loads(json.dumps(test))
+        self.assertEqual(payload_delta(test, updated), {})
+
+        updated["label"] = "b"
+        updated["configuration"]["timeout"] = "2m"
+        self.assertEqual(payload_delta(test, updated), {"label": "b", "configuration": {"timeout": "2m"}})
+
+        del updated["id"]
+        self.assertEqual(payload_delta(test, updated, ignored=("id",)), {"label": "b", "configuration": {"timeout": "2m"}})
+        del updated["configuration"]["script"]
+        self.assertIsNone(payload_delta(test, updated, ignored=("id",)))
+
+    def test_make_plan(self):
+        server_tests = [
+            {"id": "t1", "label": "same", "active": True, "createdAt": 1,
+             "configuration": {"syntheticType": "HTTPAction", "url": "https://a", "timeout": "1m"}},
+            {"id": "t2", "label": "changed", "active": True,
+             "configuration": {"syntheticType": "HTTPAction", "url": "https://b", "timeout": "1m"}},
+            {"id": "t3", "label": "no-file", "active": True,
+             "configuration": {"syntheticType": "HTTPAction", "url": "https://c"}},
+        ]
+
+        class ServerPlan(SyntheticTestPlan):
+            def retrieve_all_synthetic_tests(self, syn_type=None, CI_CD=False, full=False):
+                return server_tests
+
+        with tempfile.TemporaryDirectory() as folder:
+            files = {
+                "same.json": {"label": "same", "configuration": {"syntheticType": "HTTPAction", "url": "https://a"}},
+                "changed.json": {"label": "changed", "configuration": {"syntheticType": "HTTPAction", "url": "https://b2"}},
+                "new.json": {"label": "new", "configuration": {"syntheticType": "HTTPAction", "url": "https://d"}},
+            }
+            for name, test in files.items():
+                Path(folder, name).write_text(json.dumps(test))
+
+            plan_instance = ServerPlan()
+            actions = plan_instance.make_plan(folder, prune=True)
+            self.assertEqual(plan_instance.unchanged, 1)
+            self.assertEqual([(x["action"], x["label"]) for x in actions],
+                             [("update", "changed"), ("create", "new"), ("delete", "no-file")])
+            self.assertEqual(actions[0]["payload"],
+                             {"configuration": {"url": "https://b2", "syntheticType": "HTTPAction"}})
+
+        # deletes are confirmed before any action runs
+        applied = []
+
+        class AskPlan(ServerPlan):
+            def ask_answer(self, message):
+                return False
+
+            def run_bulk(self, func, items, concurrency=None, progress=None):
+                applied.extend(items)
+
+        plan_instance = AskPlan()
+        plan_instance.actions = actions
+        plan_instance.apply_plan()
+        self.assertEqual(applied, [])
+
+        # an empty directory with --prune would delete every test
+        with tempfile.TemporaryDirectory() as folder:
+            with self.assertRaises(SystemExit):
+                ServerPlan().make_plan(folder, prune=True)
+            self.assertEqual(ServerPlan().make_plan(folder), [])
+
+    def test_validate_test_payloads(self):
+        valid = {"label": "ping", "locations": ["l1"], "configuration": {"syntheticType": "HTTPAction", "url": "https://a"}}
+        no_location = dict(valid, locations=[])
+        empty_script = {"label": "script", "locations": ["l1"], "configuration": {"syntheticType": "HTTPScript", "script": ""}}
+        test_configs = [("line 1", json.dumps(valid)), ("line 2", json.dumps(no_location)),
+                        ("line 3", json.dumps(empty_script)), ("line 4", "{bad json")]
+        valid_payloads, invalid = SyntheticTest().validate_test_payloads(test_configs)
+        self.assertEqual(invalid, 3)
+        self.assertEqual([(source, label) for source, label, _ in valid_payloads], [("line 1", "ping")])
+        self.assertEqual(json.loads(valid_payloads[0][2]), valid)
+
+    def test_select_tests(self):
+        server_tests = [SyntheticTestSummary(x) for x in [
+            {"id": "t1", "label": "ci-ping", "locations": ["l1"], "configuration": {"syntheticType": "HTTPAction"}},
+            {"id": "t2", "label": "ci-script", "locations": ["l1", "l2"], "configuration": {"syntheticType": "HTTPScript"}},
+            {"id": "t3", "label": "prod-ping", "locations": ["l2"], "configuration": {"syntheticType": "HTTPAction"}},
+        ]]
+
+        class ServerPatch(PatchSyntheticTest):
+            def retrieve_all_synthetic_tests(self, syn_type=None, CI_CD=False, full=False):
+                return server_tests
+
+        patch_instance = ServerPatch()
+        self.assertEqual([x["id"] for x in patch_instance.select_tests(label_regex="^ci-")], ["t1", "t2"])
+        self.assertEqual([x["id"] for x in patch_instance.select_tests(location="l2")], ["t2", "t3"])
+        self.assertEqual([x["id"] for x in patch_instance.select_tests(label_regex="^ci-", syn_type="HTTPAction")], ["t1"])
+        patch_instance.patch_frequency(10)
+        patch_instance.patch_retries(2)
+        self.assertEqual(patch_instance.patch_payload, {"testFrequency": 10, "configuration": {"retries": 2}})
+
+        # the frequency has to be valid for the synthetic type of every selected test
+        server_tests.append(SyntheticTestSummary({"id": "t4", "label": "ci-cert", "locations": ["l1"],
+                                                  "configuration": {"syntheticType": "SSLCertificate"}}))
+        patch_instance = ServerPatch()
+        patch_instance.select_tests(label_regex="^ci-cert")
+        patch_instance.patch_frequency(720)
+        self.assertEqual(patch_instance.patch_payload, {"testFrequency": 720})
+        patch_instance = ServerPatch()
+        patch_instance.select_tests(label_regex="^ci-")
+        patch_instance.patch_frequency(60)
+        with self.assertRaises(SystemExit):
+            patch_instance.patch_frequency(720)
+
+        # --yes patches without asking, so it runs without a terminal
+        para_instanace = ParseParameter()
+        para_instanace.set_command_options('patch')
+        get_args = para_instanace.get_parser().parse_args(['patch', 'test', '--match-regex', '^ci-', '--active', 'true', '-y'])
+        self.assertTrue(get_args.yes)
+        patched = []
+
+        class BatchPatch(ServerPatch):
+            def ask_answer(self, message):
+                raise EOFError
+
+            def run_bulk(self, func, items, concurrency=None, progress=None):
+                patched.extend(items)
+                return BulkReport()
+
+        patch_instance = BatchPatch()
+        selected_tests = patch_instance.select_tests(label_regex="^ci-p")
+        patch_instance.patch_frequency(10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            patch_instance.patch_selected_tests(selected_tests, assume_yes=get_args.yes)
+        self.assertEqual(patched, ["t1"])
+
+    def test_runNow_result_status(self):
+        syn_instance = SyntheticTest()
+        self.assertEqual(syn_instance.parse_wait_timeout("10m"), 600)
+        self.assertEqual(syn_instance.parse_wait_timeout("90s"), 90)
+        with self.assertRaises(SystemExit):
+            syn_instance.parse_wait_timeout("10x")
+        self.assertEqual(syn_instance.runNow_result_status({"metrics": {"status": [[1700000000000, 1]]}}), "Successful")
+        self.assertEqual(syn_instance.runNow_result_status({"metrics": {"status": [[1700000000000, 0]]}}), "Failed")
+
+        # the CI/CD list of each poll, r1 is completed before its result is in the result list
+        polls = [
+            [{"testResultId": "r1", "completed": False}, {"testResultId": "r2", "completed": False}],
+            [{"testResultId": "r1", "completed": True}, {"testResultId": "r2", "completed": False}],
+            [{"testResultId": "r1", "completed": True}, {"testResultId": "r2", "completed": False}],
+            [{"testResultId": "r1", "completed": True}, {"testResultId": "r2", "completed": True}],
+        ]
+        results = [None, {"metrics": {"status": [[0, 1]], "response_time": [[0, 120]]}},
+                   {"metrics": {"status": [[0, 0]], "response_time": [[0, 80]]}}]
+        lookups = []
+
+        class ServerRun(SyntheticTest):
+            def retrieve_all_synthetic_tests(self, syn_type=None, CI_CD=False, full=False):
+                return polls.pop(0)
+
+            def find_a_test_result(self, test_id, result_id, window_size=60*60*1000):
+                lookups.append((test_id, result_id))
+                return results.pop(0)
+
+        sleeps = []
+        run_results = [{"testId": "t1", "testResultId": "r1"}, {"testId": "t2", "testResultId": "r2"}]
+        with mock.patch.object(time, "sleep", sleeps.append), contextlib.redirect_stdout(io.StringIO()) as out:
+            failed = ServerRun().wait_runNow_results(run_results, wait_timeout=600)
+        # r2 failed, the status comes from the result of each completed run
+        self.assertEqual(failed, 1)
+        self.assertEqual(lookups, [("t1", "r1"), ("t1", "r1"), ("t2", "r2")])
+        self.assertIn("DETECTED AFTER", out.getvalue())
+        # the interval grows while nothing completes and is reset when a run completes
+        self.assertEqual(sleeps, [2, 3, 4.5, 2])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(ServerRun().wait_runNow_results(run_results, wait_timeout=0), 2)
+
+    def test_export_files(self):
+        tenant = {
+            "tests": [{"id": "t1", "label": "script", "configuration": {"syntheticType": "HTTPScript", "script": "console.log(1)"}},
+                      {"id": "t2", "label": "bundle", "configuration": {"syntheticType": "HTTPScript",
+                       "scripts": {"bundle": base64.b64encode(b"PK zip").decode(), "scriptFile": "index.js"}}}],
+            "alerts": [{"id": "a1", "name": "alert"}],
+            "alert-channels": [{"id": "c1", "name": "email"}],
+            "credentials": [{"credentialName": "pass"}],
+            "locations": [{"id": "l1", "label": "loc", "status": "Online", "lastSeen": 1}],
+            "applications": [{"id": "app1", "label": "shop", "entityType": "APPLICATION"}],
+        }
+        backup_instance = TenantBackup()
+        files = backup_instance.export_files(tenant)
+        self.assertEqual(files["tests/t1.js"], b"console.log(1)")
+        self.assertEqual(files["tests/t2.zip"], b"PK zip")
+        self.assertEqual(json.loads(files["tests/t2.json"])["configuration"]["scripts"], {"scriptFile": "index.js"})
+        self.assertEqual(json.loads(files["locations/l1.json"]), {"id": "l1", "label": "loc"})
+
+        with tempfile.TemporaryDirectory() as folder:
+            backup_instance.write_export(files, folder)
+            manifest = json.loads(Path(folder, "manifest.json").read_text())
+            self.assertEqual(sorted(manifest["files"]), sorted(files))
+
+            # unchanged files are not written again, files gone from the tenant are removed
+            os.utime(Path(folder, "tests/t1.json"), (0, 0))
+            del files["alerts/a1.json"]
+            backup_instance.write_export(files, folder)
+            self.assertEqual(Path(folder, "tests/t1.json").stat().st_mtime, 0)
+            self.assertFalse(Path(folder, "alerts/a1.json").exists())
+
+        # paths of an edited manifest outside the export directory, or written again, are not removed
+        with tempfile.TemporaryDirectory() as parent:
+            folder = os.path.join(parent, "backup")
+            outside = Path(parent, "outside.txt")
+            outside.write_text("keep")
+            backup_instance.write_export(files, folder)
+            manifest = json.loads(Path(folder, "manifest.json").read_text())
+            manifest["files"].update({"../outside.txt": "x", str(outside): "x", "./tests/t1.json": "x"})
+            Path(folder, "manifest.json").write_text(json.dumps(manifest))
+            backup_instance.write_export(files, folder)
+            self.assertTrue(outside.exists())
+            self.assertTrue(Path(folder, "tests/t1.json").exists())
+
+    def test_import_tenant_payloads(self):
+        backup_instance = TenantBackup()
+        tenant = {
+            "tests": [{"id": "t1", "label": "script", "locations": ["l1", "l2"], "applicationId": "app1",
+                       "createdAt": 1, "configuration": {"syntheticType": "HTTPScript", "script": "console.log(1)"}}],
+            "alerts": [{"id": "a1", "name": "alert", "syntheticTestIds": ["t1"], "alertChannelIds": ["c1"], "created": 1}],
+            "alert-channels": [], "credentials": [], "locations": [],
+            "applications": [{"id": "app1", "label": "shop"}],
+        }
+        loaded = backup_instance.load_tenant(backup_instance.export_files(tenant))
+        self.assertEqual(loaded["tests"][0]["configuration"]["script"], "console.log(1)")
+        self.assertEqual(loaded["applications"], [{"id": "app1", "label": "shop"}])
+
+        lookup = {"locations": {"l1": "new-l1"}, "applications": {"app1": "new-app1"}, "alert-channels": {"c1": "new-c1"}}
+        payload, unmapped = backup_instance.remap_test(loaded["tests"][0], lookup)
+        self.assertEqual(payload["locations"], ["new-l1"])
+        self.assertEqual(payload["applicationId"], "new-app1")
+        self.assertEqual(unmapped, ["l2"])
+        self.assertNotIn("id", payload)
+        self.assertNotIn("createdAt", payload)
+
+        # an alert waits until all its tests are created
+        self.assertIsNone(backup_instance.remap_alert(loaded["alerts"][0], lookup, {}))
+        alert = backup_instance.remap_alert(loaded["alerts"][0], lookup, {"t1": "new-t1"})
+        self.assertEqual(alert["syntheticTestIds"], ["new-t1"])
+        self.assertEqual(alert["alertChannelIds"], ["new-c1"])
+        self.assertNotIn("id", alert)
+
+        backup_instance.set_auth({"host": "https://staging", "token": "x"})
+        with tempfile.TemporaryDirectory() as folder:
+            journal_file = os.path.join(folder, "journal.ndjson")
+            with open(journal_file, "w", encoding="utf-8") as f:
+                f.write('{"host": "https://staging"}\n{"type": "test", "source": "t1", "id": "new-t1"}\n{"type": "al')
+            journal = backup_instance.read_journal(journal_file)
+            self.assertEqual(journal, {"test": {"t1": "new-t1"}, "alert": {}})
+
+            backup_instance.set_auth({"host": "https://production", "token": "x"})
+            with self.assertRaises(SystemExit):
+                backup_instance.read_journal(journal_file)
+
+    def test_toggle_selected_alerts(self):
+        server_alerts = [
+            {"id": "a1", "name": "shop-checkout", "enabled": True, "syntheticTestIds": ["t1"]},
+            {"id": "a2", "name": "shop-login", "enabled": False, "syntheticTestIds": ["t2"]},
+            {"id": "a3", "name": "blog", "enabled": True, "syntheticTestIds": ["t2", "t3"]},
+        ]
+
+        class ServerAlert(UpdateSmartAlert):
+            def retrieve_all_smart_alerts(self):
+                return server_alerts
+
+            def ask_answer(self, message):
+                # --yes must not ask, there is no terminal
+                raise EOFError
+
+            def request(self, method, url, **kwargs):
+                alert_id, toggle = url.split("/")[-2:]
+                for alert in server_alerts:
+                    if alert["id"] == alert_id:
+                        alert["enabled"] = toggle == "enable"
+                response = requests.Response()
+                response.status_code = 204
+                return response
+
+        alert_instance = ServerAlert()
+        alert_instance.set_auth({"host": "https://tenant", "token": "x"})
+        self.assertEqual([x["id"] for x in alert_instance.select_alerts(name_regex="^shop-")], ["a1", "a2"])
+        self.assertEqual([x["id"] for x in alert_instance.select_alerts(test_ids=["t2"])], ["a2", "a3"])
+
+        with tempfile.TemporaryDirectory() as folder:
+            journal_file = os.path.join(folder, "alerts.ndjson")
+            para_instanace = ParseParameter()
+            para_instanace.set_command_options('update')
+            get_args = para_instanace.get_parser().parse_args(['update', 'alert', '--match-regex', '^shop-', '--disable', '--yes'])
+            self.assertTrue(get_args.yes)
+            alert_instance.toggle_selected_alerts(server_alerts, "disable", journal_file, assume_yes=get_args.yes)
+            self.assertEqual([x["enabled"] for x in server_alerts], [False, False, False])
+            # a2 was already disabled, it is not in the journal and stays disabled
+            alert_instance.restore_alerts(journal_file)
+            self.assertEqual([x["enabled"] for x in server_alerts], [True, False, True])
+            self.assertFalse(os.path.exists(journal_file))
+
+    def test_patch_credential_values(self):
+        patched = {}
+
+        class ServerCredential(SyntheticCredential):
+            def retrieve_credentials(self, show_details=False):
+                return ["db-pass", "api-key"]
+
+            def request(self, method, url, **kwargs):
+                patched[url.split("/")[-1]] = json.loads(kwargs["data"])
+                response = requests.Response()
+                response.status_code = 200
+                return response
+
+        cred_instance = ServerCredential()
+        cred_instance.set_auth({"host": "https://tenant", "token": "x"})
+        cred_instance.set_concurrency(4)
+        with tempfile.TemporaryDirectory() as folder:
+            secrets_file = os.path.join(folder, "secrets.json")
+            with open(secrets_file, "w", encoding="utf-8") as f:
+                json.dump({"db-pass": "new1", "api-key": "new2"}, f)
+            cred_instance.patch_credential_values(cred_instance.load_credential_values(secrets_file))
+            self.assertEqual(patched, {"db-pass": {"credentialValue": "new1"}, "api-key": {"credentialValue": "new2"}})
+
+            # unknown credentials are not created
+            with self.assertRaises(SystemExit):
+                cred_instance.patch_credential_values({"missing": "x"})
+            self.assertNotIn("missing", patched)
+
+            with open(secrets_file, "w", encoding="utf-8") as f:
+                json.dump(["db-pass"], f)
+            with self.assertRaises(SystemExit):
+                cred_instance.load_credential_values(secrets_file)
+
+    def test_fetch_graph(self):
+        calls = []
+        # both independent fetches have to be running to pass the barrier, one by one it times out
+        running = threading.Barrier(2, timeout=5)
+
+        def fetch_at_same_time(name):
+            def fetch():
+                running.wait()
+                calls.append(name)
+                return name
+            return fetch
+
+        fetched = (FetchGraph()
+                   .add("tests", fetch_at_same_time("tests"))
+                   .add("summary", fetch_at_same_time("summary"))
+                   .add("tests", fetch_at_same_time("tests-again"))
+                   .add("joined", lambda tests, summary: f"{tests}+{summary}", depends_on=("tests", "summary"))
+                   .run())
+        # a key added twice is fetched once, joined starts after both
+        self.assertEqual(fetched, {"tests": "tests", "summary": "summary", "joined": "tests+summary"})
+        self.assertEqual(sorted(calls), ["summary", "tests"])
+        with self.assertRaises(ValueError):
+            FetchGraph().add("joined", lambda x: x, depends_on=("tests",))
+
+    def test_resource_index(self):
+        location_summaries = [{"id": f"l{i}", "linkedTests": i} for i in range(1000)]
+        index = ResourceIndex(test_summaries={"t1": {"success_rate": "1/1"}},
+                              location_summaries=location_summaries + [{"id": "l1", "linkedTests": 0}])
+        # the index gives the same summary as scanning the summary list, see benchmark.py for the time
+        for location_id in ("l0", "l1", "l999", "deleted-location"):
+            self.assertEqual(index.summary_of_location(location_id),
+                             next((x for x in location_summaries if x["id"] == location_id), None))
+        self.assertEqual(index.summary_of_test("t1"), {"success_rate": "1/1"})
+        self.assertIsNone(index.summary_of_test("t2"))
+
+    def test_get_a_test_result(self):
+        # result r<i> ran i minutes ago
+        server_results = [{"testResultCommonProperties": {"id": f"r{i}", "testId": "t1"}, "minutes_ago": i}
+                          for i in range(450)]
+        sent = []
+
+        class ServerTest(SyntheticTest):
+            # filter: the server applies the synthetic.id tag, ignore: it returns all results, reject: 400
+            result_id_filter = "filter"
+
+            def request(self, method, url, **kwargs):
+                payload = json.loads(kwargs["data"])
+                sent.append(payload)
+                tags = {x["name"]: x["stringValue"] for x in payload["tagFilters"]}
+                response = requests.Response()
+                if "synthetic.id" in tags and self.result_id_filter == "reject":
+                    response.status_code = 400
+                    response._content = b'{"code": 400, "message": "unknown tag synthetic.id"}'
+                    return response
+                window_minutes = payload["timeFrame"]["windowSize"] // 60000
+                items = [x for x in server_results
+                         if x["testResultCommonProperties"]["testId"] == tags["synthetic.testId"]
+                         and x["minutes_ago"] < window_minutes]
+                if "synthetic.id" in tags and self.result_id_filter == "filter":
+                    items = [x for x in items if x["testResultCommonProperties"]["id"] == tags["synthetic.id"]]
+                page, page_size = payload["pagination"]["page"], payload["pagination"]["pageSize"]
+                response.status_code = 200
+                response._content = json.dumps({"items": items[(page - 1) * page_size:page * page_size],
+                                                "page": page, "pageSize": page_size, "totalHits": len(items)}).encode()
+                return response
+
+        syn_instance = ServerTest()
+        syn_instance.set_auth({"host": "https://tenant", "token": "x"})
+        # one request of one item whatever the window size
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r420", "24h"), [server_results[420]])
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]["pagination"]["pageSize"], 1)
+        self.assertIn({"stringValue": "r420", "name": "synthetic.id", "operator": "EQUALS"}, sent[0]["tagFilters"])
+
+        # a result older than --window-size is asked again in the last 24h
+        del sent[:]
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r120", "1h"), [server_results[120]])
+        self.assertEqual([x["timeFrame"]["windowSize"] for x in sent], [3600000, 86400000])
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r999", "24h"), [])
+
+        # a server which ignores the result id filter, results of the window are read until the result is found
+        syn_instance.result_id_filter = "ignore"
+        del sent[:]
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r5", "1h"), [server_results[5]])
+        self.assertEqual([x["pagination"]["page"] for x in sent], [1, 1])
+
+        # a server which rejects the filter, no exit
+        syn_instance.result_id_filter = "reject"
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r5", "1h"), [server_results[5]])
+        self.assertEqual(syn_instance.get_a_test_result("t1", "r120", "1h"), [])
+
+    def test_record_writer(self):
+        tests = [{"id": f"t{i}", "label": f"ping-{i}", "configuration": {"url": f"https://x/{i}"},
+                  "locations": ["l1"]} for i in range(3)]
+
+        stream = io.StringIO()
+        writer = RecordWriter("ndjson", fields=RecordWriter.parse_fields("id, configuration.url"), stream=stream)
+        writer.write(tests[0])
+        # records are buffered until the page is done
+        self.assertEqual(stream.getvalue(), "")
+        writer.write_page(tests[1:])
+        writer.close()
+        self.assertEqual([json.loads(x) for x in stream.getvalue().splitlines()],
+                         [{"id": f"t{i}", "configuration": {"url": f"https://x/{i}"}} for i in range(3)])
+
+        stream = io.StringIO()
+        RecordWriter("json", stream=stream).write_all(tests)
+        self.assertEqual(json.loads(stream.getvalue()), tests)
+        stream = io.StringIO()
+        RecordWriter("json", stream=stream).write_all([])
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+        stream = io.StringIO()
+        RecordWriter("csv", fields=["id", "configuration.url", "locations", "summary"], stream=stream).write_all(tests)
+        self.assertEqual(stream.getvalue().splitlines()[:2],
+                         ["id,configuration.url,locations,summary", 't0,https://x/0,"[""l1""]",'])
+
+        with self.assertRaises(ValueError):
+            RecordWriter("yaml")
+
+        para_instanace = ParseParameter()
+        para_instanace.set_options()
+        get_args = para_instanace.get_parser().parse_args(['get', 'test', '-o', 'ndjson', '--fields', 'id,label'])
+        self.assertEqual(get_args.output, "ndjson")
+        self.assertEqual(get_args.fields, "id,label")
+
+    def test_table_writer(self):
+        base = Base()
+        rows = [(f"r{i:05d}", "2024-01-01, 00:00:00", f"location-{i % 7}", "Successful", f"{i}ms", "0.01 MiB")
+                for i in range(2000)]
+        widths = (38, 30, 30, 15, 18, 8)
+
+        def print_rows():
+            # rendering of the printers before TableWriter
+            with contextlib.redirect_stdout(io.StringIO()) as stream:
+                print(*[base.fill_space(x, w) for x, w in zip(("ID", "START TIME", "LOCATION", "STATUS",
+                                                               "RESPONSE TIME", "RESPONSE SIZE"), widths)])
+                for row in rows:
+                    print(*[base.fill_space(x, w) for x, w in zip(row, widths)])
+            return stream.getvalue()
+
+        class CountingStream(io.StringIO):
+            writes = 0
+
+            def write(self, s):
+                self.writes += 1
+                return super().write(s)
+
+        stream = CountingStream()
+        table = TableWriter(list(zip(("ID", "START TIME", "LOCATION", "STATUS", "RESPONSE TIME", "RESPONSE SIZE"),
+                                     widths)), stream=stream, sample_size=0, buffer_size=16 * 1024)
+        table.write_rows(rows)
+        self.assertEqual(table.close(), len(rows))
+        # same text as print with fill_space, written in chunks instead of row by row,
+        # see benchmark.py for the time
+        self.assertEqual(stream.getvalue(), print_rows())
+        self.assertLessEqual(stream.writes, len(stream.getvalue()) // (16 * 1024) + 1)
+
+        # the label width is sampled from the first rows, longer labels of later rows are cut
+        stream = io.StringIO()
+        table = TableWriter([("ID", 4), ("LABEL", None), ("TYPE", 0)], stream=stream, sample_size=2)
+        table.write_page([("a1", "short", "APP"), ("a2", "a-longer-label", "APP")])
+        self.assertEqual(stream.getvalue().splitlines()[0], "ID   LABEL          TYPE")
+        table.write_page([("a3", "a-much-longer-label", "APP")])
+        self.assertEqual(table.close(), 3)
+        self.assertEqual(stream.getvalue().splitlines()[1:], ["a1   short          APP",
+                                                              "a2   a-longer-label APP",
+                                                              "a3   a-much-longer- APP"])
+
 if __name__ == '__main__':
     unittest.main()